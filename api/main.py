@@ -1,84 +1,727 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import numpy as np
-import joblib
-import tensorflow as tf
 import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, deque
 
-# Initialize FastAPI app
-app = FastAPI(title="Stock Movement Prediction API")
+from src.serving.prediction_broker import PredictionBroker
+from src.serving.prediction_cache import PredictionCache, file_version, window_fingerprint
+
+# TensorFlow and the model are loaded in a background thread after the server has bound,
+# so /health/live answers immediately and /health/ready reports when predictions can be served.
+PROCESS_START = time.perf_counter()
 
-# Load model and scaler artifacts
 MODEL_DIR = "models"
 TICKER = "AAPL"
-try:
-    model = tf.keras.models.load_model(os.path.join(MODEL_DIR, f"{TICKER}_lstm_model.h5"))
-    scaler = joblib.load(os.path.join(MODEL_DIR, f"{TICKER}_scaler.joblib"))
-except Exception as e:
-    raise RuntimeError(f"Failed to load model or scaler: {e}")
+
+# "tensorflow" loads the Keras model; "numpy" runs the same LSTM from its weights without
+# importing TensorFlow (used by serve_prefork.py to share one copy between workers)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "tensorflow")
+
+# Inputs change once per trading day, so repeated requests are answered from this cache.
+# Keys include the loaded model's version and the input window (or dataset) version.
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv("PREDICTION_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", "3600")),
+)
+# Explanations are cached separately so they do not evict predictions
+explanation_cache = PredictionCache(
+    max_entries=int(os.getenv("PREDICTION_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", "3600")),
+)
+EXPLAIN_STEPS = 32
+# Cascade mode answers from the compact baseline forest when it is confident and runs the
+# LSTM only for ambiguous windows. A share of the confident answers is also scored by the
+# LSTM ("shadow" runs) to measure how often the two agree.
+CASCADE_MODE = os.getenv("CASCADE_MODE", "off").lower() == "on"
+CASCADE_CONFIDENCE = float(os.getenv("CASCADE_CONFIDENCE", "0.8"))
+CASCADE_SHADOW_RATE = float(os.getenv("CASCADE_SHADOW_RATE", "0.05"))
+FEATURE_STORE_PATH = "data/feature_store/features.db"
+FINAL_DATA_DIR = "data/final"
+# Subscribers of /stream/predictions and /ws/predictions get each new prediction once it is
+# computed. The watcher checks this often whether the model or the stored features changed.
+# The broker lives in this process: pre-forked workers each run the watcher and compute the
+# predictions for their own subscribers.
+prediction_broker = PredictionBroker()
+PREDICTION_WATCH_SECONDS = float(os.getenv("PREDICTION_WATCH_SECONDS", "30"))
+# Set to a path to record incoming requests as JSONL that benchmarks/load_test.py can replay
+REQUEST_LOG_PATH = os.getenv("REQUEST_LOG_PATH")
+
+# Loaded artifacts and startup timings, filled in by load_artifacts()
+state = {
+    "model": None,
+    "scaler": None,
+    "backend": None,
+    "model_version": None,
+    "ready": False,
+    "error": None,
+    "timings": {},
+    "forest": None,
+    "forest_columns": None,
+    # serve_prefork.py turns this off: its parent reloads changed model files and replaces
+    # the workers, so the weights stay shared instead of each worker loading its own copy
+    "reload_on_change": True,
+}
+# Which model answered, latency per path and forest/LSTM agreement, served at /cascade-stats
+cascade_stats = {
+    "lock": threading.Lock(),
+    "answered_by": Counter(),
+    "latency_ms": {"forest": deque(maxlen=1000), "lstm": deque(maxlen=1000)},
+    "compared": Counter(),
+    "agreed": Counter(),
+}
+_load_lock = threading.Lock()
+# Models of tickers other than TICKER, loaded on first request: ticker -> model, scaler, model_version
+TICKER_MODEL_CACHE_SIZE = int(os.getenv("TICKER_MODEL_CACHE_SIZE", "32"))
+ticker_models = OrderedDict()
+_ticker_models_lock = threading.Lock()
+
+
+def _load_forest():
+    """
+    Loads the compact baseline forest, converting the sklearn model when no .npz exists.
+
+    Returns:
+        tuple: (CompactForest, indices of its features in the scaled window).
+    """
+    from src.features.schema import FEATURE_COLUMNS
+    from src.serving.compact_forest import CompactForest
+
+    forest_path = _forest_path()
+    if forest_path.endswith(".npz"):
+        forest = CompactForest.load(forest_path)
+    else:
+        import joblib
+        forest = CompactForest.from_sklearn(joblib.load(forest_path))
+    columns = [FEATURE_COLUMNS.index(name) for name in forest.feature_names]
+    return forest, columns
+
+
+def _forest_path() -> str:
+    forest_path = os.path.join(MODEL_DIR, f"{TICKER}_baseline_forest.npz")
+    if os.path.exists(forest_path):
+        return forest_path
+    return os.path.join(MODEL_DIR, f"{TICKER}_baseline_model.joblib")
+
+
+def _artifact_version() -> str:
+    """Version of the model files on disk; changes when any of them is rewritten."""
+    paths = [os.path.join(MODEL_DIR, f"{TICKER}_lstm_model.h5"), os.path.join(MODEL_DIR, f"{TICKER}_scaler.joblib")]
+    if CASCADE_MODE:
+        paths.append(_forest_path())
+    return file_version(*paths)
+
+
+def _load_model(model_path: str, backend: str):
+    if backend == "numpy":
+        from src.serving.numpy_lstm import NumpyLSTMClassifier
+        return NumpyLSTMClassifier.from_h5(model_path)
+    import tensorflow as tf
+    return tf.keras.models.load_model(model_path)
+
+
+def load_artifacts(backend: str = None, reload: bool = False):
+    """
+    Loads the model and scaler, and runs a warm-up inference so the first real request
+    does not pay the graph tracing cost.
+
+    Args:
+        backend (str): "tensorflow" or "numpy". Defaults to MODEL_BACKEND.
+        reload (bool): Load again even if a model is loaded (after a retrain). The old model
+            keeps serving until the new one is ready.
+    """
+    backend = backend or state["backend"] or MODEL_BACKEND
+    with _load_lock:
+        if state["ready"] and not reload:
+            return
+        timings = state["timings"]
+        try:
+            start = time.perf_counter()
+            import joblib
+            if backend == "numpy":
+                from src.serving.numpy_lstm import NumpyLSTMClassifier
+            else:
+                import tensorflow as tf
+            timings["import_seconds"] = round(time.perf_counter() - start, 3)
+
+            start = time.perf_counter()
+            model_path = os.path.join(MODEL_DIR, f"{TICKER}_lstm_model.h5")
+            scaler_path = os.path.join(MODEL_DIR, f"{TICKER}_scaler.joblib")
+            model_version = _artifact_version()
+            model = _load_model(model_path, backend)
+            scaler = joblib.load(scaler_path)
+            forest, forest_columns = None, None
+            if CASCADE_MODE:
+                forest, forest_columns = _load_forest()
+            timings["model_load_seconds"] = round(time.perf_counter() - start, 3)
+
+            start = time.perf_counter()
+            _, timesteps, features = model.input_shape
+            model.predict(np.zeros((1, timesteps, features), dtype=np.float32), verbose=0)
+            timings["warmup_seconds"] = round(time.perf_counter() - start, 3)
+
+            state["model"], state["scaler"], state["backend"] = model, scaler, backend
+            state["forest"], state["forest_columns"] = forest, forest_columns
+            state["model_version"] = model_version
+            prediction_cache.set_model_version(model_version)
+            explanation_cache.set_model_version(model_version)
+            state["ready"] = True
+            timings["ready_after_seconds"] = round(time.perf_counter() - PROCESS_START, 3)
+            print(f"Model ready after {timings['ready_after_seconds']}s: {timings}")
+        except Exception as e:
+            state["error"] = f"Failed to load model or scaler: {e}"
+            print(state["error"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state["timings"]["bind_after_seconds"] = round(time.perf_counter() - PROCESS_START, 3)
+    # Pre-forked workers inherit artifacts loaded by the parent and skip the loader
+    if not state["ready"]:
+        threading.Thread(target=load_artifacts, name="model-loader", daemon=True).start()
+    watcher = asyncio.create_task(_watch_predictions())
+    yield
+    watcher.cancel()
+
+
+# Initialize FastAPI app
+app = FastAPI(title="Stock Movement Prediction API", lifespan=lifespan)
+
+_request_log = {"start": None, "queue": queue.SimpleQueue()}
+
+
+def _write_request_log():
+    """Appends queued entries to REQUEST_LOG_PATH, so the event loop never waits on the disk."""
+    os.makedirs(os.path.dirname(REQUEST_LOG_PATH) or ".", exist_ok=True)
+    with open(REQUEST_LOG_PATH, "a") as f:
+        while True:
+            lines = [_request_log["queue"].get()]
+            # Write everything that arrived meanwhile in one go
+            while not _request_log["queue"].empty():
+                lines.append(_request_log["queue"].get())
+            f.write("".join(lines))
+            f.flush()
+
+
+async def record_requests(request: Request, call_next):
+    """Queues each request (method, path, JSON body, offset from the first one) for REQUEST_LOG_PATH."""
+    body = await request.body()
+    now = time.perf_counter()
+    _request_log["start"] = _request_log["start"] or now
+    entry = {
+        "offset_ms": round((now - _request_log["start"]) * 1000, 3),
+        "method": request.method,
+        "path": request.url.path,
+    }
+    if body:
+        try:
+            entry["body"] = json.loads(body)
+        except ValueError:
+            entry["body_bytes"] = len(body)
+    _request_log["queue"].put(json.dumps(entry) + "\n")
+    return await call_next(request)
+
+
+# Recording is opt-in; without it requests do not pass through any middleware
+if REQUEST_LOG_PATH:
+    threading.Thread(target=_write_request_log, name="request-log", daemon=True).start()
+    app.middleware("http")(record_requests)
 
 # Define the input data model using Pydantic
 class PredictionInput(BaseModel):
     # Expecting a list of lists representing (timesteps, features)
     # For a single prediction, this will be a list with one sequence.
     data: list[list[float]]
-    
+
+
+def _require_ready():
+    if not state["ready"]:
+        detail = state["error"] or "Model is still loading, retry shortly."
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Stock Prediction API. Use the /predict endpoint for predictions."}
 
+def _validate_window(data: list) -> np.ndarray:
+    """Converts a request window to float32 and checks it against the model's input shape."""
+    # Convert input data to numpy array and reshape for the model
+    # Build float32 directly, the dtype the model computes in
+    input_array = np.asarray(data, dtype=np.float32)
+
+    # Fix: Check if the shape is correct for timesteps and features
+    if len(input_array.shape) != 2:
+        raise ValueError(f"Input data must be 2D (timesteps, features), but got shape {input_array.shape}")
+
+    timesteps, features = input_array.shape
+    _, expected_timesteps, expected_features = state["model"].input_shape
+    if timesteps != expected_timesteps:
+        raise ValueError(f"Input data must have {expected_timesteps} timesteps, but got {timesteps}")
+    if features != expected_features:
+        raise ValueError(f"Input data must have {expected_features} features, but got {features}")
+    return input_array
+
+
+def _prediction_result(prob_value: float) -> dict:
+    prediction = 1 if prob_value > 0.5 else 0
+    return {
+        "prediction": prediction,
+        "probability_up": prob_value,
+        "prediction_label": "UP" if prediction == 1 else "DOWN"
+    }
+
+
+def _lstm_probability(window: np.ndarray) -> float:
+    # Reshape for a single prediction: (timesteps, features) -> (1, timesteps, features)
+    prediction_proba = state["model"].predict(np.expand_dims(window, axis=0), verbose=0)
+
+    # Fix: Handle the prediction probability correctly
+    # prediction_proba is typically shape (1, 1) for binary classification
+    return float(prediction_proba[0][0]) if prediction_proba.ndim > 1 else float(prediction_proba[0])
+
+
+def _record_cascade(answered_by: str, latency_ms: float, comparison: str = None, agreed: bool = None):
+    with cascade_stats["lock"]:
+        cascade_stats["answered_by"][answered_by] += 1
+        cascade_stats["latency_ms"][answered_by].append(latency_ms)
+        if comparison:
+            cascade_stats["compared"][comparison] += 1
+            cascade_stats["agreed"][comparison] += int(agreed)
+
+
+def _cascade_predict(window: np.ndarray) -> dict:
+    """Forest answer when it is confident, otherwise the LSTM's."""
+    start = time.perf_counter()
+    # The forest was trained on unscaled prices and indicators of the last day
+    last_row = state["scaler"].inverse_transform(window[-1:].astype(np.float64))[:, state["forest_columns"]]
+    forest_probability = float(state["forest"].predict_proba(last_row)[0, 1])
+    confident = max(forest_probability, 1 - forest_probability) >= CASCADE_CONFIDENCE
+
+    if confident:
+        result = {**_prediction_result(forest_probability), "model": "forest"}
+        latency_ms = (time.perf_counter() - start) * 1000
+        if random.random() < CASCADE_SHADOW_RATE:
+            agreed = (_lstm_probability(window) > 0.5) == (forest_probability > 0.5)
+            _record_cascade("forest", latency_ms, "confident", agreed)
+        else:
+            _record_cascade("forest", latency_ms)
+        return result
+
+    lstm_probability = _lstm_probability(window)
+    result = {**_prediction_result(lstm_probability), "model": "lstm",
+              "forest_probability_up": forest_probability}
+    _record_cascade("lstm", (time.perf_counter() - start) * 1000, "ambiguous",
+                    (lstm_probability > 0.5) == (forest_probability > 0.5))
+    return result
+
+
+def _predict_window(window: np.ndarray) -> dict:
+    """Runs the model on one (timesteps, features) window of scaled features."""
+    if state["forest"] is not None:
+        return _cascade_predict(window)
+    return _prediction_result(_lstm_probability(window))
+
+
+def _ticker_artifacts(ticker: str) -> dict:
+    """
+    Model, scaler and model version serving a ticker.
+
+    TICKER uses the artifacts loaded at startup. Other tickers load models/{ticker}_lstm_model.h5
+    and {ticker}_scaler.joblib with the same backend on first use, again when the files
+    change, and the TICKER_MODEL_CACHE_SIZE most recently used stay loaded.
+    """
+    if ticker == TICKER:
+        return {"model": state["model"], "scaler": state["scaler"], "model_version": state["model_version"]}
+
+    model_path = os.path.join(MODEL_DIR, f"{ticker}_lstm_model.h5")
+    scaler_path = os.path.join(MODEL_DIR, f"{ticker}_scaler.joblib")
+    if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+        raise FileNotFoundError(f"No model trained for {ticker}")
+    model_version = file_version(model_path, scaler_path)
+    with _ticker_models_lock:
+        entry = ticker_models.get(ticker)
+        if entry is None or entry["model_version"] != model_version:
+            import joblib
+            entry = {"model": _load_model(model_path, state["backend"]), "scaler": joblib.load(scaler_path),
+                     "model_version": model_version}
+            ticker_models[ticker] = entry
+            print(f"Loaded model of {ticker} ({model_version})")
+        ticker_models.move_to_end(ticker)
+        while len(ticker_models) > TICKER_MODEL_CACHE_SIZE:
+            ticker_models.popitem(last=False)
+    return entry
+
+
+def _load_latest_window(ticker: str, timesteps: int, scaler):
+    """
+    Reads and scales the last `timesteps` feature rows of a ticker.
+
+    Returns:
+        tuple: (window as float32 array, date of the last row as 'YYYY-MM-DD').
+    """
+    from src.features.feature_store import get_latest_features
+    from src.features.schema import FEATURE_COLUMNS, read_feature_csv
+
+    df = get_latest_features(ticker, n=timesteps, columns=FEATURE_COLUMNS, db_path=FEATURE_STORE_PATH)
+    if len(df) < timesteps:
+        csv_path = os.path.join(FINAL_DATA_DIR, f"{ticker}_final_dataset.csv")
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No features found for {ticker}")
+        df = read_feature_csv(csv_path)
+        df = df[df.index.notna()].tail(timesteps)
+    if len(df) < timesteps:
+        raise ValueError(f"Only {len(df)} feature rows available for {ticker}, {timesteps} needed")
+
+    window = scaler.transform(df[FEATURE_COLUMNS]).astype(np.float32)
+    return window, df.index[-1].strftime("%Y-%m-%d")
+
+
 @app.post("/predict")
 def predict(input_data: PredictionInput):
     """
     Predicts stock movement based on a sequence of feature data.
     """
+    _require_ready()
     try:
-        # Convert input data to numpy array and reshape for the model
-        input_array = np.array(input_data.data)
-        
-        # Fix: Check if the shape is correct for timesteps and features
-        if len(input_array.shape) != 2:
-            raise ValueError(f"Input data must be 2D (timesteps, features), but got shape {input_array.shape}")
-        
-        timesteps, features = input_array.shape
-        if timesteps != 30:  # Assuming 30 timesteps
-            raise ValueError(f"Input data must have 30 timesteps, but got {timesteps}")
-            
-        # Reshape for a single prediction: (timesteps, features) -> (1, timesteps, features)
-        input_reshaped = np.expand_dims(input_array, axis=0)
-        
-        # Make prediction
-        prediction_proba = model.predict(input_reshaped)
-        
-        # Fix: Handle the prediction probability correctly
-        # prediction_proba is typically shape (1, 1) for binary classification
-        prob_value = float(prediction_proba[0][0]) if prediction_proba.ndim > 1 else float(prediction_proba[0])
-        prediction = 1 if prob_value > 0.5 else 0
-        
-        return {
-            "prediction": prediction,
-            "probability_up": prob_value,
-            "prediction_label": "UP" if prediction == 1 else "DOWN"
-        }
+        input_array = _validate_window(input_data.data)
+
+        key = ("window", TICKER, state["model_version"], window_fingerprint(input_array))
+        result = prediction_cache.get(key)
+        if result is not None:
+            return {**result, "cached": True}
+
+        result = _predict_window(input_array)
+        prediction_cache.put(key, result)
+        return {**result, "cached": False}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
+
+def _error(status_code: int, detail: str) -> dict:
+    return {"status_code": status_code, "detail": detail}
+
+
+def _latest_predictions(tickers: list) -> tuple:
+    """
+    Predictions from the latest stored features of several tickers.
+
+    Results for unchanged models and features come from the cache. The remaining windows are
+    stacked and scored with one predict call per model; TICKER goes through the cascade when
+    it is enabled (the forest is trained for TICKER only).
+
+    Returns:
+        tuple: ({ticker: result}, {ticker: {"status_code", "detail"}}), for tickers upper-cased.
+    """
+    from src.features.feature_store import last_updated
+
+    results, errors, pending = {}, {}, []
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        try:
+            artifacts = _ticker_artifacts(ticker)
+            # The stored features only change when the ticker's rows or its final dataset are rewritten
+            dataset_version = (last_updated(ticker, db_path=FEATURE_STORE_PATH),
+                               file_version(os.path.join(FINAL_DATA_DIR, f"{ticker}_final_dataset.csv")))
+            key = ("latest", ticker, artifacts["model_version"], dataset_version)
+            cached = prediction_cache.get(key)
+            if cached is not None:
+                results[ticker] = {**cached, "cached": True}
+                continue
+            _, timesteps, _ = artifacts["model"].input_shape
+            window, as_of = _load_latest_window(ticker, timesteps, artifacts["scaler"])
+            pending.append({"ticker": ticker, "key": key, "model": artifacts["model"], "window": window, "as_of": as_of})
+        except FileNotFoundError as e:
+            errors[ticker] = _error(404, str(e))
+        except ValueError as ve:
+            errors[ticker] = _error(400, str(ve))
+        except Exception as e:
+            errors[ticker] = _error(500, f"An internal error occurred: {e}")
+
+    groups = {}
+    for item in pending:
+        groups.setdefault(id(item["model"]), []).append(item)
+    for group in groups.values():
+        try:
+            if group[0]["ticker"] == TICKER:
+                outputs = [_predict_window(item["window"]) for item in group]
+            else:
+                probabilities = group[0]["model"].predict(np.stack([item["window"] for item in group]), verbose=0)
+                outputs = [_prediction_result(float(p)) for p in np.asarray(probabilities).reshape(len(group), -1)[:, 0]]
+        except Exception as e:
+            errors.update({item["ticker"]: _error(500, f"An internal error occurred: {e}") for item in group})
+            continue
+        for item, output in zip(group, outputs):
+            result = {"ticker": item["ticker"], "as_of": item["as_of"], **output}
+            prediction_cache.put(item["key"], result)
+            results[item["ticker"]] = {**result, "cached": False}
+    return results, errors
+
+
+def _latest_prediction(ticker: str) -> dict:
+    """Prediction from the latest stored features of a ticker, served from the cache when unchanged."""
+    results, errors = _latest_predictions([ticker])
+    if errors:
+        raise HTTPException(**errors[ticker.upper()])
+    return results[ticker.upper()]
+
+@app.get("/predict/latest/{ticker}")
+def predict_latest(ticker: str):
+    """
+    Predicts from the latest features stored on the server for the ticker.
+    """
+    _require_ready()
+    return _latest_prediction(ticker)
+
+class BatchPredictionInput(BaseModel):
+    tickers: list[str]
+
+@app.post("/predict/batch")
+def predict_batch(input_data: BatchPredictionInput):
+    """
+    Latest predictions for several tickers in one call, each from its own model.
+
+    Tickers that cannot be predicted (e.g. no trained model) are reported under "errors"
+    instead of failing the batch.
+    """
+    _require_ready()
+    results, errors = _latest_predictions(input_data.tickers)
+    return {"predictions": [results[t] for t in dict.fromkeys(t.upper() for t in input_data.tickers) if t in results],
+            "errors": errors}
+
+@app.post("/explain")
+def explain(input_data: PredictionInput):
+    """
+    Integrated-gradients attributions of a prediction, per timestep and feature.
+    """
+    _require_ready()
+    from src.features.schema import FEATURE_COLUMNS
+    from src.serving.explain import integrated_gradients, summarize_attributions
+
+    try:
+        input_array = _validate_window(input_data.data)
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
+
+    key = ("explain", TICKER, state["model_version"], window_fingerprint(input_array), EXPLAIN_STEPS)
+    result = explanation_cache.get(key)
+    if result is not None:
+        return {**result, "cached": True}
+
+    try:
+        start = time.perf_counter()
+        explanation = integrated_gradients(state["model"], input_array, steps=EXPLAIN_STEPS)
+        probability = explanation["probability"]
+        result = {
+            "prediction": 1 if probability > 0.5 else 0,
+            "probability_up": probability,
+            "baseline_probability_up": explanation["baseline_probability"],
+            "method": "integrated_gradients",
+            "steps": EXPLAIN_STEPS,
+            "convergence_delta": explanation["convergence_delta"],
+            "attributions": explanation["attributions"].tolist(),
+            **summarize_attributions(explanation["attributions"], FEATURE_COLUMNS),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
+    explanation_cache.put(key, result)
+    return {**result, "cached": False}
+
+def refresh_predictions() -> list:
+    """
+    Reloads the model if its files changed and publishes the latest prediction of each
+    served ticker when it differs from the last one published.
+
+    One computation per change, however many clients are subscribed.
+
+    Returns:
+        list: Events published.
+    """
+    if not state["ready"]:
+        return []
+    model_version = _artifact_version()
+    if model_version != state["model_version"] and "missing" not in model_version and state["reload_on_change"]:
+        print(f"Model files changed, reloading ({model_version})")
+        load_artifacts(reload=True)
+
+    published = []
+    # TICKER and every ticker whose model has been requested
+    results, errors = _latest_predictions([TICKER, *list(ticker_models)])
+    for ticker, error in errors.items():
+        print(f"No prediction to publish for {ticker}: {error['detail']}")
+    for ticker, result in results.items():
+        payload = {k: v for k, v in result.items() if k != "cached"}
+        payload["model_version"] = _ticker_artifacts(ticker)["model_version"]
+        previous = prediction_broker.latest.get(ticker)
+        if previous is None or previous["data"] != payload:
+            published.append(prediction_broker.publish(ticker, payload))
+    return published
+
+
+async def _watch_predictions():
+    while True:
+        try:
+            await asyncio.to_thread(refresh_predictions)
+        except Exception as e:
+            print(f"Prediction watcher error: {e}")
+        # Publish the first prediction as soon as the model has loaded
+        await asyncio.sleep(PREDICTION_WATCH_SECONDS if state["ready"] else 1)
+
+
+@app.post("/predictions/refresh")
+async def refresh_predictions_now():
+    """
+    Checks for a new model or new features right away, e.g. at the end of a pipeline run.
+    """
+    _require_ready()
+    events = await asyncio.to_thread(refresh_predictions)
+    return {"published": [{"id": e["id"], "ticker": e["ticker"]} for e in events]}
+
+
+def _parse_tickers(tickers: str = None):
+    return {t.strip().upper() for t in tickers.split(",") if t.strip()} if tickers else None
+
+
+def _sse_event(event: dict) -> str:
+    name = event.get("event", "prediction")
+    body = event["data"] if name == "reset" else {"ticker": event["ticker"], **event["data"]}
+    return f"id: {event['id']}\nevent: {name}\ndata: {json.dumps(body)}\n\n"
+
+
+@app.get("/stream/predictions")
+async def stream_predictions(request: Request, tickers: str = None, since: str = None):
+    """
+    Server-Sent Events stream of new predictions.
+
+    Query params: tickers (comma separated, default all) and since (last event id seen).
+    Reconnecting EventSource clients send Last-Event-ID, which is used the same way, so
+    no update is missed while disconnected. Without a cursor the stream starts with the
+    latest prediction of each ticker. A cursor this process cannot resume from (issued
+    before a restart or by another worker) gets a 'reset' event, then that snapshot.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        since = last_event_id
+
+    async def events():
+        async for event in prediction_broker.subscribe(_parse_tickers(tickers), since):
+            if await request.is_disconnected():
+                break
+            yield ": keep-alive\n\n" if event is None else _sse_event(event)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket("/ws/predictions")
+async def websocket_predictions(websocket: WebSocket, tickers: str = None, since: str = None):
+    """
+    WebSocket stream of new predictions, as JSON messages with id, ticker and data.
+
+    Same query params as /stream/predictions; send the last id received as since to resume.
+    """
+    await websocket.accept()
+    try:
+        async for event in prediction_broker.subscribe(_parse_tickers(tickers), since):
+            if event is None:
+                await websocket.send_json({"event": "keep-alive"})
+                continue
+            await websocket.send_json({"event": event.get("event", "prediction"), "id": event["id"],
+                                       "ticker": event["ticker"], "data": event["data"]})
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/cascade-stats")
+def cascade_stats_endpoint():
+    """Share of requests each model answered, their latency and how often they agree."""
+    with cascade_stats["lock"]:
+        answered = dict(cascade_stats["answered_by"])
+        latencies = {name: list(values) for name, values in cascade_stats["latency_ms"].items()}
+        compared, agreed = dict(cascade_stats["compared"]), dict(cascade_stats["agreed"])
+    total = sum(answered.values())
+    return {
+        "enabled": state["forest"] is not None,
+        "confidence_threshold": CASCADE_CONFIDENCE,
+        "shadow_rate": CASCADE_SHADOW_RATE,
+        "requests": total,
+        "answered_by": answered,
+        "forest_share": round(answered.get("forest", 0) / total, 4) if total else None,
+        "latency_ms": {
+            name: {f"p{q}": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+            for name, values in latencies.items() if values
+        },
+        # confident: shadow LSTM runs on forest answers; ambiguous: every LSTM answer
+        "agreement": {name: {"compared": n, "agreement_rate": round(agreed.get(name, 0) / n, 4)}
+                      for name, n in compared.items()},
+    }
+
+@app.get("/cache-stats")
+def cache_stats():
+    return {
+        **prediction_cache.stats(),
+        "explanations": explanation_cache.stats(),
+        "stream": {**prediction_broker.stats, "subscribers": prediction_broker.subscriber_count},
+    }
+
 # Add a health check endpoint
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "model_loaded": model is not None, "scaler_loaded": scaler is not None}
+    return {
+        "status": "healthy" if state["ready"] else "starting",
+        "model_loaded": state["model"] is not None,
+        "scaler_loaded": state["scaler"] is not None,
+    }
+
+# Liveness: the process is up and serving HTTP
+@app.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+# Readiness: the model is loaded and warmed up
+@app.get("/health/ready")
+def readiness():
+    if state["ready"]:
+        return {"status": "ready"}
+    status = "failed" if state["error"] else "loading"
+    return JSONResponse(status_code=503, content={"status": status, "detail": state["error"]})
 
 # Add model info endpoint
 @app.get("/model-info")
 def model_info():
+    model = state["model"]
     try:
         return {
             "ticker": TICKER,
             "model_type": "LSTM",
+            "backend": state["backend"],
+            "model_version": state["model_version"],
+            "ready": state["ready"],
             "input_shape": model.input_shape if hasattr(model, 'input_shape') else "Unknown",
-            "output_shape": model.output_shape if hasattr(model, 'output_shape') else "Unknown"
+            "output_shape": model.output_shape if hasattr(model, 'output_shape') else "Unknown",
+            "startup_timings": state["timings"],
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving model info: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error retrieving model info: {e}")
+
+# Memory of the process answering the request, to compare pre-forked workers
+@app.get("/worker-info")
+def worker_info():
+    from src.serving.process_memory import process_memory
+    return {
+        "pid": os.getpid(),
+        "parent_pid": os.getppid(),
+        "backend": state["backend"],
+        "ready": state["ready"],
+        "memory": process_memory(),
+    }
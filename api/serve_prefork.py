@@ -0,0 +1,216 @@
+# file: api/serve_prefork.py
+import os
+
+# One BLAS thread per worker: the workers already use one core each
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+import argparse
+import gc
+import json
+import signal
+import socket
+import sys
+import time
+
+# main.py sits next to this file (api/ locally, /app in the container);
+# the project root holds src/ when run from the repository
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SCRIPT_DIR)
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+import main as api
+from src.serving.process_memory import process_memory
+
+REPORT_PATH = "reports/serving/prefork_memory.json"
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, log_level: str):
+    """Serves the app on the inherited listening socket until uvicorn shuts down."""
+    import uvicorn
+
+    config = uvicorn.Config(api.app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn_worker(sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            _run_worker(sock, log_level)
+        except BaseException as e:
+            print(f"Worker {os.getpid()} crashed: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+
+def _reload_and_replace_workers(worker_pids: list, sock: socket.socket, log_level: str):
+    """
+    Loads the model again in the parent if its files changed, then forks a new worker
+    for each old one before stopping the old one, so the socket is always served.
+    """
+    model_version = api._artifact_version()
+    if model_version == api.state["model_version"] or "missing" in model_version:
+        return
+    print(f"Model files changed, reloading ({model_version})")
+    api.load_artifacts(backend="numpy", reload=True)
+    if api.state["model_version"] != model_version:
+        # Load failed; the old workers keep serving the old model
+        return
+
+    gc.collect()
+    gc.freeze()
+    for index, old_pid in enumerate(list(worker_pids)):
+        worker_pids[index] = _spawn_worker(sock, log_level)
+        try:
+            os.kill(old_pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    print(f"Workers replaced: {worker_pids}")
+
+
+def report_worker_memory(parent_pid: int, worker_pids: list) -> dict:
+    """
+    Prints and saves RSS/PSS of the parent and every worker.
+
+    Sum of PSS is the real footprint of the group; sum of RSS is what N independently
+    loaded workers of the same size would take.
+    """
+    processes = {"parent": {"pid": parent_pid, **process_memory(parent_pid)}}
+    for i, pid in enumerate(worker_pids):
+        processes[f"worker_{i}"] = {"pid": pid, **process_memory(pid)}
+
+    def total(key):
+        values = [p[key] for p in processes.values() if p[key] is not None]
+        return round(sum(values), 1) if values else None
+
+    report = {
+        "workers": len(worker_pids),
+        "backend": api.state["backend"],
+        "processes": processes,
+        "total_rss_mb": total("rss_mb"),
+        "total_pss_mb": total("pss_mb"),
+    }
+
+    print(f"\n{'process':<12}{'pid':>8}{'rss (MB)':>12}{'pss (MB)':>12}{'shared (MB)':>14}{'private (MB)':>14}")
+    for name, p in processes.items():
+        print(f"{name:<12}{p['pid']:>8}{str(p['rss_mb']):>12}{str(p['pss_mb']):>12}"
+              f"{str(p['shared_mb']):>14}{str(p['private_mb']):>14}")
+    print(f"Total RSS: {report['total_rss_mb']} MB, total PSS (actual footprint): {report['total_pss_mb']} MB")
+
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = None, log_level: str = "warning",
+          report_after: float = 5.0):
+    """
+    Loads the model once in the parent, then forks workers sharing the listening socket.
+
+    The NumPy backend keeps the weights in one shared read-only mapping, so every
+    worker reads the same physical pages instead of holding its own copy. TensorFlow
+    is never imported, which also keeps fork safe.
+
+    Workers never reload the model themselves. The parent checks the model files every
+    PREDICTION_WATCH_SECONDS and, when they change, loads the new model once and replaces
+    the workers one at a time, so the new weights are shared too. Each worker still runs
+    its own prediction watcher and broker for its /stream and /ws subscribers, and models
+    of tickers other than TICKER are loaded lazily per worker.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind.
+        workers (int): Worker processes. Defaults to the CPU count.
+        log_level (str): uvicorn log level of the workers.
+        report_after (float): Seconds after startup to print the per-worker memory report.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    api.state["reload_on_change"] = False
+    api.load_artifacts(backend="numpy")
+    if not api.state["ready"]:
+        print(f"Not starting workers: {api.state['error']}")
+        sys.exit(1)
+
+    # Objects created so far are never collected, so the collector does not write to
+    # (and un-share) their pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind_socket(host, port)
+    worker_pids = [_spawn_worker(sock, log_level) for _ in range(workers)]
+    print(f"Serving on http://{host}:{port} with {workers} pre-forked workers: {worker_pids}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if report_after:
+        time.sleep(report_after)
+        if not stopping:
+            report_worker_memory(os.getpid(), worker_pids)
+
+    # Replace workers that die until asked to stop, and all of them when the model changes
+    next_model_check = time.monotonic() + api.PREDICTION_WATCH_SECONDS
+    while worker_pids:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid == 0:
+            if not stopping and time.monotonic() >= next_model_check:
+                _reload_and_replace_workers(worker_pids, sock, log_level)
+                next_model_check = time.monotonic() + api.PREDICTION_WATCH_SECONDS
+            time.sleep(0.5)
+            continue
+        # Workers replaced after a model change are no longer listed
+        if pid not in worker_pids:
+            continue
+        index = worker_pids.index(pid)
+        if stopping:
+            worker_pids.pop(index)
+        else:
+            print(f"Worker {pid} exited with status {status}, restarting")
+            worker_pids[index] = _spawn_worker(sock, log_level)
+
+    sock.close()
+    print("All workers stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the prediction API from pre-forked workers sharing one model copy.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--report-after", type=float, default=5.0,
+                        help="Seconds after startup to print per-worker RSS/PSS (0 disables)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.log_level, args.report_after)
@@ -0,0 +1,242 @@
+# file: benchmarks/load_test.py
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+# Add project root to path to allow imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from benchmarks import synthetic_data
+
+# Request streams are JSONL, one request per line:
+# {"offset_ms": 12.5, "method": "POST", "path": "/predict", "body": {"data": [[...], ...]}}
+# offset_ms is the send time relative to the first request. api/main.py writes the same format
+# when REQUEST_LOG_PATH is set, so recorded traffic can be replayed here.
+STREAM_PATH = os.path.join(PROJECT_ROOT, "data", "loadtest", "requests.jsonl")
+RESULTS_PATH = os.path.join(PROJECT_ROOT, "reports", "loadtest", "results.json")
+
+# Share of each request type in synthetic streams
+DEFAULT_MIX = {"predict": 0.8, "latest": 0.15, "explain": 0.05}
+
+
+def synthetic_windows(n_windows: int, time_steps: int, n_features: int, seed: int = 0) -> np.ndarray:
+    """
+    Consecutive windows of a synthetic final dataset, MinMax-scaled like the API's inputs.
+
+    Returns:
+        np.ndarray: (n_windows, time_steps, n_features) float32.
+    """
+    df = synthetic_data.make_final_dataset(n_days=n_windows + time_steps, seed=seed)
+    values = df[synthetic_data.FINAL_FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    if n_features != values.shape[1]:
+        raise ValueError(f"Synthetic data has {values.shape[1]} features, the model expects {n_features}")
+    low, high = values.min(axis=0), values.max(axis=0)
+    scaled = (values - low) / np.where(high > low, high - low, 1)
+    windows = np.lib.stride_tricks.sliding_window_view(scaled, time_steps, axis=0)[:n_windows]
+    return windows.transpose(0, 2, 1).astype(np.float32)
+
+
+def synthetic_stream(n_requests: int, qps: float, time_steps: int = 5, n_features: int = 24,
+                     unique_windows: int = 200, mix: dict = None, ticker: str = "AAPL", seed: int = 0) -> list:
+    """
+    A request stream with Poisson arrivals at qps and a mix of /predict, /predict/latest and /explain.
+
+    Windows are drawn from a pool of unique_windows, so the pool size sets the prediction
+    cache hit rate.
+    """
+    rng = np.random.default_rng(seed)
+    mix = mix or DEFAULT_MIX
+    windows = synthetic_windows(unique_windows, time_steps, n_features, seed)
+    kinds = rng.choice(list(mix), size=n_requests, p=np.array(list(mix.values())) / sum(mix.values()))
+    offsets = np.cumsum(rng.exponential(1000 / qps, n_requests)) if qps > 0 else np.zeros(n_requests)
+    offsets -= offsets[0]
+
+    stream = []
+    for kind, offset in zip(kinds, offsets):
+        request = {"offset_ms": round(float(offset), 3), "method": "POST", "path": f"/{kind}"}
+        if kind == "latest":
+            request.update(method="GET", path=f"/predict/latest/{ticker}")
+        else:
+            request["body"] = {"data": windows[rng.integers(unique_windows)].tolist()}
+        stream.append(request)
+    return stream
+
+
+def save_stream(stream: list, path: str = STREAM_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for request in stream:
+            f.write(json.dumps(request) + "\n")
+    print(f"Recorded {len(stream)} requests to {path}")
+
+
+def load_stream(path: str = STREAM_PATH) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {}
+    values = np.array(values)
+    summary = {f"p{q}_ms": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+    summary["max_ms"] = round(float(values.max()), 3)
+    return summary
+
+
+async def drive(client, stream: list, concurrency: int = 32, speed: float = 1.0, timeout: float = 30) -> list:
+    """
+    Sends the stream open-loop: request i is due at offset_ms / speed after the start,
+    whether or not earlier requests have finished. At most `concurrency` requests are in
+    flight; a request waiting for a slot keeps its due time, so queueing shows up in its
+    latency instead of silently lowering the offered load.
+
+    speed=0 ignores the offsets and sends as fast as the concurrency limit allows.
+
+    Returns:
+        list: One record per request with path, status, latency_ms (from its due time),
+            service_ms (from its actual send) and error.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def send(request):
+        due = start + (request["offset_ms"] / 1000 / speed if speed > 0 else 0)
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with semaphore:
+            sent = loop.time()
+            record = {"path": request["path"], "status": None, "error": None}
+            try:
+                response = await client.request(request["method"], request["path"],
+                                                json=request.get("body"), timeout=timeout)
+                record["status"] = response.status_code
+                if response.status_code >= 400:
+                    record["error"] = response.text[:200]
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+            done = loop.time()
+        record["latency_ms"] = (done - due) * 1000
+        record["service_ms"] = (done - sent) * 1000
+        return record
+
+    return await asyncio.gather(*(send(r) for r in stream))
+
+
+def summarize(records: list, elapsed: float) -> dict:
+    """Latency percentiles, throughput and error rate, overall and per endpoint."""
+    def section(items):
+        errors = [r for r in items if r["error"] is not None]
+        return {
+            "requests": len(items),
+            "error_rate": round(len(errors) / len(items), 4) if items else None,
+            "status_codes": dict(Counter(str(r["status"]) for r in items)),
+            "latency": _percentiles([r["latency_ms"] for r in items]),
+            "service": _percentiles([r["service_ms"] for r in items]),
+        }
+
+    by_endpoint = {}
+    for record in records:
+        endpoint = "/predict/latest" if record["path"].startswith("/predict/latest") else record["path"]
+        by_endpoint.setdefault(endpoint, []).append(record)
+    return {
+        "throughput_rps": round(len(records) / elapsed, 1) if elapsed > 0 else None,
+        "duration_seconds": round(elapsed, 3),
+        **section(records),
+        "endpoints": {name: section(items) for name, items in sorted(by_endpoint.items())},
+    }
+
+
+async def run_load_test(stream: list, base_url: str = None, concurrency: int = 32, speed: float = 1.0,
+                        backend: str = "numpy") -> dict:
+    """
+    Drives the API with a request stream and returns the summary.
+
+    Args:
+        stream (list): Requests (see synthetic_stream / load_stream).
+        base_url (str): Server to call, e.g. http://localhost:8000. None serves api.main.app
+            in-process through httpx's ASGI transport.
+        concurrency (int): Most requests in flight.
+        speed (float): Replay speed relative to the stream's offsets (0 = as fast as possible).
+        backend (str): Model backend for the in-process server.
+    """
+    import httpx
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url,
+                                   limits=httpx.Limits(max_connections=concurrency))
+    else:
+        sys.path.append(os.path.join(PROJECT_ROOT, "api"))
+        import main as api
+
+        # ASGITransport does not run the lifespan, so load the model up front
+        api.load_artifacts(backend=backend)
+        if not api.state["ready"]:
+            raise RuntimeError(f"Model failed to load: {api.state['error']}")
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://loadtest")
+
+    async with client:
+        start = time.perf_counter()
+        records = await drive(client, stream, concurrency=concurrency, speed=speed)
+        elapsed = time.perf_counter() - start
+    return summarize(records, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the prediction API with recorded or synthetic traffic.")
+    parser.add_argument("--url", default=None, help="Server URL; omit to run the API in-process")
+    parser.add_argument("--replay", nargs="?", const=STREAM_PATH, default=None,
+                        help="Replay a recorded JSONL stream (default: data/loadtest/requests.jsonl)")
+    parser.add_argument("--record", nargs="?", const=STREAM_PATH, default=None,
+                        help="Save the synthetic stream as JSONL before running it")
+    parser.add_argument("--requests", type=int, default=2000, help="Synthetic requests to send")
+    parser.add_argument("--qps", type=float, default=100, help="Offered load of the synthetic stream")
+    parser.add_argument("--concurrency", type=int, default=32, help="Most requests in flight")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (0 = as fast as possible)")
+    parser.add_argument("--unique-windows", type=int, default=200, help="Distinct input windows (sets the cache hit rate)")
+    parser.add_argument("--backend", default="numpy", choices=["numpy", "tensorflow"], help="In-process model backend")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    if args.replay:
+        stream = load_stream(args.replay)
+        print(f"Replaying {len(stream)} requests from {args.replay}")
+    else:
+        stream = synthetic_stream(args.requests, args.qps, unique_windows=args.unique_windows)
+        if args.record:
+            save_stream(stream, args.record)
+
+    summary = asyncio.run(run_load_test(stream, args.url, args.concurrency, args.speed, args.backend))
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "target": args.url or "in-process",
+            "stream": args.replay or "synthetic",
+            "offered_qps": args.qps if not args.replay else None,
+            "concurrency": args.concurrency,
+            "speed": args.speed,
+        },
+        "summary": summary,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Throughput: {summary['throughput_rps']} req/s, error rate: {summary['error_rate']:.2%}")
+    for endpoint, section in summary["endpoints"].items():
+        print(f"   {endpoint}: {section['requests']} requests, latency {section['latency']}")
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+# file: benchmarks/run_benchmarks.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path to allow imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from benchmarks import synthetic_data
+
+BASELINE_PATH = os.path.join(PROJECT_ROOT, "benchmarks", "baseline.json")
+RESULTS_PATH = os.path.join(PROJECT_ROOT, "reports", "benchmarks", "results.json")
+
+# name -> factory returning {"run": callable, "prepare": optional callable, "items": int}
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark factory when its dependencies or artifacts are unavailable."""
+
+
+def benchmark(name: str):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silences the progress prints of the pipeline functions while timing them."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@benchmark("create_sequences")
+def _bench_create_sequences():
+    try:
+        from src.models.train_lstm import create_sequences
+    except ImportError as e:
+        raise SkipBenchmark(e)
+
+    df = synthetic_data.make_final_dataset(n_days=5000)
+    X, y = df.drop(columns="target"), df["target"]
+    return {"run": lambda: create_sequences(X, y, 30), "items": len(X) - 30}
+
+
+@benchmark("add_technical_indicators")
+def _bench_add_technical_indicators():
+    try:
+        from src.features.technical_indicators import add_technical_indicators
+    except ImportError as e:
+        raise SkipBenchmark(e)
+
+    price_df = synthetic_data.make_price_data(n_days=500)
+    return {"run": lambda: add_technical_indicators(price_df.copy()), "items": len(price_df)}
+
+
+@benchmark("indicator_panel_500")
+def _bench_indicator_panel_500():
+    from src.features.indicator_kernels import compute_indicator_panel
+
+    # Close prices of 500 tickers over the same days as the single-ticker benchmark
+    close = pd.DataFrame({
+        f"T{i:03d}": synthetic_data.make_price_data(n_days=500, seed=i)["close"] for i in range(500)
+    })
+    return {"run": lambda: compute_indicator_panel(close), "items": close.size}
+
+
+@benchmark("aggregate_sentiment_scores")
+def _bench_aggregate_sentiment_scores():
+    from src.data.combine_all_data import aggregate_sentiment_scores
+
+    reddit_df = synthetic_data.make_reddit_sentiment(n_rows=5000)
+    return {"run": lambda: aggregate_sentiment_scores(reddit_df.copy(), "created_utc"), "items": len(reddit_df)}
+
+
+@benchmark("preprocess_text")
+def _bench_preprocess_text():
+    from src.preprocessing.daily_preprocessing import preprocess_text
+
+    texts = synthetic_data.make_texts(n_texts=2000)
+    return {"run": lambda: [preprocess_text(t) for t in texts], "items": len(texts)}
+
+
+@benchmark("combine_and_save_data")
+def _bench_combine_and_save_data():
+    from src.data.combine_all_data import combine_and_save_data
+
+    workdir = tempfile.mkdtemp(prefix="bench_combine_")
+    reddit_df = synthetic_data.make_reddit_sentiment(n_rows=5000)
+    historical_path = os.path.join(workdir, "historical.csv")
+    daily_path = os.path.join(workdir, "daily.csv")
+    reddit_df.iloc[-200:].to_csv(daily_path, index=False)
+
+    def prepare():
+        # combine_and_save_data rewrites the historical file, so restore it before each run
+        reddit_df.iloc[:-150].to_csv(historical_path, index=False)
+
+    return {
+        "prepare": prepare,
+        "run": lambda: combine_and_save_data(historical_path, daily_path, unique_subset=["id"]),
+        "cleanup": lambda: shutil.rmtree(workdir, ignore_errors=True),
+        "items": len(reddit_df),
+    }
+
+
+@benchmark("create_final_dataset")
+def _bench_create_final_dataset():
+    from src.data import combine_all_data
+
+    workdir = tempfile.mkdtemp(prefix="bench_final_")
+    final_dir = os.path.join(workdir, "data", "final")
+    os.makedirs(final_dir)
+    tech_df = synthetic_data.make_technical_indicators(n_days=500)
+    news_df = synthetic_data.make_news_sentiment(n_rows=1000, n_days=700)
+    reddit_df = synthetic_data.make_reddit_sentiment(n_rows=5000, n_days=700)
+
+    def prepare():
+        tech_df.to_csv(os.path.join(final_dir, "BENCH_technical_indicators.csv"), index=False)
+        news_df.to_csv(os.path.join(final_dir, "BENCH_news_sentiment.csv"), index=False)
+        reddit_df.to_csv(os.path.join(final_dir, "BENCH_reddit_sentiment.csv"), index=False)
+
+    def run():
+        # create_final_dataset resolves its paths relative to the working directory
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            combine_all_data.create_final_dataset("BENCH")
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "prepare": prepare,
+        "run": run,
+        "cleanup": lambda: shutil.rmtree(workdir, ignore_errors=True),
+        "items": len(tech_df),
+    }
+
+
+@benchmark("finbert_throughput")
+def _bench_finbert_throughput():
+    # Only use a FinBERT copy that is already in the local Hugging Face cache
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    try:
+        from src.features.sentiment_analysis import analyze_sentiment
+        texts = synthetic_data.make_texts(n_texts=64)
+        with _quiet():
+            analyze_sentiment(texts[:2])
+    except Exception as e:
+        raise SkipBenchmark(f"FinBERT unavailable offline: {e}")
+
+    return {"run": lambda: analyze_sentiment(texts), "items": len(texts)}
+
+
+@benchmark("predict_latency")
+def _bench_predict_latency():
+    try:
+        from fastapi.testclient import TestClient
+        from api.main import app
+    except Exception as e:
+        raise SkipBenchmark(f"API unavailable: {e}")
+
+    client = TestClient(app)
+    client.__enter__()
+
+    # The model loads in the background after startup
+    deadline = time.time() + 300
+    while True:
+        ready = client.get("/health/ready")
+        if ready.status_code == 200:
+            break
+        if time.time() > deadline or ready.json()["status"] == "failed":
+            client.__exit__(None, None, None)
+            raise SkipBenchmark(f"Model not ready: {ready.json()}")
+        time.sleep(0.5)
+    info = client.get("/model-info").json()
+    _, time_steps, n_features = info["input_shape"]
+    window = np.random.default_rng(0).uniform(0, 1, (time_steps, n_features)).tolist()
+
+    def run():
+        response = client.post("/predict", json={"data": window})
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code}: {response.text}")
+
+    return {"run": run, "cleanup": lambda: client.__exit__(None, None, None), "items": 1}
+
+
+def run_benchmark(name: str, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Times one benchmark: untimed prepare before every run, warm-up runs discarded.
+    """
+    cwd = os.getcwd()
+    os.chdir(PROJECT_ROOT)
+    try:
+        with _quiet():
+            spec = BENCHMARKS[name]()
+    except SkipBenchmark as e:
+        return {"status": "skipped", "reason": str(e)}
+    finally:
+        os.chdir(cwd)
+
+    prepare = spec.get("prepare", lambda: None)
+    timings = []
+    try:
+        for i in range(warmup + repeat):
+            prepare()
+            with _quiet():
+                start = time.perf_counter()
+                spec["run"]()
+                elapsed = time.perf_counter() - start
+            if i >= warmup:
+                timings.append(elapsed)
+    except Exception as e:
+        return {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+    finally:
+        spec.get("cleanup", lambda: None)()
+
+    median = statistics.median(timings)
+    return {
+        "status": "ok",
+        "repeat": repeat,
+        "min_seconds": min(timings),
+        "median_seconds": median,
+        "mean_seconds": statistics.mean(timings),
+        "stdev_seconds": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "items": spec["items"],
+        "items_per_second": spec["items"] / median if median > 0 else None,
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compares median timings with the baseline.
+
+    Returns:
+        list: Names of benchmarks whose median is slower than baseline * (1 + tolerance).
+    """
+    regressions = []
+    print(f"\n{'benchmark':<28}{'median (ms)':>14}{'baseline (ms)':>16}{'change':>10}")
+    for name, result in results.items():
+        if result["status"] != "ok":
+            print(f"{name:<28}{result['status']:>14}   {result['reason'][:60]}")
+            continue
+        current = result["median_seconds"]
+        reference = baseline.get(name, {}).get("median_seconds")
+        if reference is None:
+            print(f"{name:<28}{current * 1000:>14.2f}{'-':>16}{'new':>10}")
+            continue
+        change = current / reference - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28}{current * 1000:>14.2f}{reference * 1000:>16.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline benchmarks of the pipeline hot paths.")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging a regression")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Where to write the results JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        print(f"Running {name}...")
+        results[name] = run_benchmark(name, repeat=args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# file: benchmarks/synthetic_data.py
+import numpy as np
+import pandas as pd
+
+# Feature columns of data/final/{ticker}_final_dataset.csv
+PRICE_COLUMNS = ["close", "high", "low", "open", "volume"]
+INDICATOR_COLUMNS = [
+    "SMA_20", "SMA_50", "RSI_14", "MACD_12_26_9", "MACDh_12_26_9", "MACDs_12_26_9",
+    "BBL_20_2.0", "BBM_20_2.0", "BBU_20_2.0", "BBB_20_2.0", "BBP_20_2.0",
+]
+SENTIMENT_COLUMNS = ["avg_sentiment_score", "num_articles", "positive_ratio", "negative_ratio"]
+FINAL_FEATURE_COLUMNS = (
+    PRICE_COLUMNS + INDICATOR_COLUMNS + SENTIMENT_COLUMNS + [f"{c}_reddit" for c in SENTIMENT_COLUMNS]
+)
+
+_WORDS = (
+    "apple stock earnings iphone revenue guidance beats misses analysts upgrade downgrade "
+    "shares rally slump market nasdaq tech buyback dividend ai services growth outlook "
+    "record quarter china sales supply chain tariff fed rates investors bullish bearish"
+).split()
+_SENTIMENTS = np.array(["positive", "neutral", "negative"])
+
+
+def make_price_data(n_days: int = 500, seed: int = 0) -> pd.DataFrame:
+    """OHLCV frame indexed by business day, shaped like the ingested Yahoo Finance data."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_days, name="Date")
+    close = 150 * np.exp(np.cumsum(rng.normal(0, 0.015, n_days)))
+    open_ = close * (1 + rng.normal(0, 0.005, n_days))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n_days))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n_days))
+    volume = rng.integers(40_000_000, 120_000_000, n_days).astype(float)
+    return pd.DataFrame(
+        {"close": close, "high": high, "low": low, "open": open_, "volume": volume}, index=dates
+    )
+
+
+def make_minute_bars(tickers: list = ("AAPL",), n_minutes: int = 390, seed: int = 0) -> pd.DataFrame:
+    """Long-format 1-minute bars (timestamp, ticker, OHLCV), the input of FileReplaySource."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2024-01-02 14:30", periods=n_minutes, freq="min", tz="UTC")
+    frames = []
+    for ticker in tickers:
+        close = 150 * np.exp(np.cumsum(rng.normal(0, 0.001, n_minutes)))
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        frames.append(pd.DataFrame({
+            "timestamp": timestamps,
+            "ticker": ticker,
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + rng.uniform(0, 0.0005, n_minutes)),
+            "low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.0005, n_minutes)),
+            "close": close,
+            "volume": rng.integers(50_000, 500_000, n_minutes).astype(float),
+        }))
+    return pd.concat(frames).sort_values(["timestamp", "ticker"], kind="stable").reset_index(drop=True)
+
+
+def make_texts(n_texts: int = 1000, min_words: int = 6, max_words: int = 16, seed: int = 0) -> list:
+    """Headline-like texts with punctuation, digits and tickers."""
+    rng = np.random.default_rng(seed)
+    texts = []
+    for _ in range(n_texts):
+        words = rng.choice(_WORDS, rng.integers(min_words, max_words)).tolist()
+        words[0] = words[0].capitalize()
+        texts.append(f"{' '.join(words)} as $AAPL moves {rng.integers(1, 9)}%!")
+    return texts
+
+
+def make_news_sentiment(n_rows: int = 1000, n_days: int = 250, seed: int = 0) -> pd.DataFrame:
+    """Rows shaped like data/final/{ticker}_news_sentiment.csv."""
+    rng = np.random.default_rng(seed)
+    published = pd.Timestamp("2023-01-02") + pd.to_timedelta(rng.integers(0, n_days * 86400, n_rows), unit="s")
+    titles = make_texts(n_rows, seed=seed)
+    return pd.DataFrame({
+        "publishedAt": published.strftime("%Y-%m-%d %H:%M:%S"),
+        "title": titles,
+        "description": [t + " More details inside." for t in titles],
+        "article_url": [f"https://example.com/news/{i}" for i in range(n_rows)],
+        "sentiment": rng.choice(_SENTIMENTS, n_rows),
+        "sentiment_score": rng.uniform(0.4, 1.0, n_rows),
+    })
+
+
+def make_reddit_sentiment(n_rows: int = 5000, n_days: int = 250, seed: int = 1) -> pd.DataFrame:
+    """Rows shaped like data/final/{ticker}_reddit_sentiment.csv."""
+    rng = np.random.default_rng(seed)
+    created = pd.Timestamp("2023-01-02") + pd.to_timedelta(rng.integers(0, n_days * 86400, n_rows), unit="s")
+    titles = make_texts(n_rows, seed=seed)
+    return pd.DataFrame({
+        "id": [f"t3_{i:07d}" for i in range(n_rows)],
+        "created_utc": created.strftime("%Y-%m-%d %H:%M:%S"),
+        "title": titles,
+        "selftext": [" ".join(titles[max(0, i - 3):i + 1]) for i in range(n_rows)],
+        "score": rng.integers(0, 5000, n_rows),
+        "num_comments": rng.integers(0, 800, n_rows),
+        "subreddit": rng.choice(["stocks", "wallstreetbets", "investing", "StockMarket"], n_rows),
+        "sentiment": rng.choice(_SENTIMENTS, n_rows),
+        "sentiment_score": rng.uniform(0.4, 1.0, n_rows),
+    })
+
+
+def make_technical_indicators(n_days: int = 500, seed: int = 0) -> pd.DataFrame:
+    """Rows shaped like data/final/{ticker}_technical_indicators.csv (Date as a column)."""
+    rng = np.random.default_rng(seed)
+    df = make_price_data(n_days, seed)
+    for column in INDICATOR_COLUMNS:
+        df[column] = rng.normal(0, 1, n_days)
+    return df.reset_index()
+
+
+def make_final_dataset(n_days: int = 500, seed: int = 0) -> pd.DataFrame:
+    """Feature matrix shaped like data/final/{ticker}_final_dataset.csv."""
+    rng = np.random.default_rng(seed)
+    df = make_price_data(n_days, seed)
+    for column in FINAL_FEATURE_COLUMNS[len(PRICE_COLUMNS):]:
+        df[column] = rng.uniform(0, 1, n_days)
+    df["target"] = (df["close"].shift(-1) > df["close"]).astype(int)
+    return df
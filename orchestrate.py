@@ -1,6 +1,13 @@
 import os
 import sys
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+
+# Measured from before Prefect is imported, for the startup report
+PROCESS_START = time.perf_counter()
+
+import pandas as pd
 from prefect import flow, task
 from prefect.schedules import IntervalSchedule
 from prefect.task_runners import SequentialTaskRunner
@@ -8,32 +15,65 @@ from prefect.task_runners import SequentialTaskRunner
 # Add project root to path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import data ingestion modules
-from src.data.price_ingestion_daily import ingest_price_data
-from src.data.news_ingestion_daily import ingest_daily_news
-from src.data.reddit_ingestion_daily import fetch_reddit_data
+# Stage implementations (yfinance, praw, torch/transformers, TensorFlow, evidently) are
+# imported inside their tasks, so a run only loads what its stages use.
+# Import task result cache
+from src.utils.task_cache import compute_fingerprint, load_cached_outputs, save_cached_outputs
+
+# Texts scored per chunk; a failed sentiment task resumes from its last finished chunk
+SENTIMENT_CHUNKSIZE = 1000
+# Also score news descriptions and Reddit selftext in token windows. Off by default: the
+# extra columns are not aggregated into the model features yet, so the pass only costs time.
+SCORE_LONG_TEXT = os.getenv("SCORE_LONG_TEXT", "off").lower() == "on"
+
+# Seconds until the module was loaded, and spent importing each stage's dependencies
+STARTUP_TIMINGS = {"module_load_seconds": round(time.perf_counter() - PROCESS_START, 3)}
 
-# Import feature engineering modules
-from src.features.technical_indicators import add_technical_indicators
-from src.features.sentiment_analysis import process_sentiment_for_source
 
-# Import data combination and model training modules
-from src.data.combine_all_data import create_final_dataset
-from src.models.train_lstm import train_lstm_model
+@contextmanager
+def _timed_import(stage: str):
+    """Records how long the imports of a stage take the first time they run."""
+    start = time.perf_counter()
+    yield
+    STARTUP_TIMINGS.setdefault(f"{stage}_import_seconds", round(time.perf_counter() - start, 3))
+
+
+def startup_report(entry_point: str) -> dict:
+    """Prints the module load and per-stage import times of this run."""
+    report = {"entry_point": entry_point, **STARTUP_TIMINGS}
+    print(f"Startup report ({entry_point}):")
+    for key, value in report.items():
+        if key != "entry_point":
+            print(f"   {key}: {value}s")
+    return report
 
 @task(name="Ingest Price Data", retries=3, retry_delay_seconds=60)
-def price_ingestion_task(ticker: str):
+def price_ingestion_task(ticker: str, force: bool = False):
     """Task to ingest daily price data"""
     current_date = datetime.now().strftime('%Y-%m-%d')
     output_path = f"data/live/price/{ticker}_price_data_{current_date}.csv"
+
+    # Skip if today's prices were already fetched by the same code
+    fingerprint = compute_fingerprint(
+        "price_ingestion",
+        params={"ticker": ticker, "date": current_date},
+        code_paths=["src/data/price_ingestion_daily.py"],
+    )
+    cached = load_cached_outputs("price_ingestion", fingerprint, force)
+    if cached:
+        return cached[0]
     
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
+    with _timed_import("price_ingestion"):
+        from src.data.price_ingestion_daily import ingest_price_data
+
     # Fetch and save data
     price_df = ingest_price_data(ticker, current_date)
     if not price_df.empty:
         price_df.to_csv(output_path)
+        save_cached_outputs("price_ingestion", fingerprint, [output_path])
         print(f"Price data saved to {output_path}")
         return output_path
     else:
@@ -41,18 +81,31 @@ def price_ingestion_task(ticker: str):
         return None
 
 @task(name="Ingest News Data", retries=2, retry_delay_seconds=30)
-def news_ingestion_task(ticker: str):
+def news_ingestion_task(ticker: str, force: bool = False):
     """Task to ingest daily news data"""
     current_date = datetime.now().strftime('%Y-%m-%d')
     output_path = f"data/live/news/{ticker}_news_data_{current_date}.csv"
+
+    fingerprint = compute_fingerprint(
+        "news_ingestion",
+        params={"ticker": ticker, "date": current_date, "limit": 10},
+        code_paths=["src/data/news_ingestion_daily.py"],
+    )
+    cached = load_cached_outputs("news_ingestion", fingerprint, force)
+    if cached:
+        return cached[0]
     
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
+    with _timed_import("news_ingestion"):
+        from src.data.news_ingestion_daily import ingest_daily_news
+
     # Fetch daily news
     news_df = ingest_daily_news(ticker, current_date, limit=10)
     if not news_df.empty:
         news_df.to_csv(output_path, index=False)
+        save_cached_outputs("news_ingestion", fingerprint, [output_path])
         print(f"News data saved to {output_path}")
         return output_path
     else:
@@ -61,7 +114,7 @@ def news_ingestion_task(ticker: str):
 
 
 @task(name="Ingest Reddit Data", retries=2, retry_delay_seconds=30)
-def reddit_ingestion_task(ticker: str):
+def reddit_ingestion_task(ticker: str, force: bool = False):
     """Task to ingest daily Reddit data"""
     current_date = datetime.now().strftime('%Y-%m-%d')
     output_path = f"data/live/reddit/{ticker}_reddit_data_{current_date}.csv"
@@ -81,11 +134,24 @@ def reddit_ingestion_task(ticker: str):
     # Query and subreddits for Apple stock
     query = f"({ticker} OR Apple OR ${ticker} OR '{ticker} stock' OR 'Apple stock' OR 'Apple earnings')"
     subreddits = ["stocks", "wallstreetbets", "investing", "StockMarket"]
+
+    fingerprint = compute_fingerprint(
+        "reddit_ingestion",
+        params={"ticker": ticker, "date": current_date, "query": query, "subreddits": subreddits},
+        code_paths=["src/data/reddit_ingestion_daily.py"],
+    )
+    cached = load_cached_outputs("reddit_ingestion", fingerprint, force)
+    if cached:
+        return cached[0]
     
+    with _timed_import("reddit_ingestion"):
+        from src.data.reddit_ingestion_daily import fetch_reddit_data
+
     # Fetch Reddit data
     reddit_df = fetch_reddit_data(client_id, client_secret, user_agent, query, subreddits)
     if not reddit_df.empty:
         reddit_df.to_csv(output_path, index=False)
+        save_cached_outputs("reddit_ingestion", fingerprint, [output_path])
         print(f"Reddit data saved to {output_path}")
         return output_path
     else:
@@ -94,7 +160,7 @@ def reddit_ingestion_task(ticker: str):
 
 
 @task(name="Generate Technical Indicators")
-def technical_indicators_task(price_data_path: str):
+def technical_indicators_task(price_data_path: str, force: bool = False):
     """Task to generate technical indicators from price data"""
     if not price_data_path or not os.path.exists(price_data_path):
         print(f"Price data not found at {price_data_path}")
@@ -103,7 +169,21 @@ def technical_indicators_task(price_data_path: str):
     current_date = datetime.now().strftime('%Y-%m-%d')
     ticker = os.path.basename(price_data_path).split('_')[0]
     output_path = f"data/featured/technical/{ticker}_technical_indicators_{current_date}.csv"
+
+    fingerprint = compute_fingerprint(
+        "technical_indicators",
+        input_paths=[price_data_path],
+        params={"output_path": output_path},
+        code_paths=["src/features/technical_indicators.py", "src/features/indicator_kernels.py"],
+    )
+    cached = load_cached_outputs("technical_indicators", fingerprint, force)
+    if cached:
+        return cached[0]
     
+    with _timed_import("technical_indicators"):
+        from src.features.technical_indicators import add_technical_indicators
+        from src.features.feature_store import upsert_features, TECHNICAL_INDICATORS_TABLE
+
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
@@ -130,12 +210,14 @@ def technical_indicators_task(price_data_path: str):
     
     # Save results
     indicators_df.to_csv(output_path)
+    upsert_features(indicators_df, ticker, table=TECHNICAL_INDICATORS_TABLE)
+    save_cached_outputs("technical_indicators", fingerprint, [output_path])
     print(f"Technical indicators saved to {output_path}")
     return output_path
 
 
 @task(name="Process News Sentiment")
-def news_sentiment_task(news_data_path: str):
+def news_sentiment_task(news_data_path: str, force: bool = False):
     """Task to process sentiment from news data"""
     if not news_data_path or not os.path.exists(news_data_path):
         print(f"News data not found at {news_data_path}")
@@ -144,18 +226,35 @@ def news_sentiment_task(news_data_path: str):
     current_date = datetime.now().strftime('%Y-%m-%d')
     ticker = os.path.basename(news_data_path).split('_')[0]
     output_path = f"data/featured/news/{ticker}_news{current_date}_sentiment.csv"
+    long_text_column = 'description' if SCORE_LONG_TEXT else None
+
+    fingerprint = compute_fingerprint(
+        "news_sentiment",
+        input_paths=[news_data_path],
+        params={"output_path": output_path, "text_column": "title", "long_text_column": long_text_column},
+        code_paths=["src/features/sentiment_analysis.py", "src/features/text_dedup.py"],
+    )
+    cached = load_cached_outputs("news_sentiment", fingerprint, force)
+    if cached:
+        return cached[0]
     
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
+    with _timed_import("sentiment"):
+        from src.features.sentiment_analysis import process_sentiment_for_source
+
     # Process sentiment
-    process_sentiment_for_source(news_data_path, output_path, text_column='title')
+    process_sentiment_for_source(
+        news_data_path, output_path, text_column='title', chunksize=SENTIMENT_CHUNKSIZE, long_text_column=long_text_column
+    )
+    save_cached_outputs("news_sentiment", fingerprint, [output_path])
     print(f"News sentiment saved to {output_path}")
     return output_path
 
 
 @task(name="Process Reddit Sentiment")
-def reddit_sentiment_task(reddit_data_path: str):
+def reddit_sentiment_task(reddit_data_path: str, force: bool = False):
     """Task to process sentiment from Reddit data"""
     if not reddit_data_path or not os.path.exists(reddit_data_path):
         print(f"Reddit data not found at {reddit_data_path}")
@@ -164,22 +263,67 @@ def reddit_sentiment_task(reddit_data_path: str):
     current_date = datetime.now().strftime('%Y-%m-%d')
     ticker = os.path.basename(reddit_data_path).split('_')[0]
     output_path = f"data/featured/reddit/{ticker}_reddit{current_date}_sentiment.csv"
+    long_text_column = 'selftext' if SCORE_LONG_TEXT else None
+
+    fingerprint = compute_fingerprint(
+        "reddit_sentiment",
+        input_paths=[reddit_data_path],
+        params={"output_path": output_path, "text_column": "title", "long_text_column": long_text_column},
+        code_paths=["src/features/sentiment_analysis.py", "src/features/text_dedup.py"],
+    )
+    cached = load_cached_outputs("reddit_sentiment", fingerprint, force)
+    if cached:
+        return cached[0]
     
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
+    with _timed_import("sentiment"):
+        from src.features.sentiment_analysis import process_sentiment_for_source
+
     # Process sentiment
-    process_sentiment_for_source(reddit_data_path, output_path, text_column='title')
+    process_sentiment_for_source(
+        reddit_data_path, output_path, text_column='title', chunksize=SENTIMENT_CHUNKSIZE, long_text_column=long_text_column
+    )
+    save_cached_outputs("reddit_sentiment", fingerprint, [output_path])
     print(f"Reddit sentiment saved to {output_path}")
     return output_path
 
 
+def _combine_inputs(ticker: str) -> list:
+    """Files read by create_final_dataset: today's featured files and the historical files."""
+    current_date = datetime.today().strftime('%Y-%m-%d')
+    return [
+        f"data/featured/price/technical_indicators_{current_date}.csv",
+        f"data/featured/news/news{current_date}.csv",
+        f"data/featured/reddit/reddit{current_date}.csv",
+        f"data/final/{ticker}_technical_indicators.csv",
+        f"data/final/{ticker}_news_sentiment.csv",
+        f"data/final/{ticker}_reddit_sentiment.csv",
+    ]
+
+
 @task(name="Combine All Data")
-def combine_data_task(ticker: str):
+def combine_data_task(ticker: str, force: bool = False):
     """Task to combine all processed data into a final dataset"""
-    create_final_dataset(ticker)
     final_dataset_path = f"data/final/{ticker}_final_dataset.csv"
+    code_paths = ["src/data/combine_all_data.py"]
+
+    fingerprint = compute_fingerprint("combine_data", _combine_inputs(ticker), {"ticker": ticker}, code_paths)
+    cached = load_cached_outputs("combine_data", fingerprint, force)
+    if cached:
+        return cached[0]
+
+    with _timed_import("combine_data"):
+        from src.data.combine_all_data import create_final_dataset
+
+    create_final_dataset(ticker)
     if os.path.exists(final_dataset_path):
+        # Combining merges the daily files into the historical files in place, so a rerun
+        # sees the updated historical files. Record the result under that state as well.
+        save_cached_outputs("combine_data", fingerprint, [final_dataset_path])
+        rerun_fingerprint = compute_fingerprint("combine_data", _combine_inputs(ticker), {"ticker": ticker}, code_paths)
+        save_cached_outputs("combine_data", rerun_fingerprint, [final_dataset_path])
         print(f"Final dataset created at {final_dataset_path}")
         return final_dataset_path
     else:
@@ -187,15 +331,35 @@ def combine_data_task(ticker: str):
         return None
 
 @task(name="Train LSTM Model")
-def train_model_task(ticker: str, time_steps: int = 5):
-    """Task to train the LSTM model"""
+def train_model_task(ticker: str, time_steps: int = 5, mode: str = "auto", force: bool = False):
+    """
+    Task to train the LSTM model.
+
+    mode='auto' fine-tunes the previous model on the recent window and only runs a full
+    retrain on schedule, on drift, or when the feature scale moved (see update_lstm_model).
+    """
     try:
-        train_lstm_model(ticker, time_steps)
         model_path = f"models/{ticker}_lstm_model.h5"
         scaler_path = f"models/{ticker}_scaler.joblib"
+
+        fingerprint = compute_fingerprint(
+            "train_lstm",
+            input_paths=[f"data/final/{ticker}_final_dataset.csv"],
+            params={"ticker": ticker, "time_steps": time_steps, "mode": mode},
+            code_paths=["src/models/train_lstm.py"],
+        )
+        cached = load_cached_outputs("train_lstm", fingerprint, force)
+        if cached:
+            return model_path
+
+        with _timed_import("train_lstm"):
+            from src.models.train_lstm import update_lstm_model
+
+        training_mode = update_lstm_model(ticker, time_steps, mode=mode)
         
         if os.path.exists(model_path) and os.path.exists(scaler_path):
-            print(f"Model trained and saved to {model_path}")
+            save_cached_outputs("train_lstm", fingerprint, [model_path, scaler_path])
+            print(f"Model trained ({training_mode}) and saved to {model_path}")
             return model_path
         else:
             print("Model training failed")
@@ -204,37 +368,110 @@ def train_model_task(ticker: str, time_steps: int = 5):
         print(f"Error training model: {e}")
         return None
 
+@task(name="Update Prediction History")
+def prediction_history_task(ticker: str, force: bool = False):
+    """Task to rescore the final dataset with the current model for the dashboard history charts"""
+    try:
+        fingerprint = compute_fingerprint(
+            "prediction_history",
+            input_paths=[f"data/final/{ticker}_final_dataset.csv", f"models/{ticker}_lstm_model.h5",
+                         f"models/{ticker}_scaler.joblib"],
+            params={"ticker": ticker},
+            code_paths=["src/serving/prediction_history.py", "src/serving/numpy_lstm.py"],
+        )
+        cached = load_cached_outputs("prediction_history", fingerprint, force)
+        if cached:
+            return cached[0]
+
+        with _timed_import("prediction_history"):
+            from src.serving.prediction_history import update_prediction_history
+
+        output_path = update_prediction_history(ticker)
+        save_cached_outputs("prediction_history", fingerprint, [output_path])
+        return output_path
+    except Exception as e:
+        print(f"Error updating prediction history: {e}")
+        return None
+
+@flow(name="Ingestion Pipeline", task_runner=SequentialTaskRunner())
+def ingestion_pipeline(ticker: str = "AAPL", force: bool = False) -> dict:
+    """
+    Fetches today's price, news and Reddit data. Imports no model libraries.
+
+    Returns:
+        dict: Paths of the ingested files ('price', 'news', 'reddit'), None where nothing was saved.
+    """
+    return {
+        "price": price_ingestion_task(ticker, force=force),
+        "news": news_ingestion_task(ticker, force=force),
+        "reddit": reddit_ingestion_task(ticker, force=force),
+    }
+
+
+def _todays_ingested_paths(ticker: str) -> dict:
+    """Today's ingestion outputs, for running the feature pipeline on its own."""
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    paths = {
+        "price": f"data/live/price/{ticker}_price_data_{current_date}.csv",
+        "news": f"data/live/news/{ticker}_news_data_{current_date}.csv",
+        "reddit": f"data/live/reddit/{ticker}_reddit_data_{current_date}.csv",
+    }
+    return {source: path if os.path.exists(path) else None for source, path in paths.items()}
+
+
+@flow(name="Feature Pipeline", task_runner=SequentialTaskRunner())
+def feature_pipeline(ticker: str = "AAPL", ingested: dict = None, sentiment: bool = True,
+                     force: bool = False) -> dict:
+    """
+    Builds technical indicators and, with sentiment=True, news/Reddit sentiment.
+
+    Never imports TensorFlow; torch and transformers are only loaded by the sentiment tasks.
+
+    Args:
+        ticker (str): Ticker symbol.
+        ingested (dict): Paths returned by ingestion_pipeline. None uses today's files on disk.
+        sentiment (bool): Whether to run the FinBERT sentiment tasks.
+        force (bool): Recompute even when cached outputs exist.
+
+    Returns:
+        dict: Paths of the feature files ('technical', 'news_sentiment', 'reddit_sentiment').
+    """
+    ingested = ingested or _todays_ingested_paths(ticker)
+    features = {"technical": None, "news_sentiment": None, "reddit_sentiment": None}
+
+    # Feature engineering tasks - only run if data is available
+    if ingested.get("price"):
+        features["technical"] = technical_indicators_task(ingested["price"], force=force)
+    if sentiment and ingested.get("news"):
+        features["news_sentiment"] = news_sentiment_task(ingested["news"], force=force)
+    if sentiment and ingested.get("reddit"):
+        features["reddit_sentiment"] = reddit_sentiment_task(ingested["reddit"], force=force)
+    return features
+
+
 @flow(name="Stock Prediction Pipeline", task_runner=SequentialTaskRunner())
-def stock_prediction_pipeline(ticker: str = "AAPL"):
-    """Main flow that orchestrates the entire stock prediction pipeline"""
+def stock_prediction_pipeline(ticker: str = "AAPL", force: bool = False):
+    """
+    Main flow that orchestrates the entire stock prediction pipeline.
+
+    Every stage is skipped when its outputs for the same inputs, parameters and code
+    already exist (see src/utils/task_cache.py). Pass force=True to recompute everything.
+    """
     print(f"Starting stock prediction pipeline for {ticker} at {datetime.now()}")
     
-    # Data ingestion tasks
-    price_path = price_ingestion_task(ticker)
-    news_path = news_ingestion_task(ticker)
-    reddit_path = reddit_ingestion_task(ticker)
-    
-    # Feature engineering tasks - only run if data is available
-    tech_indicators_path = None
-    if price_path:
-        tech_indicators_path = technical_indicators_task(price_path)
-    
-    news_sentiment_path = None
-    if news_path:
-        news_sentiment_path = news_sentiment_task(news_path)
-    
-    reddit_sentiment_path = None
-    if reddit_path:
-        reddit_sentiment_path = reddit_sentiment_task(reddit_path)
+    # Data ingestion and feature engineering sub-flows
+    ingested = ingestion_pipeline(ticker, force=force)
+    features = feature_pipeline(ticker, ingested, force=force)
     
     # Only proceed with combination if we have at least technical indicators
-    if tech_indicators_path:
-        final_dataset_path = combine_data_task(ticker)
+    if features["technical"]:
+        final_dataset_path = combine_data_task(ticker, force=force)
         
         # Only train model if we have a final dataset
         if final_dataset_path:
-            model_path = train_model_task(ticker)
+            model_path = train_model_task(ticker, force=force)
             if model_path:
+                prediction_history_task(ticker, force=force)
                 print(f"Pipeline completed successfully for {ticker}")
             else:
                 print(f"Pipeline completed but model training failed for {ticker}")
@@ -251,8 +488,22 @@ schedule = IntervalSchedule(
 )
 
 if __name__ == "__main__":
-    # Import pandas here to avoid circular imports
-    import pandas as pd
-    
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the stock prediction pipeline.")
+    parser.add_argument("--ticker", default="AAPL", help="Ticker symbol to process")
+    parser.add_argument("--force", action="store_true", help="Ignore cached stage results and recompute every stage")
+    parser.add_argument("--stage", default="all", choices=["all", "ingest", "features"],
+                        help="Run the whole pipeline, or only the ingestion or feature sub-flow")
+    parser.add_argument("--no-sentiment", action="store_true", help="Skip the FinBERT tasks in the feature sub-flow")
+    args = parser.parse_args()
+
     # Run the pipeline
-    stock_prediction_pipeline()
\ No newline at end of file
+    if args.stage == "ingest":
+        ingestion_pipeline(ticker=args.ticker, force=args.force)
+    elif args.stage == "features":
+        feature_pipeline(ticker=args.ticker, sentiment=not args.no_sentiment, force=args.force)
+    else:
+        stock_prediction_pipeline(ticker=args.ticker, force=args.force)
+
+    startup_report(f"orchestrate --stage {args.stage}")
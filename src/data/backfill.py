@@ -0,0 +1,369 @@
+# file: src/data/backfill.py
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.build_panel import FINAL_DATA_DIR, build_final_panel, write_panel
+from src.data.combine_all_data import combine_and_save_data
+
+BACKFILL_DIR = "data/backfill"
+CHECKPOINT_PATH = os.path.join(BACKFILL_DIR, "checkpoint.json")
+SOURCES = ["price", "news", "reddit"]
+# Jobs in flight per source and the minimum spacing between their starts. Polygon's free
+# tier allows 5 requests a minute; raise POLYGON_REQUESTS_PER_MINUTE on a paid plan.
+SOURCE_LIMITS = {
+    "price": {"concurrency": 4, "min_interval": 0.0},
+    "news": {"concurrency": 1, "min_interval": 60 / float(os.getenv("POLYGON_REQUESTS_PER_MINUTE", "5"))},
+    "reddit": {"concurrency": 2, "min_interval": 1.0},
+}
+NEWS_CHUNK_DAYS = 15
+# Prices are fetched this many calendar days before the range, so SMA_50 and MACD are
+# already defined on its first day
+PRICE_WARMUP_DAYS = 100
+SENTIMENT_CHUNKSIZE = 1000
+# Same switch as orchestrate.py: long-text scores are not used by the features yet
+SCORE_LONG_TEXT = os.getenv("SCORE_LONG_TEXT", "off").lower() == "on"
+REDDIT_SUBREDDITS = ["stocks", "wallstreetbets", "investing", "StockMarket"]
+
+
+class Checkpoint:
+    """
+    State of every backfill job in a JSON file, rewritten atomically after each job.
+
+    A rerun skips jobs recorded as done whose output still exists. Jobs that came back empty
+    are retried, because the ingestion functions report failed requests as empty frames.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self.jobs = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.jobs = json.load(f)["jobs"]
+
+    def is_done(self, job_id: str) -> bool:
+        entry = self.jobs.get(job_id)
+        return bool(entry) and entry["status"] == "done" and os.path.exists(entry.get("path", ""))
+
+    def record(self, job_id: str, status: str, **details):
+        with self._lock:
+            self.jobs[job_id] = {"status": status, **details, "updated_at": datetime.now().isoformat(timespec="seconds")}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"jobs": self.jobs}, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def forget(self, job_ids: list):
+        with self._lock:
+            for job_id in job_ids:
+                self.jobs.pop(job_id, None)
+
+
+class _Spacing:
+    """Keeps the starts of a source's jobs at least min_interval seconds apart across threads."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def date_chunks(start: str, end: str, chunk_days: int) -> list:
+    """Consecutive, non-overlapping (start, end) date strings of at most chunk_days days, both inclusive."""
+    chunks = []
+    chunk_start, last = pd.Timestamp(start), pd.Timestamp(end)
+    while chunk_start <= last:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last)
+        chunks.append((chunk_start.strftime('%Y-%m-%d'), chunk_end.strftime('%Y-%m-%d')))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _raw_path(source: str, ticker: str, start: str, end: str) -> str:
+    return os.path.join(BACKFILL_DIR, "raw", source, f"{ticker}_{start}_{end}.csv")
+
+
+def plan_jobs(tickers: list, start: str, end: str, sources: list = SOURCES, chunk_days: int = NEWS_CHUNK_DAYS) -> list:
+    """
+    Splits a backfill into ingestion jobs.
+
+    News is fetched in chunk_days windows, so a year becomes many small, independently
+    retried requests. Prices come in one request per ticker (Yahoo returns years of daily
+    bars at once) and Reddit in one job per ticker, since its search can only be narrowed
+    by age, not by date.
+    """
+    jobs = []
+    for ticker in tickers:
+        windows = {
+            "price": [(start, end)],
+            "news": date_chunks(start, end, chunk_days),
+            "reddit": [(start, end)],
+        }
+        for source in sources:
+            for window_start, window_end in windows[source]:
+                jobs.append({
+                    "id": f"{source}:{ticker}:{window_start}:{window_end}",
+                    "source": source,
+                    "ticker": ticker,
+                    "start": window_start,
+                    "end": window_end,
+                    "path": _raw_path(source, ticker, window_start, window_end),
+                })
+    return jobs
+
+
+def reddit_query(ticker: str) -> str:
+    return f"({ticker} OR ${ticker} OR '{ticker} stock')"
+
+
+def _ingest(job: dict) -> pd.DataFrame:
+    """Runs one job through the daily ingestion code."""
+    ticker, start, end = job["ticker"], job["start"], job["end"]
+    if job["source"] == "price":
+        from src.data.price_ingestion_daily import ingest_price_data
+
+        warmup_start = (pd.Timestamp(start) - timedelta(days=PRICE_WARMUP_DAYS)).strftime('%Y-%m-%d')
+        price_df = ingest_price_data(ticker, end, start_date=warmup_start)
+        if price_df.empty:
+            return price_df
+        if isinstance(price_df.columns, pd.MultiIndex):
+            price_df.columns = price_df.columns.get_level_values(0)
+        # Same date format as the historical technical indicators
+        price_df.index = price_df.index.tz_convert(None).strftime('%Y-%m-%d')
+        return price_df.rename_axis("Date").reset_index()
+
+    if job["source"] == "news":
+        from src.data.news_ingestion_daily import ingest_daily_news
+
+        return ingest_daily_news(ticker, start, limit=1000, end_date=end)
+
+    if job["source"] == "reddit":
+        from src.data.reddit_ingestion_daily import fetch_reddit_data
+
+        credentials = [os.getenv(name) for name in ("REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET", "REDDIT_USER_AGENT")]
+        if not all(credentials):
+            raise ValueError("Reddit API credentials not set in environment variables.")
+        return fetch_reddit_data(*credentials, reddit_query(ticker), REDDIT_SUBREDDITS, current_date=end, start_date=start)
+
+    raise ValueError(f"Unknown source: {job['source']}")
+
+
+def _run_ingest_job(job: dict, spacing: _Spacing, checkpoint: Checkpoint) -> dict:
+    spacing.wait()
+    started = time.perf_counter()
+    try:
+        df = _ingest(job)
+    except Exception as e:
+        checkpoint.record(job["id"], "failed", error=str(e))
+        return {**job, "status": "failed", "error": str(e)}
+
+    status = "done" if not df.empty else "empty"
+    if status == "done":
+        os.makedirs(os.path.dirname(job["path"]), exist_ok=True)
+        df.to_csv(job["path"], index=False)
+    seconds = round(time.perf_counter() - started, 2)
+    checkpoint.record(job["id"], status, path=job["path"], rows=len(df), seconds=seconds)
+    return {**job, "status": status, "rows": len(df), "seconds": seconds}
+
+
+def _concat_raw(paths: list, unique_subset: list, output_path: str) -> str:
+    """Concatenates a ticker's chunk files into one file. Returns None if there are none."""
+    frames = [pd.read_csv(path) for path in paths if os.path.exists(path)]
+    if not frames:
+        return None
+    combined = pd.concat(frames, ignore_index=True).drop_duplicates(subset=unique_subset, keep="last")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    combined.to_csv(output_path, index=False)
+    return output_path
+
+
+def build_ticker_features(ticker: str, start: str, end: str, jobs: list, sentiment: bool = True,
+                          data_dir: str = FINAL_DATA_DIR) -> dict:
+    """
+    Turns a ticker's backfilled raw data into features with the daily feature code, then
+    merges them into the historical files in data_dir (backfilled rows win on duplicates).
+
+    Sentiment is scored with process_sentiment_for_source in checkpointed chunks, so an
+    interrupted backfill also resumes mid-file.
+    """
+    from src.features.feature_store import TECHNICAL_INDICATORS_TABLE, upsert_features
+    from src.features.technical_indicators import add_technical_indicators
+
+    paths = {source: [j["path"] for j in jobs if j["source"] == source] for source in SOURCES}
+    featured_dir = os.path.join(BACKFILL_DIR, "featured")
+    written = {}
+
+    price_path = next((p for p in paths["price"] if os.path.exists(p)), None)
+    if price_path:
+        price_df = pd.read_csv(price_path, index_col="Date", parse_dates=True)
+        price_df.columns = [col.lower() for col in price_df.columns]
+        indicators_df = add_technical_indicators(price_df)
+        # The warm-up rows only served the rolling windows
+        indicators_df = indicators_df.loc[start:end]
+        technical_path = os.path.join(featured_dir, "technical", f"{ticker}_{start}_{end}.csv")
+        os.makedirs(os.path.dirname(technical_path), exist_ok=True)
+        # Same date format as the historical technical indicators
+        indicators_df.to_csv(technical_path, date_format='%Y-%m-%d')
+        combine_and_save_data(os.path.join(data_dir, f"{ticker}_technical_indicators.csv"), technical_path, ['Date'])
+        upsert_features(indicators_df, ticker, table=TECHNICAL_INDICATORS_TABLE)
+        written["technical"] = technical_path
+
+    if sentiment:
+        from src.features.sentiment_analysis import process_sentiment_for_source
+
+        # Source -> (time column, long text column, historical file suffix)
+        text_sources = {
+            "news": ("publishedAt", "description", "news_sentiment"),
+            "reddit": ("created_utc", "selftext", "reddit_sentiment"),
+        }
+        for source, (time_column, long_text_column, suffix) in text_sources.items():
+            unique_subset = ['title', time_column]
+            combined_path = _concat_raw(paths[source], unique_subset,
+                                        os.path.join(BACKFILL_DIR, "combined", source, f"{ticker}_{start}_{end}.csv"))
+            if not combined_path:
+                continue
+            sentiment_path = os.path.join(featured_dir, source, f"{ticker}_{start}_{end}_sentiment.csv")
+            process_sentiment_for_source(combined_path, sentiment_path, text_column='title',
+                                         chunksize=SENTIMENT_CHUNKSIZE,
+                                         long_text_column=long_text_column if SCORE_LONG_TEXT else None)
+            if os.path.exists(sentiment_path):
+                combine_and_save_data(os.path.join(data_dir, f"{ticker}_{suffix}.csv"), sentiment_path, unique_subset)
+                written[source] = sentiment_path
+    return written
+
+
+def backfill(tickers: list, start: str, end: str, sources: list = SOURCES, chunk_days: int = NEWS_CHUNK_DAYS,
+             sentiment: bool = True, feature_workers: int = 1, restart: bool = False,
+             checkpoint_path: str = CHECKPOINT_PATH) -> dict:
+    """
+    Backfills tickers over a date range and rebuilds their final datasets.
+
+    Ingestion jobs run concurrently under per-source limits (SOURCE_LIMITS), each source on
+    its own thread pool, so a rate-limited source does not hold up the others. As soon as all
+    ingestion jobs of a ticker finished, its features are built while the remaining tickers
+    are still being fetched. Every job is checkpointed; rerunning the same command after an
+    interruption only does the work that is missing.
+
+    Args:
+        tickers (list): Tickers to backfill.
+        start, end (str): Inclusive date range 'YYYY-MM-DD'.
+        sources (list): Subset of SOURCES to ingest.
+        chunk_days (int): Days per news request.
+        sentiment (bool): Score news and Reddit sentiment (needs the FinBERT model).
+        feature_workers (int): Tickers whose features are built at the same time.
+        restart (bool): Ignore the checkpoint of these jobs and redo them.
+        checkpoint_path (str): Where job states are kept.
+
+    Returns:
+        dict: Job counts per status, per-ticker feature outputs, final dataset paths and timings.
+    """
+    started = time.perf_counter()
+    checkpoint = Checkpoint(checkpoint_path)
+    jobs = plan_jobs(tickers, start, end, sources, chunk_days)
+    feature_ids = {t: f"features:{t}:{start}:{end}" for t in tickers}
+    if restart:
+        checkpoint.forget([j["id"] for j in jobs] + list(feature_ids.values()))
+
+    pending = [j for j in jobs if not checkpoint.is_done(j["id"])]
+    print(f"Backfill of {len(tickers)} tickers from {start} to {end}: {len(jobs)} ingestion jobs, "
+          f"{len(jobs) - len(pending)} already done")
+
+    remaining = {t: sum(j["ticker"] == t for j in pending) for t in tickers}
+    counts = {"done": len(jobs) - len(pending), "empty": 0, "failed": 0}
+    features = {}
+    spacings = {s: _Spacing(SOURCE_LIMITS[s]["min_interval"]) for s in sources}
+    pools = {s: ThreadPoolExecutor(max_workers=SOURCE_LIMITS[s]["concurrency"], thread_name_prefix=f"backfill-{s}")
+             for s in sources}
+    feature_pool = ThreadPoolExecutor(max_workers=feature_workers, thread_name_prefix="backfill-features")
+    feature_futures = {}
+
+    def submit_features(ticker: str, refreshed: bool):
+        # Features are rebuilt whenever this run fetched new data for the ticker
+        if not refreshed and checkpoint.jobs.get(feature_ids[ticker], {}).get("status") == "done":
+            print(f"Features of {ticker} already built")
+            return
+        ticker_jobs = [j for j in jobs if j["ticker"] == ticker]
+        feature_futures[feature_pool.submit(build_ticker_features, ticker, start, end, ticker_jobs, sentiment)] = ticker
+
+    try:
+        for ticker, count in remaining.items():
+            if count == 0:
+                submit_features(ticker, refreshed=False)
+
+        futures = [pools[j["source"]].submit(_run_ingest_job, j, spacings[j["source"]], checkpoint) for j in pending]
+        for finished, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            counts[result["status"]] += 1
+            detail = result.get("error") or f"{result['rows']} rows in {result['seconds']}s"
+            print(f"[{finished}/{len(pending)}] {result['id']}: {result['status']} ({detail})")
+            remaining[result["ticker"]] -= 1
+            if remaining[result["ticker"]] == 0:
+                submit_features(result["ticker"], refreshed=True)
+
+        for future in as_completed(feature_futures):
+            ticker = feature_futures[future]
+            try:
+                features[ticker] = future.result()
+                checkpoint.record(feature_ids[ticker], "done", outputs=features[ticker])
+                print(f"Features of {ticker} merged into {FINAL_DATA_DIR}")
+            except Exception as e:
+                checkpoint.record(feature_ids[ticker], "failed", error=str(e))
+                print(f"Building features of {ticker} failed: {e}")
+    finally:
+        for pool in list(pools.values()) + [feature_pool]:
+            # On an interrupt, queued jobs are dropped; the checkpoint has the finished ones
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # One pass over all backfilled tickers. Same-day sentiment, as in create_final_dataset, so
+    # the daily pipeline rebuilds these files with the same rows
+    built = [t for t in tickers if os.path.exists(os.path.join(FINAL_DATA_DIR, f"{t}_technical_indicators.csv"))]
+    final_paths = write_panel(build_final_panel(built, align_to_next_trading_day=False)) if built else []
+    if len(built) < len(tickers):
+        print(f"No technical indicators for {sorted(set(tickers) - set(built))}; their final datasets were not built")
+    summary = {
+        "jobs": counts,
+        "features": features,
+        "final_datasets": final_paths,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    print(f"Backfill finished in {summary['seconds']}s: {counts}")
+    if counts["empty"] or counts["failed"]:
+        print("Rerun the same command to retry the empty and failed jobs.")
+    return summary
+
+
+if __name__ == '__main__':
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    parser = argparse.ArgumentParser(description="Backfill price, news and Reddit history for tickers over a date range.")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--start", required=True, help="First date, YYYY-MM-DD")
+    parser.add_argument("--end", default=yesterday, help="Last date, YYYY-MM-DD (default: yesterday)")
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=SOURCES)
+    parser.add_argument("--chunk-days", type=int, default=NEWS_CHUNK_DAYS, help="Days per news request")
+    parser.add_argument("--no-sentiment", action="store_true", help="Skip sentiment scoring of news and Reddit posts")
+    parser.add_argument("--feature-workers", type=int, default=1)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and redo every job")
+    args = parser.parse_args()
+
+    backfill(args.tickers, args.start, args.end, args.sources, args.chunk_days,
+             sentiment=not args.no_sentiment, feature_workers=args.feature_workers, restart=args.restart)
@@ -0,0 +1,189 @@
+# file: src/data/build_panel.py
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features.feature_store import upsert_features
+from src.features.schema import FEATURE_COLUMNS, enforce_feature_schema
+
+FINAL_DATA_DIR = "data/final"
+SENTIMENT_MAP = {'positive': 1, 'neutral': 0, 'negative': -1}
+# Source name -> (file suffix, timestamp column, suffix of its feature columns)
+SENTIMENT_SOURCES = {
+    "news": ("news_sentiment", "publishedAt", ""),
+    "reddit": ("reddit_sentiment", "created_utc", "_reddit"),
+}
+SENTIMENT_FEATURES = ["avg_sentiment_score", "num_articles", "positive_ratio", "negative_ratio"]
+
+
+def discover_panel_tickers(data_dir: str = FINAL_DATA_DIR) -> list:
+    """Tickers with a historical technical indicators file."""
+    suffix = "_technical_indicators.csv"
+    return sorted(name[:-len(suffix)] for name in os.listdir(data_dir) if name.endswith(suffix))
+
+
+def _read_many(paths: dict, **read_kwargs) -> pd.DataFrame:
+    """Reads one CSV per ticker into a single long frame with a ticker column."""
+    frames = [pd.read_csv(path, **read_kwargs).assign(ticker=ticker)
+              for ticker, path in paths.items() if os.path.exists(path)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def load_panel_inputs(tickers: list, data_dir: str = FINAL_DATA_DIR) -> tuple:
+    """
+    Reads the historical technical indicators and sentiment files of all tickers.
+
+    Returns:
+        tuple: (technical indicators with ticker and Date columns, {source: articles}, and
+            {source: tickers that have the source's file}).
+    """
+    technical = _read_many({t: os.path.join(data_dir, f"{t}_technical_indicators.csv") for t in tickers})
+    if technical.empty:
+        raise FileNotFoundError(f"No technical indicators found in {data_dir} for {tickers}")
+    technical["Date"] = pd.to_datetime(technical["Date"])
+
+    articles, available = {}, {}
+    for source, (file_suffix, time_column, _) in SENTIMENT_SOURCES.items():
+        paths = {t: os.path.join(data_dir, f"{t}_{file_suffix}.csv") for t in tickers}
+        available[source] = {t for t, path in paths.items() if os.path.exists(path)}
+        # Only the columns the aggregation needs; the article texts are skipped
+        df = _read_many(paths, usecols=[time_column, "title", "sentiment", "sentiment_score"])
+        articles[source] = df.rename(columns={time_column: "timestamp"})
+    return technical, articles, available
+
+
+def aggregate_sentiment_panel(articles: pd.DataFrame, trading_days: pd.DataFrame,
+                              align_to_next_trading_day: bool = False) -> pd.DataFrame:
+    """
+    Aggregates article sentiment per ticker and trading day.
+
+    Each article's UTC date is matched to a trading day of its ticker with merge_asof. By
+    default articles from weekends and holidays are dropped, as the join in
+    create_final_dataset does; with align_to_next_trading_day they count towards the next
+    trading day.
+
+    Args:
+        articles (pd.DataFrame): ticker, timestamp, title, sentiment, sentiment_score.
+        trading_days (pd.DataFrame): ticker and Date of every row of the technical indicators.
+        align_to_next_trading_day (bool): Count non-trading-day articles on the next trading day.
+
+    Returns:
+        pd.DataFrame: SENTIMENT_FEATURES indexed by (ticker, Date).
+    """
+    if articles.empty:
+        index = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=["ticker", "Date"])
+        return pd.DataFrame(columns=SENTIMENT_FEATURES, index=index, dtype="float64")
+
+    articles = articles.assign(
+        day=pd.to_datetime(articles["timestamp"], utc=True).dt.tz_localize(None).dt.normalize()
+    ).sort_values("day")
+    days = trading_days[["ticker", "Date"]].dropna().drop_duplicates().sort_values("Date")
+
+    aligned = pd.merge_asof(
+        articles, days, left_on="day", right_on="Date", by="ticker", direction="forward",
+        tolerance=None if align_to_next_trading_day else pd.Timedelta(0),
+    ).dropna(subset=["Date"])
+
+    aligned["sentiment_numeric"] = aligned["sentiment"].map(SENTIMENT_MAP) * aligned["sentiment_score"]
+    aligned["is_positive"] = aligned["sentiment"].eq("positive")
+    aligned["is_negative"] = aligned["sentiment"].eq("negative")
+    return aligned.groupby(["ticker", "Date"]).agg(
+        avg_sentiment_score=("sentiment_numeric", "mean"),
+        num_articles=("title", "count"),
+        positive_ratio=("is_positive", "mean"),
+        negative_ratio=("is_negative", "mean"),
+    )
+
+
+def build_final_panel(tickers: list = None, data_dir: str = FINAL_DATA_DIR,
+                      align_to_next_trading_day: bool = False) -> pd.DataFrame:
+    """
+    Builds the final dataset of many tickers in one pass over a long (ticker, Date) panel.
+
+    Same steps as create_final_dataset, vectorized across tickers: sentiment is aggregated
+    per ticker and trading day, joined on (ticker, Date), forward-filled and NaN rows dropped
+    within each ticker, and the target is whether the ticker's next close is higher. With the
+    default arguments each ticker's rows equal create_final_dataset's output. A ticker without
+    a sentiment file has that source's columns left NaN (write_panel omits them, as
+    create_final_dataset does). The daily files are not merged in here; run
+    create_final_dataset's combine step for that.
+
+    Args:
+        tickers (list): Tickers to build. None builds every ticker with technical indicators.
+        data_dir (str): Directory with the historical per-ticker files.
+        align_to_next_trading_day (bool): See aggregate_sentiment_panel. Changes the
+            features relative to create_final_dataset, so only use it for experiments.
+
+    Returns:
+        pd.DataFrame: Panel sorted by ticker and Date, with ticker, Date, features and target.
+    """
+    tickers = tickers or discover_panel_tickers(data_dir)
+    technical, articles, available = load_panel_inputs(tickers, data_dir)
+    panel = technical.sort_values(["ticker", "Date"], kind="stable").reset_index(drop=True)
+
+    # Rows must be complete in every column the ticker has; absent sources do not count
+    complete = pd.Series(True, index=panel.index)
+    source_columns = []
+    for source, (_, _, column_suffix) in SENTIMENT_SOURCES.items():
+        daily = aggregate_sentiment_panel(articles[source], panel, align_to_next_trading_day)
+        daily.columns = [f"{c}{column_suffix}" for c in daily.columns]
+        panel = panel.join(daily, on=["ticker", "Date"])
+        source_columns.append((list(daily.columns), panel["ticker"].isin(available[source])))
+
+    feature_columns = [c for c in FEATURE_COLUMNS if c in panel.columns]
+    panel[feature_columns] = panel.groupby("ticker", sort=False)[feature_columns].ffill()
+    sentiment_columns = [c for columns, _ in source_columns for c in columns]
+    complete &= panel[[c for c in feature_columns if c not in sentiment_columns]].notna().all(axis=1)
+    for columns, has_source in source_columns:
+        complete &= ~has_source | panel[columns].notna().all(axis=1)
+    panel = panel[complete]
+
+    next_close = panel.groupby("ticker", sort=False)["close"].shift(-1)
+    # As in create_final_dataset, the last row of each ticker (no next close) is labelled 0
+    panel["target"] = (next_close > panel["close"]).astype(int)
+    return panel[["ticker", "Date"] + feature_columns + ["target"]].reset_index(drop=True)
+
+
+def write_panel(panel: pd.DataFrame, output_dir: str = FINAL_DATA_DIR, feature_store: bool = True) -> list:
+    """
+    Writes the panel partitioned by ticker, as the usual {ticker}_final_dataset.csv files,
+    and upserts each partition into the feature store. Columns a ticker has no data for
+    (a sentiment source without a file) are left out, as in create_final_dataset.
+
+    Returns:
+        list: Paths written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for ticker, part in panel.groupby("ticker", sort=False):
+        part = enforce_feature_schema(part.set_index("Date").dropna(axis=1, how="all"))
+        path = os.path.join(output_dir, f"{ticker}_final_dataset.csv")
+        part.to_csv(path)
+        if feature_store:
+            upsert_features(part, ticker)
+        paths.append(path)
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the final datasets of many tickers at once.")
+    parser.add_argument("--tickers", nargs="+", default=None, help="Defaults to every ticker with data")
+    parser.add_argument("--align-to-next-trading-day", action="store_true",
+                        help="Count weekend/holiday sentiment on the next trading day instead of dropping it "
+                             "(differs from create_final_dataset)")
+    parser.add_argument("--no-feature-store", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    panel = build_final_panel(args.tickers, align_to_next_trading_day=args.align_to_next_trading_day)
+    paths = write_panel(panel, feature_store=not args.no_feature_store)
+    print(f"Panel of {panel['ticker'].nunique()} tickers and {len(panel)} rows built "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(f"Written to {len(paths)} files in {FINAL_DATA_DIR}")
+    print(f"Target distribution:\n{panel['target'].value_counts(normalize=True)}")
@@ -3,6 +3,13 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime
+import sys
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features.feature_store import upsert_features
+from src.features.schema import enforce_feature_schema
 
 def combine_and_save_data(historical_path: str, daily_path: str, unique_subset: list):
     """
@@ -118,11 +125,17 @@ def create_final_dataset(ticker: str):
 
     tech_df['target'] = (tech_df['close'].shift(-1) > tech_df['close']).astype(int)
     tech_df.dropna(subset=['target'], inplace=True)
+
+    # Store features as float32 / small ints and drop columns outside the schema
+    tech_df = enforce_feature_schema(tech_df)
     
     output_path = f"data/final/{ticker}_final_dataset.csv"
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     tech_df.to_csv(output_path)
     print(f"Final dataset created and saved to {output_path}")
+
+    # Keep the feature store in sync so consumers can read only the rows they need
+    upsert_features(tech_df, ticker)
     print(tech_df.head())
     print(f"Dataset shape: {tech_df.shape}")
     print(f"Target distribution:\n{tech_df['target'].value_counts(normalize=True)}")
@@ -4,6 +4,12 @@ import pandas as pd
 import os
 from datetime import datetime
 from dotenv import load_dotenv
+import sys
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.response_cache import cached_fetch
 
 load_dotenv()
 
@@ -12,7 +18,7 @@ POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
 TICKER = "AAPL"
 BASE_URL = "https://api.polygon.io/v2/reference/news"
 
-def ingest_daily_news(ticker: str, date: str, limit: int = 10) -> pd.DataFrame:
+def ingest_daily_news(ticker: str, date: str, limit: int = 10, end_date: str = None) -> pd.DataFrame:
     """
     Ingest daily news for a given ticker from Polygon.io.
     This will run once per day via orchestrator/CI-CD pipeline.
@@ -20,27 +26,47 @@ def ingest_daily_news(ticker: str, date: str, limit: int = 10) -> pd.DataFrame:
     Args:
         ticker (str): Stock ticker symbol.
         date (str): Date in format 'YYYY-MM-DD'.
-        limit (int): Maximum number of news articles to fetch.
+        limit (int): Maximum number of news articles to fetch (per page, with end_date).
+        end_date (str): Optional last date 'YYYY-MM-DD'. With it, all articles from date
+            through end_date are fetched, following Polygon's pagination (used by backfills).
 
     Returns:
         pd.DataFrame: DataFrame containing daily news.
     """
+    period = f"from {date} to {end_date}" if end_date else f"on {date}"
     try:
         url = (
             f"{BASE_URL}?ticker={ticker}"
             f"&published_utc.gte={date}"
-            f"&published_utc.lte={date}"
+            f"&published_utc.lte={end_date or date}"
             f"&limit={limit}&apiKey={POLYGON_API_KEY}"
         )
 
-        response = requests.get(url)
-        data = response.json()
-
-        if response.status_code != 200:
-            raise ValueError(f"Request failed: {data}")
+        def fetch():
+            results, page_url = [], url
+            while page_url:
+                response = requests.get(page_url)
+                data = response.json()
+                if response.status_code != 200:
+                    raise ValueError(f"Request failed: {data}")
+                results.extend(data.get("results") or [])
+                # The daily fetch keeps the first page only
+                next_url = data.get("next_url") if end_date else None
+                page_url = f"{next_url}&apiKey={POLYGON_API_KEY}" if next_url else None
+            return {"results": results}
+
+        # Raw responses are cached on disk (the API key is not part of the key). The first
+        # page and the paginated result of the same day are different responses.
+        data = cached_fetch(
+            "polygon",
+            {"endpoint": BASE_URL, "ticker": ticker, "limit": limit, "paginate": end_date is not None},
+            fetch,
+            window_start=date,
+            window_end=end_date or date,
+        )
 
         if not data.get("results"):
-            print(f"No news available for {ticker} on {date}")
+            print(f"No news available for {ticker} {period}")
             return pd.DataFrame()
 
         df = pd.DataFrame(data["results"])
@@ -48,11 +74,11 @@ def ingest_daily_news(ticker: str, date: str, limit: int = 10) -> pd.DataFrame:
         df.rename(columns={'published_utc': 'publishedAt'}, inplace=True)
         df['publishedAt'] = pd.to_datetime(df['publishedAt']).dt.tz_localize(None)
 
-        print(f"Successfully ingested {len(df)} news articles for {ticker} on {date}")
+        print(f"Successfully ingested {len(df)} news articles for {ticker} {period}")
         return df
 
     except Exception as e:
-        print(f"Error ingesting news for {ticker} on {date}: {e}")
+        print(f"Error ingesting news for {ticker} {period}: {e}")
         return pd.DataFrame()
 
 
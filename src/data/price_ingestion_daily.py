@@ -3,8 +3,14 @@ import yfinance as yf
 import pandas as pd
 import os
 from datetime import datetime
+import sys
 
-def ingest_price_data(ticker: str, current_date: str) -> pd.DataFrame:
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.response_cache import cached_fetch
+
+def ingest_price_data(ticker: str, current_date: str, start_date: str = None) -> pd.DataFrame:
     """
     Ingest price data daily, this will run automatically for every day on orchestrator,
     and being set to run on schedule everyday on CI/CD workflow.
@@ -12,18 +18,28 @@ def ingest_price_data(ticker: str, current_date: str) -> pd.DataFrame:
     Args:
         ticker (str): Ticker symbol of the stock.
         current_date (str): Current date in format 'YYYY-MM-DD'.
-        auto_adjust (bool): Whether to adjust the stock data automatically.
-        progress (bool): Whether to show progress bar.
+        start_date (str): Optional first date 'YYYY-MM-DD'; with it, the bars from start_date
+            through current_date are fetched (used by backfills).
 
     Returns:
         pd.DataFrame: DataFrame containing price data for the specified ticker and date.
     """
 
     try:
-        stock_data = yf.download(
-            ticker,
-            auto_adjust=True,
-            progress=False
+        if start_date:
+            # yfinance's end date is exclusive
+            end_date = (pd.Timestamp(current_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+            download = lambda: yf.download(ticker, start=start_date, end=end_date, auto_adjust=True, progress=False)
+        else:
+            download = lambda: yf.download(ticker, auto_adjust=True, progress=False)
+
+        # Cached on disk, so retries and reruns for the same day do not hit Yahoo again
+        stock_data = cached_fetch(
+            "yfinance",
+            {"ticker": ticker, "auto_adjust": True},
+            download,
+            window_start=start_date,
+            window_end=current_date,
         )
 
         if stock_data.empty:
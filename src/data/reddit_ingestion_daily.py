@@ -3,29 +3,71 @@ import praw
 import pandas as pd
 from datetime import datetime, date
 from dotenv import load_dotenv
+import sys
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.response_cache import cached_fetch
 
 load_dotenv()
 
-def fetch_reddit_data(client_id, client_secret, user_agent, query, subreddits, current_date: date = date.today()):
+# Reddit search cannot filter by date, only by age: the narrowest filter covering a range is used
+TIME_FILTER_DAYS = [("day", 1), ("week", 7), ("month", 30), ("year", 365)]
+
+
+def _time_filter_since(start_date: date) -> str:
+    age_days = (date.today() - start_date).days + 1
+    return next((name for name, days in TIME_FILTER_DAYS if age_days <= days), "all")
+
+
+def fetch_reddit_data(client_id, client_secret, user_agent, query, subreddits, current_date: date = date.today(),
+                      start_date: date = None):
+    """
+    Fetches the posts of current_date, or of start_date through current_date when start_date
+    is given (used by backfills; Reddit returns at most about 1000 results per search).
+    """
     reddit = praw.Reddit(
         client_id=client_id,
         client_secret=client_secret,
         user_agent=user_agent,
     )
-    
+    current_date = pd.Timestamp(current_date).date()
+    start_date = pd.Timestamp(start_date).date() if start_date else current_date
+    time_filter, limit = ("day", 10) if start_date == current_date else (_time_filter_since(start_date), None)
+
+    def search(sub):
+        return [
+            {
+                'created_utc': submission.created_utc,
+                'title': submission.title,
+                'selftext': submission.selftext,
+                'score': submission.score,
+                'num_comments': submission.num_comments,
+            }
+            for submission in reddit.subreddit(sub).search(query, sort='new', time_filter=time_filter, limit=limit)
+        ]
+
     posts = []
     for sub in subreddits:
-        subreddit = reddit.subreddit(sub)
-        for submission in subreddit.search(query, sort='new', time_filter='day', limit=10):
-            submission_date = datetime.fromtimestamp(submission.created_utc).date()
+        # Raw search results are cached on disk per subreddit, query and day
+        submissions = cached_fetch(
+            "reddit",
+            {"subreddit": sub, "query": query, "sort": "new", "time_filter": time_filter, "limit": limit},
+            lambda: search(sub),
+            window_start=start_date,
+            window_end=current_date,
+        )
+        for submission in submissions:
+            submission_date = datetime.fromtimestamp(submission['created_utc']).date()
             
-            if submission_date == current_date:
+            if start_date <= submission_date <= current_date:
                 posts.append({
-                    'created_utc': datetime.fromtimestamp(submission.created_utc),
-                    'title': submission.title,
-                    'selftext': submission.selftext,
-                    'score': submission.score,
-                    'num_comments': submission.num_comments,
+                    'created_utc': datetime.fromtimestamp(submission['created_utc']),
+                    'title': submission['title'],
+                    'selftext': submission['selftext'],
+                    'score': submission['score'],
+                    'num_comments': submission['num_comments'],
                     'subreddit': sub
                 })
     
@@ -0,0 +1,224 @@
+# file: src/features/feature_store.py
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+FEATURE_STORE_PATH = "data/feature_store/features.db"
+
+# Tables written by the pipeline
+TECHNICAL_INDICATORS_TABLE = "technical_indicators"
+FINAL_FEATURES_TABLE = "final_features"
+
+_KEY_COLUMNS = ("ticker", "date", "updated_at")
+
+
+def _quote(identifier: str) -> str:
+    """Quotes a column name such as 'BBL_20_2.0' for use in SQL."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+@contextmanager
+def connect(db_path: str = FEATURE_STORE_PATH):
+    """
+    Opens the feature store, commits on success and always closes the connection.
+    WAL journaling lets the API and dashboards read while the pipeline writes.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def _ensure_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame):
+    """Creates the table keyed by (ticker, date) and adds any new feature columns."""
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {_quote(table)} ("
+        "ticker TEXT NOT NULL, date TEXT NOT NULL, updated_at TEXT NOT NULL, "
+        "PRIMARY KEY (ticker, date)) WITHOUT ROWID"
+    )
+    existing = set(_table_columns(conn, table))
+    for column, dtype in df.dtypes.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {_sql_type(dtype)}")
+
+
+def _date_strings(df: pd.DataFrame, date_column: str) -> pd.Series:
+    dates = df.index if date_column is None else df[date_column]
+    return pd.Series(pd.to_datetime(dates).strftime("%Y-%m-%d"), index=df.index)
+
+
+def upsert_features(df: pd.DataFrame, ticker: str, table: str = FINAL_FEATURES_TABLE,
+                    date_column: str = None, db_path: str = FEATURE_STORE_PATH) -> int:
+    """
+    Inserts or updates daily feature rows for one ticker.
+
+    Rows are keyed by (ticker, date); re-running a feature task for the same day
+    overwrites that day's values instead of duplicating them.
+
+    Args:
+        df (pd.DataFrame): Feature rows indexed by date (or with a date column).
+        ticker (str): Ticker symbol.
+        table (str): Target table.
+        date_column (str): Column holding the date. None uses the index.
+        db_path (str): Path of the SQLite database.
+
+    Returns:
+        int: Number of rows written.
+    """
+    df = df[df.index.notna()] if date_column is None else df[df[date_column].notna()]
+    dates = _date_strings(df, date_column)
+    features = df.drop(columns=[date_column]) if date_column else df
+    features = features.drop(columns=[c for c in _KEY_COLUMNS if c in features.columns])
+    if features.empty:
+        return 0
+
+    columns = ["ticker", "date", "updated_at"] + features.columns.tolist()
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in columns[2:])
+    sql = (
+        f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT(ticker, date) DO UPDATE SET {updates}"
+    )
+
+    updated_at = datetime.now().isoformat()
+    # Convert NaN to NULL and numpy scalars to Python values
+    values = features.astype(object).where(features.notna(), None)
+    rows = (
+        (ticker, date, updated_at, *row)
+        for date, row in zip(dates, values.itertuples(index=False, name=None))
+    )
+
+    with connect(db_path) as conn:
+        _ensure_table(conn, table, features)
+        conn.executemany(sql, rows)
+    return len(features)
+
+
+def _read(sql: str, params: list, table: str, columns: list, db_path: str) -> pd.DataFrame:
+    if not os.path.exists(db_path):
+        return pd.DataFrame()
+    with connect(db_path) as conn:
+        available = _table_columns(conn, table)
+        if not available:
+            return pd.DataFrame()
+        selected = [c for c in (columns or available) if c not in _KEY_COLUMNS and c in available]
+        select = ", ".join(["date"] + [_quote(c) for c in selected])
+        df = pd.read_sql_query(sql.format(select=select, table=_quote(table)), conn, params=params)
+
+    df["date"] = pd.to_datetime(df["date"])
+    return df.set_index("date").rename_axis("Date")
+
+
+def get_latest_features(ticker: str, n: int = 30, as_of: str = None, columns: list = None,
+                        table: str = FINAL_FEATURES_TABLE, db_path: str = FEATURE_STORE_PATH) -> pd.DataFrame:
+    """
+    Returns the last n rows of a ticker dated on or before as_of, oldest first.
+
+    Rows dated after as_of are never returned, so a window built for a past date only
+    contains information available on that date.
+
+    Args:
+        ticker (str): Ticker symbol.
+        n (int): Number of rows.
+        as_of (str): Date 'YYYY-MM-DD'. None means the latest available row.
+        columns (list): Feature columns to return. None returns all.
+        table (str): Table to read.
+        db_path (str): Path of the SQLite database.
+
+    Returns:
+        pd.DataFrame: Rows indexed by Date, empty if the ticker is not in the store.
+    """
+    as_of = pd.Timestamp(as_of or "2262-01-01").strftime("%Y-%m-%d")
+    sql = (
+        "SELECT * FROM (SELECT {select} FROM {table} WHERE ticker = ? AND date <= ? "
+        "ORDER BY date DESC LIMIT ?) ORDER BY date"
+    )
+    return _read(sql, [ticker, as_of, n], table, columns, db_path)
+
+
+def get_feature_range(ticker: str, start: str = None, end: str = None, columns: list = None,
+                      table: str = FINAL_FEATURES_TABLE, db_path: str = FEATURE_STORE_PATH) -> pd.DataFrame:
+    """
+    Returns all rows of a ticker with start <= date <= end, oldest first.
+
+    Args:
+        ticker (str): Ticker symbol.
+        start (str): First date 'YYYY-MM-DD' (inclusive). None means from the first row.
+        end (str): Last date 'YYYY-MM-DD' (inclusive). None means up to the last row.
+        columns (list): Feature columns to return. None returns all.
+        table (str): Table to read.
+        db_path (str): Path of the SQLite database.
+
+    Returns:
+        pd.DataFrame: Rows indexed by Date, empty if the ticker is not in the store.
+    """
+    start = pd.Timestamp(start or "1900-01-01").strftime("%Y-%m-%d")
+    end = pd.Timestamp(end or "2262-01-01").strftime("%Y-%m-%d")
+    sql = "SELECT {select} FROM {table} WHERE ticker = ? AND date BETWEEN ? AND ? ORDER BY date"
+    return _read(sql, [ticker, start, end], table, columns, db_path)
+
+
+def last_updated(ticker: str, table: str = FINAL_FEATURES_TABLE, db_path: str = FEATURE_STORE_PATH) -> str:
+    """
+    Returns when a ticker's rows were last written, or None if it has none.
+
+    Use this instead of the database file's mtime to notice new rows: in WAL mode a commit
+    only appends to features.db-wal, so the main file changes at the next checkpoint.
+    """
+    if not os.path.exists(db_path):
+        return None
+    with connect(db_path) as conn:
+        if not _table_columns(conn, table):
+            return None
+        return conn.execute(f"SELECT MAX(updated_at) FROM {_quote(table)} WHERE ticker = ?", [ticker]).fetchone()[0]
+
+
+def list_tickers(table: str = FINAL_FEATURES_TABLE, db_path: str = FEATURE_STORE_PATH) -> list:
+    """Returns the tickers present in a table."""
+    if not os.path.exists(db_path):
+        return []
+    with connect(db_path) as conn:
+        if not _table_columns(conn, table):
+            return []
+        return [row[0] for row in conn.execute(f"SELECT DISTINCT ticker FROM {_quote(table)} ORDER BY ticker")]
+
+
+
+def ticker_row_counts(table: str = FINAL_FEATURES_TABLE, db_path: str = FEATURE_STORE_PATH) -> dict:
+    """Returns the number of rows stored per ticker in a table."""
+    if not os.path.exists(db_path):
+        return {}
+    with connect(db_path) as conn:
+        if not _table_columns(conn, table):
+            return {}
+        return dict(conn.execute(f"SELECT ticker, COUNT(*) FROM {_quote(table)} GROUP BY ticker").fetchall())
+
+if __name__ == "__main__":
+    # Load the existing final datasets into the store
+    final_dir = "data/final"
+    for file_name in sorted(os.listdir(final_dir)):
+        if file_name.endswith("_final_dataset.csv"):
+            ticker = file_name.split("_")[0]
+            df = pd.read_csv(os.path.join(final_dir, file_name), index_col="Date", parse_dates=True)
+            written = upsert_features(df, ticker)
+            print(f"{ticker}: {written} rows upserted into {FEATURE_STORE_PATH}")
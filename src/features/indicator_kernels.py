@@ -0,0 +1,206 @@
+# file: src/features/indicator_kernels.py
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Output columns, in the order the pandas-ta strategy of add_technical_indicators appends them
+INDICATOR_COLUMNS = [
+    "SMA_20", "SMA_50", "RSI_14",
+    "MACD_12_26_9", "MACDh_12_26_9", "MACDs_12_26_9",
+    "BBL_20_2.0", "BBM_20_2.0", "BBU_20_2.0", "BBB_20_2.0", "BBP_20_2.0",
+]
+
+# The kernels work on 2-D float64 arrays of shape (dates, tickers). Each ticker's series may
+# start later than others (leading NaNs); from its first price on it is expected to be gap-free,
+# as it is for a ticker's own price history. Windows that touch a NaN produce NaN.
+
+
+def _exponential_filter(x: np.ndarray, decay: float) -> np.ndarray:
+    """y[t] = decay * y[t-1] + x[t] down each column, run on the transposed array so rows are contiguous."""
+    return lfilter([1], [1, -decay], np.ascontiguousarray(x.T), axis=-1).T
+
+
+def _first_valid(x: np.ndarray) -> np.ndarray:
+    """Row index of the first finite value per column (n_rows if none)."""
+    valid = np.isfinite(x)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(x))
+
+
+def rolling_mean_std(x: np.ndarray, length: int, ddof: int = 0):
+    """
+    Rolling mean and standard deviation over `length` rows, NaN until a full window.
+
+    Matches pandas rolling(length).mean() and .std(ddof).
+    """
+    n = len(x)
+    valid = np.isfinite(x)
+    # Centre each column on its first value so the running sums stay small
+    first = _first_valid(x)
+    offset = np.where(first < n, x[np.minimum(first, n - 1), np.arange(x.shape[1])], 0.0)
+    centred = np.where(valid, x - offset, 0.0)
+
+    def window_sum(values):
+        cumulative = np.cumsum(values, axis=0)
+        out = cumulative.copy()
+        out[length:] -= cumulative[:-length]
+        return out
+
+    counts = window_sum(valid.astype(np.int64))
+    sums = window_sum(centred)
+    squares = window_sum(centred * centred)
+
+    full = counts == length
+    mean = sums / length
+    variance = np.maximum(squares - length * mean * mean, 0.0) / (length - ddof)
+    return (np.where(full, mean + offset, np.nan), np.where(full, np.sqrt(variance), np.nan))
+
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    """Simple moving average, as pandas_ta.sma."""
+    return rolling_mean_std(x, length)[0]
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    Exponential moving average seeded with the SMA of the first `length` values, as pandas_ta.ema
+    (ewm(span=length, adjust=False) after replacing the first values by their mean).
+    """
+    n, m = x.shape
+    alpha = 2 / (length + 1)
+    start = _first_valid(x)
+    seed_row = start + length - 1
+    seeded = np.flatnonzero(seed_row < n)
+
+    # Seed the recursion y[t] = (1 - alpha) * y[t-1] + alpha * x[t] at seed_row: inputs before it
+    # are zero and the input at seed_row is chosen so that y[seed_row] equals the SMA
+    rows = np.arange(n)[:, None]
+    inputs = np.where(rows > seed_row, x, 0.0)
+    inputs[seed_row[seeded], seeded] = sma(x, length)[seed_row[seeded], seeded] / alpha
+    return np.where(rows >= seed_row, _exponential_filter(inputs, 1 - alpha) * alpha, np.nan)
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    Wilder's moving average, as pandas_ta.rma: ewm(alpha=1/length, adjust=True, min_periods=length).
+    NaN inputs carry no weight but still decay the earlier observations.
+    """
+    alpha = 1 / length
+    valid = np.isfinite(x)
+    numerator = _exponential_filter(np.where(valid, x, 0.0), 1 - alpha)
+    denominator = _exponential_filter(valid.astype(np.float64), 1 - alpha)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = numerator / denominator
+    return np.where(np.cumsum(valid, axis=0) >= length, out, np.nan)
+
+
+def rsi(x: np.ndarray, length: int = 14) -> np.ndarray:
+    """Relative Strength Index, as pandas_ta.rsi."""
+    change = np.full_like(x, np.nan)
+    change[1:] = x[1:] - x[:-1]
+    gains = rma(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), length)
+    losses = rma(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 * gains / (gains + losses)
+
+
+def macd(x: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD line, histogram and signal, as pandas_ta.macd (signal starts at the first MACD value)."""
+    line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(line, signal)
+    return line, line - signal_line, signal_line
+
+
+def _non_zero_range(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """high - low, shifted by machine epsilon in every column that contains an exact zero (pandas_ta.utils)."""
+    diff = high - low
+    return diff + np.where((diff == 0).any(axis=0), sys.float_info.epsilon, 0.0)
+
+
+def bbands(x: np.ndarray, length: int = 20, std: float = 2.0, ddof: int = 0):
+    """Bollinger Bands lower, mid, upper, bandwidth and percent, as pandas_ta.bbands."""
+    mid, deviation = rolling_mean_std(x, length, ddof)
+    lower, upper = mid - std * deviation, mid + std * deviation
+    band_range = _non_zero_range(upper, lower)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bandwidth = 100 * band_range / mid
+        percent = _non_zero_range(x, lower) / band_range
+    return lower, mid, upper, bandwidth, percent
+
+
+def compute_indicator_panel(close: pd.DataFrame) -> dict:
+    """
+    Computes every indicator of add_technical_indicators for a whole panel of tickers at once.
+
+    Args:
+        close (pd.DataFrame): Close prices indexed by date, one column per ticker.
+
+    Returns:
+        dict: Indicator column name (e.g. 'SMA_20') -> DataFrame shaped like `close`.
+    """
+    x = close.to_numpy(dtype=np.float64)
+    results = [sma(x, 20), sma(x, 50), rsi(x, 14), *macd(x, 12, 26, 9), *bbands(x, 20, 2.0)]
+    return {
+        name: pd.DataFrame(values, index=close.index, columns=close.columns)
+        for name, values in zip(INDICATOR_COLUMNS, results)
+    }
+
+
+def compute_indicators(close: pd.Series) -> pd.DataFrame:
+    """
+    Computes the indicators of a single ticker's close series.
+
+    Returns:
+        pd.DataFrame: One column per indicator, indexed like `close`.
+    """
+    panel = compute_indicator_panel(close.to_frame())
+    return pd.DataFrame({name: frame.iloc[:, 0] for name, frame in panel.items()}, index=close.index)
+
+
+def compare_with_pandas_ta(price_df: pd.DataFrame, rtol: float = 1e-6, atol: float = 1e-8) -> dict:
+    """
+    Checks the kernels against pandas-ta on one ticker's OHLCV frame.
+
+    Returns:
+        dict: Column -> max absolute difference. Raises AssertionError on a mismatch.
+    """
+    import pandas_ta as ta
+
+    reference = price_df.copy()
+    reference.ta.sma(length=20, append=True)
+    reference.ta.sma(length=50, append=True)
+    reference.ta.rsi(append=True)
+    reference.ta.macd(fast=12, slow=26, append=True)
+    reference.ta.bbands(length=20, append=True)
+
+    ours = compute_indicators(price_df["close"])
+    differences = {}
+    for column in INDICATOR_COLUMNS:
+        expected, actual = reference[column].to_numpy(), ours[column].to_numpy()
+        np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual), err_msg=f"NaN pattern of {column}")
+        np.testing.assert_allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True, err_msg=column)
+        differences[column] = float(np.nanmax(np.abs(actual - expected))) if np.isfinite(expected).any() else 0.0
+    return differences
+
+
+if __name__ == "__main__":
+    N_DAYS, N_TICKERS = 1000, 500
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0005, 0.02, (N_DAYS, N_TICKERS))
+    close = pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=pd.bdate_range("2020-01-01", periods=N_DAYS),
+        columns=[f"T{i:03d}" for i in range(N_TICKERS)],
+    )
+
+    start = time.perf_counter()
+    compute_indicator_panel(close)
+    print(f"{N_TICKERS} tickers x {N_DAYS} days computed in {time.perf_counter() - start:.3f}s")
+
+    try:
+        differences = compare_with_pandas_ta(close.iloc[:, :1].rename(columns={"T000": "close"}))
+        print(f"Parity with pandas-ta OK, max abs differences: {differences}")
+    except ImportError:
+        print("pandas-ta not installed, parity check skipped.")
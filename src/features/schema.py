@@ -0,0 +1,76 @@
+# file: src/features/schema.py
+import numpy as np
+import pandas as pd
+
+# Columns of data/final/{ticker}_final_dataset.csv, in the order the scaler was fitted on.
+# Features are float32; per-day article counts are small integers.
+FEATURE_DTYPES = {
+    "close": "float32",
+    "high": "float32",
+    "low": "float32",
+    "open": "float32",
+    "volume": "float32",
+    "SMA_20": "float32",
+    "SMA_50": "float32",
+    "RSI_14": "float32",
+    "MACD_12_26_9": "float32",
+    "MACDh_12_26_9": "float32",
+    "MACDs_12_26_9": "float32",
+    "BBL_20_2.0": "float32",
+    "BBM_20_2.0": "float32",
+    "BBU_20_2.0": "float32",
+    "BBB_20_2.0": "float32",
+    "BBP_20_2.0": "float32",
+    "avg_sentiment_score": "float32",
+    "num_articles": "int16",
+    "positive_ratio": "float32",
+    "negative_ratio": "float32",
+    "avg_sentiment_score_reddit": "float32",
+    "num_articles_reddit": "int16",
+    "positive_ratio_reddit": "float32",
+    "negative_ratio_reddit": "float32",
+}
+FEATURE_COLUMNS = list(FEATURE_DTYPES)
+
+TARGET_COLUMN = "target"
+TARGET_DTYPE = "int8"
+
+# Dtype of model inputs (scaled features, sequences, API payloads)
+MODEL_INPUT_DTYPE = np.float32
+
+
+def enforce_feature_schema(df: pd.DataFrame, include_target: bool = True) -> pd.DataFrame:
+    """
+    Keeps the declared feature columns (and the target) and casts them to their compact dtypes.
+
+    Columns outside the schema are dropped. Integer columns that still hold NaN
+    (e.g. before forward-filling) are kept as float32 instead of failing the cast.
+
+    Args:
+        df (pd.DataFrame): Frame with the final dataset columns.
+        include_target (bool): Whether to keep the target column if present.
+
+    Returns:
+        pd.DataFrame: Frame with schema columns in schema order.
+    """
+    columns = [c for c in FEATURE_COLUMNS if c in df.columns]
+    if include_target and TARGET_COLUMN in df.columns:
+        columns.append(TARGET_COLUMN)
+
+    dtypes = {}
+    for column in columns:
+        dtype = FEATURE_DTYPES.get(column, TARGET_DTYPE)
+        if dtype != "float32" and df[column].isna().any():
+            dtype = "float32"
+        dtypes[column] = dtype
+    return df[columns].astype(dtypes, copy=False)
+
+
+def read_feature_csv(path: str) -> pd.DataFrame:
+    """
+    Reads a final dataset CSV directly into compact dtypes, without a float64 intermediate.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {c: "float32" for c in FEATURE_COLUMNS if c in header}
+    df = pd.read_csv(path, index_col="Date", parse_dates=True, dtype=dtypes)
+    return enforce_feature_schema(df)
@@ -3,10 +3,30 @@ import os
 os.environ["TRANSFORMERS_NO_TF"] = "1"
 os.environ["TRANSFORMERS_NO_FLAX"] = "1"
 
+import json
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 from transformers.pipelines import pipeline
 import torch
 
+from src.features.text_dedup import find_near_duplicates, deduplication_summary
+
+
+@lru_cache(maxsize=1)
+def _get_sentiment_pipeline():
+    """Loads FinBERT once per process; chunked runs reuse it for every chunk."""
+    # Use GPU if available
+    device = 0 if torch.cuda.is_available() else -1
+    
+    # Using a specific, well-regarded FinBERT model from Hugging Face Hub
+    return pipeline(
+        "sentiment-analysis", 
+        model="ProsusAI/finbert", 
+        device=device
+    )
+
 
 def analyze_sentiment(texts: list) -> list:
     """
@@ -18,58 +38,265 @@ def analyze_sentiment(texts: list) -> list:
     Returns:
         list: A list of dictionaries, each containing the label ('positive', 'negative', 'neutral') and score.
     """
-    # Use GPU if available
-    device = 0 if torch.cuda.is_available() else -1
-    
-    # Using a specific, well-regarded FinBERT model from Hugging Face Hub
-    sentiment_pipeline = pipeline(
-        "sentiment-analysis", 
-        model="ProsusAI/finbert", 
-        device=device
-    )
+    sentiment_pipeline = _get_sentiment_pipeline()
     
     # The pipeline can process a list of texts directly
     # Truncate long texts to fit within the model's max sequence length
     results = sentiment_pipeline(texts, truncation=True, padding=True, max_length=512)
     return results
 
-def process_sentiment_for_source(input_path: str, output_path: str, text_column: str):
+def _token_windows(token_ids: list, size: int, overlap: int) -> list:
+    """Splits a token sequence into windows of at most `size` tokens overlapping by `overlap`."""
+    if not token_ids:
+        return []
+    step = size - overlap
+    return [token_ids[start:start + size] for start in range(0, max(len(token_ids) - overlap, 1), step)]
+
+
+def analyze_long_documents(texts: list, window_tokens: int = 510, overlap: int = 64, batch_size: int = 64) -> list:
     """
-    Reads raw data, performs sentiment analysis, and saves the results.
+    Scores documents longer than FinBERT's 512-token limit.
+
+    Each document is split into overlapping token windows. The windows of all documents are
+    sorted by length and scored together in batches of batch_size, so the number of model
+    calls grows with the total number of windows / batch_size rather than with the number
+    of documents. A document's class probabilities are the token-weighted mean over its windows.
+
+    Args:
+        texts (list): Documents to score; empty or missing documents get None.
+        window_tokens (int): Tokens per window, excluding [CLS]/[SEP].
+        overlap (int): Tokens shared by consecutive windows.
+        batch_size (int): Windows per forward pass.
+
+    Returns:
+        list: Per document, a dict with 'label', 'score' (probability of the label) and
+            'windows', or None when the document has no text.
     """
-    if not os.path.exists(input_path):
-        print(f"Input file not found: {input_path}")
-        return
+    sentiment_pipeline = _get_sentiment_pipeline()
+    tokenizer, model = sentiment_pipeline.tokenizer, sentiment_pipeline.model
 
-    df = pd.read_csv(input_path)
-    df = df.dropna(subset=[text_column])
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    token_ids = tokenizer(texts, add_special_tokens=False)["input_ids"]
+
+    windows, owners = [], []
+    for doc, ids in enumerate(token_ids):
+        for window in _token_windows(ids, window_tokens, overlap):
+            windows.append(window)
+            owners.append(doc)
+    owners = np.array(owners, dtype=np.int64)
+
+    # Length-sorted batches keep padding small
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+    probabilities = np.zeros((len(windows), model.config.num_labels), dtype=np.float32)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            encoded = tokenizer.pad(
+                {"input_ids": [tokenizer.build_inputs_with_special_tokens(windows[i]) for i in batch]},
+                return_tensors="pt",
+            )
+            logits = model(**{k: v.to(model.device) for k, v in encoded.items()}).logits
+            probabilities[batch] = torch.softmax(logits, dim=-1).cpu().numpy()
+
+    print(f"   Scored {len(texts)} documents as {len(windows)} windows in {-(-len(windows) // batch_size)} batches")
+
+    # Token-weighted mean of the window probabilities per document
+    weights = np.array([len(w) for w in windows], dtype=np.float32)
+    totals = np.zeros((len(texts), probabilities.shape[1]), dtype=np.float32)
+    np.add.at(totals, owners, probabilities * weights[:, None])
+    window_counts = np.bincount(owners, minlength=len(texts))
+
+    results = []
+    for doc in range(len(texts)):
+        if window_counts[doc] == 0:
+            results.append(None)
+            continue
+        doc_probabilities = totals[doc] / totals[doc].sum()
+        label_id = int(doc_probabilities.argmax())
+        results.append({
+            "label": model.config.id2label[label_id].lower(),
+            "score": float(doc_probabilities[label_id]),
+            "windows": int(window_counts[doc]),
+        })
+    return results
+
+
+def analyze_sentiment_deduplicated(texts: list, threshold: float = 0.75) -> list:
+    """
+    Scores one representative per group of near-duplicate texts and copies its result
+    to the other members (see text_dedup.find_near_duplicates).
+
+    Args:
+        texts (list): A list of strings to analyze.
+        threshold (float): Similarity from which texts share a score.
+
+    Returns:
+        list: One result per input text, like analyze_sentiment.
+    """
+    representatives = find_near_duplicates(texts, threshold=threshold)
+    unique = sorted(set(representatives.tolist()))
+    results = dict(zip(unique, analyze_sentiment([texts[i] for i in unique])))
+
+    summary = deduplication_summary(representatives)
+    print(f"   Scored {summary['scored']} of {summary['texts']} texts, "
+          f"{summary['duplicates']} near-duplicates reused ({summary['inference_saved']:.1%} inference saved)")
+    return [dict(results[r]) for r in representatives]
+
+
+def _score_frame(df: pd.DataFrame, text_column: str, dedup: bool = True, long_text_column: str = None) -> pd.DataFrame:
+    """
+    Scores the non-empty texts of a frame and returns those rows with sentiment columns appended.
+
+    With long_text_column, that column is also scored in token windows into
+    '<column>_sentiment', '<column>_sentiment_score' and '<column>_sentiment_windows'.
+    """
+    df = df.dropna(subset=[text_column]).copy()
     df[text_column] = df[text_column].astype(str)
     
     # Filter out empty strings
-    texts_to_analyze = df[df[text_column].str.strip()!= ''][text_column].tolist()
-    
-    if not texts_to_analyze:
-        print(f"No valid text found in {input_path} for column {text_column}.")
-        return
+    valid_text_df = df[df[text_column].str.strip()!= ''].copy()
+    if valid_text_df.empty:
+        return valid_text_df
 
-    print(f"Analyzing sentiment for {len(texts_to_analyze)} texts from {input_path}...")
-    sentiments = analyze_sentiment(texts_to_analyze)
+    texts = valid_text_df[text_column].tolist()
+    sentiments = analyze_sentiment_deduplicated(texts) if dedup else analyze_sentiment(texts)
     
     # Create a temporary DataFrame for sentiments to merge back
     sentiment_df = pd.DataFrame(sentiments)
     sentiment_df.rename(columns={'label': 'sentiment', 'score': 'sentiment_score'}, inplace=True)
     
     # Align indices for merging
-    valid_text_df = df[df[text_column].str.strip()!= ''].copy()
     valid_text_df.reset_index(drop=True, inplace=True)
     sentiment_df.reset_index(drop=True, inplace=True)
+
+    if long_text_column and long_text_column in valid_text_df.columns:
+        documents = analyze_long_documents(valid_text_df[long_text_column].tolist())
+        sentiment_df[f"{long_text_column}_sentiment"] = [d["label"] if d else None for d in documents]
+        sentiment_df[f"{long_text_column}_sentiment_score"] = [d["score"] if d else None for d in documents]
+        sentiment_df[f"{long_text_column}_sentiment_windows"] = [d["windows"] if d else 0 for d in documents]
+    
+    return pd.concat([valid_text_df, sentiment_df], axis=1)
+
+
+def process_sentiment_for_source(input_path: str, output_path: str, text_column: str, chunksize: int = None,
+                                 dedup: bool = True, long_text_column: str = None):
+    """
+    Reads raw data, performs sentiment analysis, and saves the results.
+
+    Args:
+        input_path (str): Raw CSV with a text column.
+        output_path (str): Where the scored rows are written.
+        text_column (str): Column holding the text to score.
+        chunksize (int): If set, stream the input in chunks of this many rows with a
+            resumable checkpoint (see process_sentiment_in_chunks). None scores the
+            whole file at once.
+        dedup (bool): Score near-duplicate texts once (syndicated headlines, cross-posts).
+        long_text_column (str): Optional long-text column (e.g. Reddit 'selftext', news
+            'description') scored in overlapping token windows into extra columns. The
+            daily aggregation does not read these columns yet; the pipelines only pass
+            it with SCORE_LONG_TEXT=on.
+    """
+    if not os.path.exists(input_path):
+        print(f"Input file not found: {input_path}")
+        return
+
+    if chunksize:
+        process_sentiment_in_chunks(input_path, output_path, text_column, chunksize, dedup, long_text_column)
+        return
+
+    df = pd.read_csv(input_path)
+    print(f"Analyzing sentiment for {len(df)} rows from {input_path}...")
+    result_df = _score_frame(df, text_column, dedup, long_text_column)
     
-    result_df = pd.concat([valid_text_df, sentiment_df], axis=1)
+    if result_df.empty:
+        print(f"No valid text found in {input_path} for column {text_column}.")
+        return
     
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     result_df.to_csv(output_path, index=False)
     print(f"Sentiment analysis complete. Results saved to {output_path}")
 
+
+def _input_version(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_checkpoint(path: str, checkpoint: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def process_sentiment_in_chunks(input_path: str, output_path: str, text_column: str, chunksize: int = 1000,
+                                dedup: bool = True, long_text_column: str = None):
+    """
+    Scores the input in chunks, appending each chunk's results to the output as it finishes.
+
+    After every chunk, the number of input rows consumed and the output size are saved to
+    '<output_path>.checkpoint.json'. A rerun on the same input truncates the output to the
+    last checkpointed size (dropping a partially written chunk) and resumes from the next
+    row, so only the chunk in flight is lost on a crash and memory stays bounded by chunksize.
+    The checkpoint is removed once the whole input has been scored.
+
+    Args:
+        input_path (str): Raw CSV with a text column.
+        output_path (str): Where the scored rows are appended.
+        text_column (str): Column holding the text to score.
+        chunksize (int): Input rows read and scored per chunk.
+        dedup (bool): Score near-duplicate texts once per chunk.
+        long_text_column (str): Optional long-text column scored in token windows.
+    """
+    checkpoint_path = f"{output_path}.checkpoint.json"
+    version = _input_version(input_path)
+
+    checkpoint = None
+    if os.path.exists(checkpoint_path) and os.path.exists(output_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("input_path") != input_path or checkpoint.get("input_version") != version:
+            print("Input changed since the last checkpoint, starting over.")
+            checkpoint = None
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if checkpoint:
+        with open(output_path, "r+b") as f:
+            f.truncate(checkpoint["output_bytes"])
+        print(f"Resuming {input_path} after {checkpoint['rows_done']} rows.")
+    else:
+        checkpoint = {"input_path": input_path, "input_version": version, "rows_done": 0, "output_bytes": 0, "rows_written": 0}
+        open(output_path, "w").close()
+
+    rows_seen = 0
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        chunk_start, rows_seen = rows_seen, rows_seen + len(chunk)
+        # Chunks already scored are parsed again but not scored
+        if rows_seen <= checkpoint["rows_done"]:
+            continue
+        chunk = chunk.iloc[max(checkpoint["rows_done"] - chunk_start, 0):]
+
+        result_df = _score_frame(chunk, text_column, dedup, long_text_column)
+        with open(output_path, "a", newline="") as f:
+            if len(result_df):
+                result_df.to_csv(f, index=False, header=checkpoint["output_bytes"] == 0)
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint["output_bytes"] = f.tell()
+
+        checkpoint["rows_done"] = rows_seen
+        checkpoint["rows_written"] += len(result_df)
+        _write_checkpoint(checkpoint_path, checkpoint)
+        print(f"   Scored rows {chunk_start + 1}-{rows_seen} ({checkpoint['rows_written']} written so far)")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if checkpoint["rows_written"] == 0:
+        os.remove(output_path)
+        print(f"No valid text found in {input_path} for column {text_column}.")
+        return
+    print(f"Sentiment analysis complete. Results saved to {output_path}")
+
 if __name__ == '__main__':
     # Process News Data
     current_date = pd.Timestamp.now().strftime('%Y-%m-%d')
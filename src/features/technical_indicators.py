@@ -1,37 +1,51 @@
 # file: src/features/technical_indicators.py
 import pandas as pd
-import pandas_ta as ta
 import os
 from datetime import datetime
+from src.features.indicator_kernels import compute_indicators
+from src.features.schema import FEATURE_DTYPES
 
-def add_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def add_technical_indicators(df: pd.DataFrame, engine: str = "numpy") -> pd.DataFrame:
     """
     Adds a suite of technical indicators to the stock price DataFrame.
 
     Args:
         df (pd.DataFrame): DataFrame with OHLCV data.
+        engine (str): "numpy" for the vectorized kernels in indicator_kernels.py,
+            "pandas_ta" for the original pandas-ta strategy. Both give the same columns.
 
     Returns:
         pd.DataFrame: DataFrame with added indicator columns.
     """
-    # Create a custom strategy for multiple indicators
-    custom_strategy = ta.Strategy(
-        name="MomoAndVolatility",
-        description="RSI, MACD, Bollinger Bands, and SMA",
-        ta=[
-            {"kind": "sma", "length": 20},
-            {"kind": "sma", "length": 50},
-            {"kind": "rsi"},
-            {"kind": "macd", "fast": 12, "slow": 26},
-            {"kind": "bbands", "length": 20},
-        ]
-    )
-    
-    # Apply the strategy to the DataFrame
-    df.ta.strategy(custom_strategy)
+    if engine == "numpy":
+        indicators = compute_indicators(df["close"])
+        df[indicators.columns] = indicators
+    elif engine == "pandas_ta":
+        import pandas_ta as ta
+
+        # Create a custom strategy for multiple indicators
+        custom_strategy = ta.Strategy(
+            name="MomoAndVolatility",
+            description="RSI, MACD, Bollinger Bands, and SMA",
+            ta=[
+                {"kind": "sma", "length": 20},
+                {"kind": "sma", "length": 50},
+                {"kind": "rsi"},
+                {"kind": "macd", "fast": 12, "slow": 26},
+                {"kind": "bbands", "length": 20},
+            ]
+        )
+
+        # Apply the strategy to the DataFrame
+        df.ta.strategy(custom_strategy)
+    else:
+        raise ValueError(f"Unknown indicator engine: {engine}")
     
     # Drop rows with NaN values created by indicators with lookback periods
     df.dropna(inplace=True)
+
+    # Downcast prices and indicators to the compact feature dtypes
+    df = df.astype({c: FEATURE_DTYPES[c] for c in df.columns if c in FEATURE_DTYPES}, copy=False)
     
     print("Technical indicators added successfully.")
     return df
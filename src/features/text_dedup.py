@@ -0,0 +1,132 @@
+# file: src/features/text_dedup.py
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from src.preprocessing.daily_preprocessing import preprocess_text
+
+# Universal hashing modulo a Mersenne prime; shingle hashes (crc32) and coefficients stay
+# below 2**32 and 2**31 so a * h + b fits in uint64
+_PRIME = (1 << 31) - 1
+
+# preprocess_text drops these as stopwords, but they flip a headline's sentiment,
+# so texts are only grouped when they contain the same ones
+_DIRECTION_WORDS = {"up", "down"}
+
+
+def _shingles(text: str, ngram: int) -> set:
+    """Character n-grams of a normalized text."""
+    if len(text) <= ngram:
+        return {text} if text else set()
+    return {text[i:i + ngram] for i in range(len(text) - ngram + 1)}
+
+
+def _direction_key(text: str) -> frozenset:
+    return frozenset(_DIRECTION_WORDS.intersection(re.findall(r"[a-z]+", text.lower())))
+
+
+def minhash_signatures(shingle_sets: list, num_perm: int = 64, seed: int = 1) -> np.ndarray:
+    """
+    MinHash signature of each shingle set; empty sets get an all-max signature.
+
+    Returns:
+        np.ndarray: Shape (len(shingle_sets), num_perm), dtype uint64.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    signatures = np.full((len(shingle_sets), num_perm), _PRIME, dtype=np.uint64)
+    for i, shingles in enumerate(shingle_sets):
+        if shingles:
+            hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+            signatures[i] = ((hashes[:, None] * a + b) % _PRIME).min(axis=0)
+    return signatures
+
+
+def find_near_duplicates(texts: list, threshold: float = 0.75, num_perm: int = 64, bands: int = 16,
+                         ngram: int = 4) -> np.ndarray:
+    """
+    Groups near-duplicate texts and returns the representative of each text's group.
+
+    Texts are normalized with preprocess_text and compared as sets of character n-grams.
+    MinHash/LSH proposes candidate pairs (texts sharing a band of their signature); a pair
+    is grouped when the exact Jaccard similarity of its n-gram sets reaches threshold and
+    both texts contain the same direction words ('up'/'down'). Texts that normalize to
+    an empty string are never grouped.
+
+    Args:
+        texts (list): Texts to group.
+        threshold (float): Jaccard similarity from which two texts count as duplicates.
+        num_perm (int): MinHash signature length; must be divisible by bands.
+        bands (int): LSH bands. With r = num_perm / bands rows per band, pairs near
+            (1 / bands) ** (1 / r) similarity become candidates half of the time.
+        ngram (int): Character n-gram length.
+
+    Returns:
+        np.ndarray: For each text, the index of its group's representative (its first member).
+    """
+    n = len(texts)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            # The earliest text stays the representative
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    normalized = [preprocess_text(t) for t in texts]
+    directions = [_direction_key(t) if isinstance(t, str) else frozenset() for t in texts]
+
+    # Identical normalized texts are grouped without hashing
+    first_seen, unique = {}, []
+    for i, (text, direction) in enumerate(zip(normalized, directions)):
+        if not text:
+            continue
+        key = (text, direction)
+        if key in first_seen:
+            union(first_seen[key], i)
+        else:
+            first_seen[key] = i
+            unique.append(i)
+
+    shingle_sets = [_shingles(normalized[i], ngram) for i in unique]
+    signatures = minhash_signatures(shingle_sets, num_perm)
+    rows = num_perm // bands
+
+    for band in range(bands):
+        buckets = defaultdict(list)
+        band_values = signatures[:, band * rows:(band + 1) * rows]
+        for position, i in enumerate(unique):
+            buckets[(directions[i], band_values[position].tobytes())].append(position)
+        for members in buckets.values():
+            # Compare each member with the bucket's first member only, keeping buckets linear
+            anchor = members[0]
+            for position in members[1:]:
+                if find(unique[anchor]) == find(unique[position]):
+                    continue
+                a, b = shingle_sets[anchor], shingle_sets[position]
+                if len(a & b) / len(a | b) >= threshold:
+                    union(unique[anchor], unique[position])
+
+    return np.array([find(i) for i in range(n)])
+
+
+def deduplication_summary(representatives: np.ndarray) -> dict:
+    """How many texts a grouping leaves to score and how much inference it saves."""
+    n_texts = len(representatives)
+    n_unique = len(np.unique(representatives))
+    return {
+        "texts": n_texts,
+        "scored": n_unique,
+        "duplicates": n_texts - n_unique,
+        "inference_saved": round(1 - n_unique / n_texts, 4) if n_texts else 0.0,
+    }
@@ -0,0 +1,299 @@
+# file: src/models/backtest.py
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.features.schema import read_feature_csv
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def walk_forward_folds(n_samples: int, n_folds: int = 5, min_train_size: int = None,
+                       test_size: int = None, mode: str = "expanding") -> list:
+    """
+    Generates walk-forward train/test folds over time-ordered samples.
+
+    Args:
+        n_samples (int): Number of time-ordered samples.
+        n_folds (int): Number of consecutive test windows.
+        min_train_size (int): Size of the first training window. Defaults to an equal share of the history.
+        test_size (int): Size of each test window. Defaults to splitting the rest of the history evenly.
+        mode (str): 'expanding' keeps every past sample in the training window,
+            'rolling' keeps a fixed-size window of the most recent min_train_size samples.
+
+    Returns:
+        list: (train_start, train_end, test_start, test_end) tuples of half-open index ranges.
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+
+    if min_train_size is None:
+        min_train_size = n_samples // (n_folds + 1)
+    if test_size is None:
+        test_size = (n_samples - min_train_size) // n_folds
+    if min_train_size <= 0 or test_size <= 0 or min_train_size + test_size > n_samples:
+        raise ValueError(
+            f"Not enough samples ({n_samples}) for {n_folds} folds "
+            f"(min_train_size={min_train_size}, test_size={test_size})"
+        )
+
+    folds = []
+    test_start = min_train_size
+    while test_start < n_samples and len(folds) < n_folds:
+        test_end = min(test_start + test_size, n_samples)
+        train_start = 0 if mode == "expanding" else test_start - min_train_size
+        folds.append((train_start, test_start, test_start, test_end))
+        test_start = test_end
+    return folds
+
+
+def load_backtest_data(ticker: str, model_type: str = "lstm") -> tuple:
+    """
+    Loads the final dataset as arrays for backtesting.
+
+    Returns:
+        tuple: (features, target, next_day_return, dates, feature_names). The return at row t
+        is the close-to-close move that target[t] labels.
+    """
+    data_path = f"data/final/{ticker}_final_dataset.csv"
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Final dataset not found: {data_path}")
+
+    df = read_feature_csv(data_path)
+
+    if model_type == "baseline":
+        from src.models.train_baseline import FEATURE_COLUMNS
+        X = df[FEATURE_COLUMNS]
+    else:
+        X = df[df.columns.drop('target')].select_dtypes(include=[np.number])
+
+    close = df['close'].astype(np.float64)
+    next_day_return = (close.shift(-1) / close - 1).to_numpy()
+    return X.to_numpy(), df['target'].to_numpy(), next_day_return, df.index.to_numpy(), X.columns.tolist()
+
+
+def _run_fold(fold_id: int, fold: tuple, X: np.ndarray, y: np.ndarray, model_type: str,
+              time_steps: int, epochs: int) -> tuple:
+    """
+    Trains one fold and predicts its whole test window in a single batch.
+
+    Returns:
+        tuple: (fold_id, test sample indices, predicted probabilities of an UP move).
+    """
+    train_start, train_end, test_start, test_end = fold
+
+    if model_type == "baseline":
+        from sklearn.ensemble import RandomForestClassifier
+
+        model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1)
+        model.fit(X[train_start:train_end], y[train_start:train_end])
+        proba = model.predict_proba(X[test_start:test_end])
+        # A fold whose training window holds a single class has a single output column
+        proba_up = proba[:, list(model.classes_).index(1)] if 1 in model.classes_ else np.zeros(len(proba))
+        return fold_id, np.arange(test_start, test_end), proba_up
+
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow.keras.callbacks import EarlyStopping
+    from src.models.train_lstm import build_lstm_model, create_sequences
+
+    # Sequence j covers rows [j, j + time_steps) and is labelled by row j + time_steps.
+    # Fit the scaler on the rows seen by the training sequences only.
+    scaler = MinMaxScaler()
+    scaler.fit(X[train_start:train_end + time_steps - 1])
+    X_scaled = scaler.transform(X[train_start:test_end + time_steps])
+    X_seq, y_seq = create_sequences(X_scaled, y[train_start:test_end + time_steps], time_steps)
+
+    n_train = train_end - train_start
+    model = build_lstm_model((X_seq.shape[1], X_seq.shape[2]))
+    model.fit(
+        X_seq[:n_train], y_seq[:n_train],
+        batch_size=32,
+        epochs=epochs,
+        validation_split=0.1,
+        callbacks=[EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)],
+        shuffle=False,
+        verbose=0
+    )
+    proba_up = model.predict(X_seq[n_train:], batch_size=1024, verbose=0).ravel()
+    return fold_id, np.arange(test_start, test_end), proba_up
+
+
+def compute_backtest_metrics(y_true: np.ndarray, proba_up: np.ndarray, returns: np.ndarray,
+                             fold_ids: np.ndarray, n_bins: int = 10, long_only: bool = False,
+                             cost_per_trade: float = 0.0) -> dict:
+    """
+    Computes classification, calibration and P&L metrics over all out-of-sample predictions.
+
+    Args:
+        y_true (np.ndarray): Realised movement labels (1 = UP).
+        proba_up (np.ndarray): Predicted probabilities of an UP move.
+        returns (np.ndarray): Realised next-day returns matching y_true.
+        fold_ids (np.ndarray): Fold index of each prediction.
+        n_bins (int): Number of probability bins for the calibration table.
+        long_only (bool): If True, predicted DOWN days are spent in cash instead of short.
+        cost_per_trade (float): Proportional cost charged on every change of position.
+
+    Returns:
+        dict: Overall metrics, per-fold metrics, the calibration table and the equity curve.
+    """
+    y_true = y_true.astype(np.float64)
+    pred = (proba_up > 0.5).astype(np.float64)
+    correct = (pred == y_true).astype(np.float64)
+    clipped = np.clip(proba_up, 1e-7, 1 - 1e-7)
+
+    # Calibration
+    bins = np.minimum((proba_up * n_bins).astype(np.int64), n_bins - 1)
+    bin_counts = np.bincount(bins, minlength=n_bins)
+    nonempty = bin_counts > 0
+    mean_pred = np.bincount(bins, weights=proba_up, minlength=n_bins)[nonempty] / bin_counts[nonempty]
+    frac_up = np.bincount(bins, weights=y_true, minlength=n_bins)[nonempty] / bin_counts[nonempty]
+    ece = float(np.sum(bin_counts[nonempty] / len(y_true) * np.abs(mean_pred - frac_up)))
+
+    # Strategy P&L
+    position = np.where(pred == 1, 1.0, 0.0 if long_only else -1.0)
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    strategy_returns = position * returns - cost_per_trade * turnover
+    equity = np.cumprod(1 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    std = strategy_returns.std()
+    sharpe = float(strategy_returns.mean() / std * np.sqrt(TRADING_DAYS_PER_YEAR)) if std > 0 else 0.0
+
+    # Per-fold metrics
+    n_folds = int(fold_ids.max()) + 1
+    fold_counts = np.bincount(fold_ids, minlength=n_folds)
+    fold_counts_safe = np.maximum(fold_counts, 1)
+    fold_hit_rate = np.bincount(fold_ids, weights=correct, minlength=n_folds) / fold_counts_safe
+    fold_brier = np.bincount(fold_ids, weights=(proba_up - y_true) ** 2, minlength=n_folds) / fold_counts_safe
+    fold_return = np.exp(np.bincount(fold_ids, weights=np.log1p(strategy_returns), minlength=n_folds)) - 1
+
+    return {
+        "n_predictions": int(len(y_true)),
+        "hit_rate": float(correct.mean()),
+        "base_rate_up": float(y_true.mean()),
+        "brier_score": float(np.mean((proba_up - y_true) ** 2)),
+        "log_loss": float(-np.mean(y_true * np.log(clipped) + (1 - y_true) * np.log(1 - clipped))),
+        "expected_calibration_error": ece,
+        "total_return": float(equity[-1] - 1),
+        "buy_and_hold_return": float(np.prod(1 + returns) - 1),
+        "annualized_sharpe": sharpe,
+        "max_drawdown": float(drawdown.min()),
+        "n_trades": int(np.count_nonzero(turnover)),
+        "folds": [
+            {
+                "fold": i,
+                "n_predictions": int(fold_counts[i]),
+                "hit_rate": float(fold_hit_rate[i]),
+                "brier_score": float(fold_brier[i]),
+                "total_return": float(fold_return[i]),
+            }
+            for i in range(n_folds)
+        ],
+        "calibration": [
+            {"mean_predicted": float(p), "fraction_up": float(f), "count": int(c)}
+            for p, f, c in zip(mean_pred, frac_up, bin_counts[nonempty])
+        ],
+        "equity_curve": equity.tolist(),
+    }
+
+
+def run_walk_forward_backtest(ticker: str, model_type: str = "baseline", n_folds: int = 5,
+                              mode: str = "expanding", min_train_size: int = None,
+                              test_size: int = None, time_steps: int = 5, epochs: int = 30,
+                              max_workers: int = None, long_only: bool = False,
+                              cost_per_trade: float = 0.0) -> dict:
+    """
+    Runs a walk-forward backtest with one model fit per fold, folds trained in parallel processes.
+
+    Args:
+        ticker (str): Ticker whose final dataset is backtested.
+        model_type (str): 'baseline' (RandomForest on technical indicators) or 'lstm'.
+        n_folds (int): Number of walk-forward folds.
+        mode (str): 'expanding' or 'rolling' training window.
+        min_train_size (int): Size of the first (or every, when rolling) training window.
+        test_size (int): Number of samples predicted per fold.
+        time_steps (int): Sequence length for the LSTM.
+        epochs (int): Maximum training epochs per LSTM fold.
+        max_workers (int): Worker processes. Defaults to one per fold, capped at the CPU count.
+        long_only (bool): See compute_backtest_metrics.
+        cost_per_trade (float): See compute_backtest_metrics.
+
+    Returns:
+        dict: Backtest report, also saved under reports/backtest/.
+    """
+    if model_type not in ("baseline", "lstm"):
+        raise ValueError(f"Unknown model type: {model_type}")
+
+    print(f"Starting walk-forward backtest for {ticker} ({model_type}, {mode}, {n_folds} folds)...")
+    X, y, returns, dates, feature_names = load_backtest_data(ticker, model_type)
+
+    # LSTM samples are sequences labelled by the row after each window
+    offset = time_steps if model_type == "lstm" else 0
+    n_samples = len(y) - offset
+    folds = walk_forward_folds(n_samples, n_folds, min_train_size, test_size, mode)
+
+    max_workers = max_workers or min(len(folds), os.cpu_count() or 1)
+    # Spawned workers start without inherited TensorFlow/torch state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(_run_fold, i, fold, X, y, model_type, time_steps, epochs)
+            for i, fold in enumerate(folds)
+        ]
+        results = sorted((f.result() for f in futures), key=lambda r: r[0])
+
+    fold_ids = np.concatenate([np.full(len(idx), fold_id) for fold_id, idx, _ in results])
+    sample_idx = np.concatenate([idx for _, idx, _ in results])
+    proba_up = np.concatenate([proba for _, _, proba in results])
+    label_rows = sample_idx + offset
+
+    # The last row has no next-day close, so its return and target are undefined
+    valid = ~np.isnan(returns[label_rows])
+    fold_ids, label_rows, proba_up = fold_ids[valid], label_rows[valid], proba_up[valid]
+
+    metrics = compute_backtest_metrics(
+        y[label_rows], proba_up, returns[label_rows], fold_ids,
+        long_only=long_only, cost_per_trade=cost_per_trade
+    )
+    days = np.datetime_as_string(dates, unit='D').tolist()
+    report = {
+        "ticker": ticker,
+        "model_type": model_type,
+        "mode": mode,
+        "time_steps": time_steps if model_type == "lstm" else None,
+        "features": feature_names,
+        "fold_ranges": [
+            {"train": [days[a + offset], days[b - 1 + offset]],
+             "test": [days[c + offset], days[d - 1 + offset]]}
+            for a, b, c, d in folds
+        ],
+        **metrics,
+    }
+
+    output_dir = "reports/backtest"
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, f"{ticker}_{model_type}_walk_forward.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    predictions = pd.DataFrame({
+        "fold": fold_ids,
+        "probability_up": proba_up,
+        "target": y[label_rows],
+        "next_day_return": returns[label_rows],
+    }, index=pd.Index(dates[label_rows], name="Date"))
+    predictions.to_csv(os.path.join(output_dir, f"{ticker}_{model_type}_walk_forward_predictions.csv"))
+
+    print(f"Hit rate: {metrics['hit_rate']:.4f} | Brier: {metrics['brier_score']:.4f} | "
+          f"Return: {metrics['total_return']:.2%} (buy & hold {metrics['buy_and_hold_return']:.2%}) | "
+          f"Sharpe: {metrics['annualized_sharpe']:.2f}")
+    print(f"Backtest report saved to {report_path}")
+    return report
+
+
+if __name__ == '__main__':
+    TICKER = "AAPL"
+    run_walk_forward_backtest(TICKER, model_type="baseline", n_folds=5, mode="expanding")
@@ -5,25 +5,29 @@ from sklearn.metrics import classification_report, accuracy_score
 from sklearn.model_selection import train_test_split
 import os
 import joblib
+from src.features.schema import read_feature_csv
+
+# Technical indicators and raw prices used by the baseline
+FEATURE_COLUMNS = [
+    'SMA_20', 'SMA_50', 'RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9',
+    'MACDs_12_26_9', 'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0',
+    'BBP_20_2.0', 'close', 'high', 'low', 'open', 'volume'
+]
 
 def train_baseline_model(ticker: str):
     """
     Trains a baseline RandomForestClassifier on technical indicators only.
     """
     # Load final dataset
-    data_path = f"data/processed/{ticker}_final_dataset.csv"
+    data_path = f"data/final/{ticker}_final_dataset.csv"
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Final dataset not found: {data_path}")
     
-    df = pd.read_csv(data_path, index_col='Date', parse_dates=True)
+    df = read_feature_csv(data_path)
+    df = df[df.index.notna()]
     
     # Select features (technical indicators only)
-    feature_columns = [
-        'SMA_20', 'SMA_50', 'RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9',
-        'MACDs_12_26_9', 'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0',
-        'BBP_20_2.0', 'close', 'high', 'low', 'open', 'volume'
-    ]
-    X = df[feature_columns]
+    X = df[FEATURE_COLUMNS]
     y = df['target']
     
     # Time-series split (80% train, 20% test)
@@ -46,6 +50,12 @@ def train_baseline_model(ticker: str):
     model_path = os.path.join(model_dir, f"{ticker}_baseline_model.joblib")
     joblib.dump(model, model_path)
     print(f"Baseline model saved to {model_path}")
+
+    # Flattened copy for serving (the API's cascade mode, src/serving/compact_forest.py)
+    from src.serving.compact_forest import CompactForest
+    forest_path = os.path.join(model_dir, f"{ticker}_baseline_forest.npz")
+    CompactForest.from_sklearn(model).save(forest_path)
+    print(f"Compact forest saved to {forest_path}")
     
     # Feature importances
     importances = pd.DataFrame({
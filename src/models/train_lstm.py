@@ -6,6 +6,8 @@ os.environ["OMP_NUM_THREADS"] = "1"
 os.environ["TF_NUM_INTRAOP_THREADS"] = "1"
 os.environ["TF_NUM_INTEROP_THREADS"] = "1"
 
+import json
+from datetime import datetime, timedelta
 import joblib
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import train_test_split
@@ -14,51 +16,122 @@ import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
+from src.features.feature_store import get_feature_range, get_latest_features
+from src.features.schema import enforce_feature_schema, read_feature_csv
 
 def create_sequences(X, y, time_steps=1):
     """
     Creates sequences of data for LSTM model.
+
+    Sequence i holds rows [i, i + time_steps) of X and is labelled with y[i + time_steps].
+    Windows are built with a strided view, so no Python loop runs per sample.
     """
-    Xs, ys = [], []
-    for i in range(len(X) - time_steps):
-        v = X.iloc[i:(i + time_steps)].values
-        Xs.append(v)
-        ys.append(y.iloc[i + time_steps])
-    return np.array(Xs), np.array(ys)
+    X_values = np.asarray(X)
+    y_values = np.asarray(y)
+    n_sequences = len(X_values) - time_steps
+    if n_sequences <= 0:
+        return np.empty((0, time_steps, X_values.shape[1]), dtype=X_values.dtype), y_values[:0]
+
+    # (n, features, time_steps) view -> (n, time_steps, features)
+    windows = np.lib.stride_tricks.sliding_window_view(X_values, time_steps, axis=0)[:n_sequences]
+    Xs = np.ascontiguousarray(windows.transpose(0, 2, 1))
+    ys = y_values[time_steps:]
+    return Xs, ys
 
-def train_lstm_model(ticker: str, time_steps: int = 30):
+def build_lstm_model(input_shape, lstm_units=50, dense_units=25, dropout=0.2, learning_rate=0.001):
     """
-    Trains an LSTM model with both technical and sentiment features.
+    Builds and compiles the LSTM classifier used for next-day movement prediction.
     """
-    print("Starting Training LSTM ...")
-    print("[1/7] Loading dataset...")
-    data_path = f"data/final/{ticker}_final_dataset.csv"
-    if not os.path.exists(data_path):
-        raise FileNotFoundError(f"Final dataset not found: {data_path}")
-    
-    df = pd.read_csv(data_path, index_col='Date', parse_dates=True)
-    print(f"   Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+    model = Sequential([
+        LSTM(lstm_units, return_sequences=False, input_shape=input_shape),
+        Dropout(dropout),
+        Dense(dense_units, activation='relu'),
+        Dense(1, activation='sigmoid')
+    ])
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss='binary_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
 
-    # All columns except target are features
-    feature_columns = df.columns.drop('target')
+def load_training_data(ticker: str, start: str = None, end: str = None, last_n: int = None):
+    """
+    Loads the final dataset and splits it into numeric features and target.
+
+    Rows are read from the feature store when it holds the ticker, so only the requested
+    date range (or the last_n rows) is loaded. Otherwise the final dataset CSV is used.
+    """
+    if last_n is not None:
+        df = get_latest_features(ticker, n=last_n)
+    else:
+        df = get_feature_range(ticker, start=start, end=end)
 
-    # Keep only numeric features
+    if df.empty:
+        data_path = f"data/final/{ticker}_final_dataset.csv"
+        if not os.path.exists(data_path):
+            raise FileNotFoundError(f"Final dataset not found: {data_path}")
+
+        df = read_feature_csv(data_path)
+        if last_n is not None:
+            df = df.iloc[-last_n:]
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+
+    # Compact float32 features; columns outside the schema are dropped
+    df = enforce_feature_schema(df)
+
+    # All columns except target are features, keep only numeric ones
+    feature_columns = df.columns.drop('target')
     X = df[feature_columns].select_dtypes(include=[np.number])
     y = df['target']
+    return df, X, y
 
-    print("Features used for training:", X.columns.tolist())
-    print("Non-numeric columns dropped:", set(df[feature_columns].columns) - set(X.columns))
+def _training_meta_path(ticker: str) -> str:
+    return os.path.join("models", f"{ticker}_training_meta.json")
 
-    y = df['target']
+def load_training_meta(ticker: str) -> dict:
+    """
+    Loads the metadata written by the last full training or fine-tuning run.
+    """
+    meta_path = _training_meta_path(ticker)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
+
+def _save_training_meta(ticker: str, meta: dict):
+    os.makedirs("models", exist_ok=True)
+    with open(_training_meta_path(ticker), "w") as f:
+        json.dump(meta, f, indent=2)
+
+def train_lstm_model(ticker: str, time_steps: int = 30, lstm_units: int = 50, dense_units: int = 25,
+                     dropout: float = 0.2, batch_size: int = 32, epochs: int = 100,
+                     learning_rate: float = 0.001):
+    """
+    Trains an LSTM model with both technical and sentiment features.
+
+    The architecture and training hyperparameters default to the hand-picked values;
+    src/models/tune_lstm.py searches over them, and update_lstm_model passes the best ones.
+    """
+    print("Starting Training LSTM ...")
+    print("[1/7] Loading dataset...")
+    df, X, y = load_training_data(ticker)
+    print(f"   Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+
+    print("Features used for training:", X.columns.tolist())
+    print("Non-numeric columns dropped:", set(df.columns.drop('target')) - set(X.columns))
     
     print("[2/7] Scaling features...")
+    # MinMaxScaler keeps the float32 dtype of its input
     scaler = MinMaxScaler()
     X_scaled = scaler.fit_transform(X)
-    X_scaled = pd.DataFrame(X_scaled, index=X.index, columns=X.columns)
-    print("   Features scaled.")
+    print(f"   Features scaled ({X_scaled.dtype}).")
 
     print("[3/7] Creating sequences...")
-    X_seq, y_seq = create_sequences(X_scaled, y, time_steps)
+    X_seq, y_seq = create_sequences(X_scaled, y.to_numpy(), time_steps)
     print(f"   Sequences created: {X_seq.shape}")
 
     print("[4/7] Splitting into train/test sets...")
@@ -66,14 +139,13 @@ def train_lstm_model(ticker: str, time_steps: int = 30):
     print(f"   Train size: {len(X_train)} | Test size: {len(X_test)}")
 
     print("[5/7] Building LSTM model...")
-    model = Sequential([
-        LSTM(50, return_sequences=False, input_shape=(X_train.shape[1], X_train.shape[2])),
-        Dropout(0.2),
-        Dense(25, activation='relu'),
-        Dense(1, activation='sigmoid')
-    ])
-    
-    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    model = build_lstm_model(
+        (X_train.shape[1], X_train.shape[2]),
+        lstm_units=lstm_units,
+        dense_units=dense_units,
+        dropout=dropout,
+        learning_rate=learning_rate
+    )
     print("   Model compiled.")
 
     print("[6/7] Training model...")
@@ -81,8 +153,8 @@ def train_lstm_model(ticker: str, time_steps: int = 30):
     
     history = model.fit(
         X_train, y_train,
-        batch_size=32,
-        epochs=100,
+        batch_size=batch_size,
+        epochs=epochs,
         validation_split=0.1, # last 10% of training data
         callbacks=[early_stopping],
         shuffle=False,
@@ -102,8 +174,182 @@ def train_lstm_model(ticker: str, time_steps: int = 30):
     os.makedirs(model_dir, exist_ok=True)
     model.save(os.path.join(model_dir, f"{ticker}_lstm_model.h5"))
     joblib.dump(scaler, os.path.join(model_dir, f"{ticker}_scaler.joblib"))
+    _save_training_meta(ticker, {
+        "last_full_retrain": datetime.now().isoformat(),
+        "last_update": datetime.now().isoformat(),
+        "mode": "full",
+        "time_steps": time_steps,
+        "hyperparameters": {"lstm_units": lstm_units, "dense_units": dense_units, "dropout": dropout,
+                            "batch_size": batch_size, "learning_rate": learning_rate},
+        "feature_columns": X.columns.tolist(),
+        "trained_until": str(X.index[-1].date()),
+        "full_retrain_until": str(X.index[-1].date()),
+        "finetunes_since_full_retrain": 0,
+    })
     print(f"LSTM model and scaler saved to {model_dir}")
 
+def finetune_lstm_model(ticker: str, time_steps: int = 30, window: int = 120, epochs: int = 5,
+                        batch_size: int = 32, learning_rate: float = 0.0001,
+                        max_scale_overshoot: float = 0.05) -> bool:
+    """
+    Warm-starts from the saved model and scaler and fine-tunes on the most recent window.
+
+    The scaler is never refitted here: refitting would change the feature scale the saved
+    weights were trained on. Instead, the recent window is checked against the fitted range;
+    if any feature falls outside [0, 1] by more than max_scale_overshoot after scaling,
+    the function declines so the caller can run a full retrain with a new scaler.
+
+    Args:
+        ticker (str): Ticker symbol.
+        time_steps (int): Sequence length; must match the saved model.
+        window (int): Number of most recent sequences used for fine-tuning.
+        epochs (int): Maximum fine-tuning epochs.
+        batch_size (int): Fine-tuning batch size.
+        learning_rate (float): Learning rate, lower than for a full training.
+        max_scale_overshoot (float): Tolerated out-of-range margin in scaled units.
+
+    Returns:
+        bool: True if the model was fine-tuned and saved, False if a full retrain is needed.
+    """
+    model_path = os.path.join("models", f"{ticker}_lstm_model.h5")
+    scaler_path = os.path.join("models", f"{ticker}_scaler.joblib")
+    meta = load_training_meta(ticker)
+    if not (os.path.exists(model_path) and os.path.exists(scaler_path) and meta):
+        print("   No previous model, scaler or training metadata found.")
+        return False
+
+    # Only the rows covered by the last `window` sequences are read
+    _, X, y = load_training_data(ticker, last_n=window + time_steps)
+    if set(X.columns) != set(meta.get("feature_columns", [])):
+        print("   Feature columns changed since the last full training.")
+        return False
+    X = X[meta["feature_columns"]]
+
+    model = tf.keras.models.load_model(model_path)
+    if model.input_shape[1] != time_steps:
+        print(f"   Saved model expects time_steps={model.input_shape[1]}, got {time_steps}.")
+        return False
+
+    scaler = joblib.load(scaler_path)
+    X_scaled = scaler.transform(X)
+    overshoot = np.maximum(-X_scaled.min(axis=0), X_scaled.max(axis=0) - 1)
+    if overshoot.max() > max_scale_overshoot:
+        worst = X.columns[int(np.argmax(overshoot))]
+        print(f"   '{worst}' is {overshoot.max():.2%} outside the fitted scaler range; the scale must be refitted.")
+        return False
+
+    X_seq, y_seq = create_sequences(X_scaled, y, time_steps)
+    print(f"   Fine-tuning on the last {len(X_seq)} sequences for up to {epochs} epochs...")
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss='binary_crossentropy',
+        metrics=['accuracy']
+    )
+    model.fit(
+        X_seq, y_seq,
+        batch_size=batch_size,
+        epochs=epochs,
+        validation_split=0.1,
+        callbacks=[EarlyStopping(monitor='val_loss', patience=2, restore_best_weights=True)],
+        shuffle=False,
+        verbose=0
+    )
+
+    model.save(model_path)
+    meta.update({
+        "last_update": datetime.now().isoformat(),
+        "mode": "incremental",
+        "trained_until": str(X.index[-1].date()),
+        "finetunes_since_full_retrain": meta.get("finetunes_since_full_retrain", 0) + 1,
+    })
+    _save_training_meta(ticker, meta)
+    print(f"Fine-tuned LSTM model saved to {model_path}")
+    return True
+
+def detect_training_drift(ticker: str, min_current_rows: int = 30) -> bool:
+    """
+    Checks the rows added since the last full training for drift against the rows it used.
+
+    Fewer than min_current_rows new rows are not tested: the per-feature tests behind the
+    dataset drift verdict (K-S, chi-squared) need about that many samples to mean anything.
+    With the default weekly full retrain, the check therefore only runs once retrains are
+    spaced further apart.
+    """
+    meta = load_training_meta(ticker)
+    if not meta.get("full_retrain_until"):
+        return False
+
+    from src.monitoring.detect_drift import check_data_drift
+
+    cutoff = pd.Timestamp(meta["full_retrain_until"])
+    _, reference, _ = load_training_data(ticker, end=cutoff.strftime('%Y-%m-%d'))
+    _, current, _ = load_training_data(ticker, start=(cutoff + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+    if len(current) < min_current_rows or len(reference) < min_current_rows:
+        print(f"Drift check skipped: {len(current)} rows since the last full retrain, {min_current_rows} needed.")
+        return False
+
+    monitoring_dir = "data/monitoring"
+    os.makedirs(monitoring_dir, exist_ok=True)
+    reference_path = os.path.join(monitoring_dir, f"{ticker}_reference_data.csv")
+    current_path = os.path.join(monitoring_dir, f"{ticker}_current_data.csv")
+    reference.to_csv(reference_path, index=False)
+    current.to_csv(current_path, index=False)
+    return check_data_drift(reference_path, current_path, f"reports/{ticker}_training_drift_report.html")
+
+def update_lstm_model(ticker: str, time_steps: int = 30, mode: str = "auto",
+                      full_retrain_every_days: int = 7, **finetune_kwargs) -> str:
+    """
+    Updates the LSTM model either by fine-tuning the previous one or by a full retrain.
+
+    In 'auto' mode, a full retrain runs when there is no previous model, when the last full
+    retrain is older than full_retrain_every_days, when drift is detected on the rows added
+    since then, or when fine-tuning declines (e.g. the feature scale moved).
+
+    A full retrain uses the best parameters of the last hyperparameter search
+    (reports/hpsearch/<ticker>_best_params.json) when it was run for the same time_steps.
+
+    Args:
+        ticker (str): Ticker symbol.
+        time_steps (int): Sequence length.
+        mode (str): 'auto', 'full' or 'incremental'.
+        full_retrain_every_days (int): Schedule for full retrains in 'auto' mode.
+
+    Returns:
+        str: The mode that ran ('full' or 'incremental').
+    """
+    if mode not in ("auto", "full", "incremental"):
+        raise ValueError(f"Unknown training mode: {mode}")
+
+    if mode == "auto":
+        meta = load_training_meta(ticker)
+        if not meta or "last_full_retrain" not in meta:
+            mode = "full"
+        elif datetime.now() - datetime.fromisoformat(meta["last_full_retrain"]) >= timedelta(days=full_retrain_every_days):
+            print(f"Last full retrain is older than {full_retrain_every_days} days.")
+            mode = "full"
+        else:
+            try:
+                drifted = detect_training_drift(ticker)
+            except Exception as e:
+                # A failed check must not cost tonight's update; fine-tuning still declines on scale shifts
+                print(f"Drift check failed, continuing with fine-tuning: {type(e).__name__}: {e}")
+                drifted = False
+            mode = "full" if drifted else "incremental"
+
+    if mode == "incremental":
+        print(f"Fine-tuning LSTM model for {ticker}...")
+        if finetune_lstm_model(ticker, time_steps, **finetune_kwargs):
+            return "incremental"
+        print("Falling back to a full retrain.")
+
+    from src.models.tune_lstm import load_best_params
+
+    best_params = load_best_params(ticker, time_steps)
+    if best_params:
+        print(f"Using the best parameters of the last search: {best_params}")
+    train_lstm_model(ticker, time_steps, **best_params)
+    return "full"
+
 if __name__ == '__main__':
     TICKER = "AAPL"
     train_lstm_model(TICKER, time_steps=5)
\ No newline at end of file
@@ -0,0 +1,183 @@
+# file: src/models/train_scheduler.py
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features.feature_store import list_tickers, ticker_row_counts
+
+FINAL_DATA_DIR = "data/final"
+TRAINING_REPORT_DIR = "reports/training"
+
+
+def available_cores() -> list:
+    """CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def discover_tickers() -> list:
+    """Tickers with rows in the feature store or a final dataset CSV."""
+    tickers = set(list_tickers())
+    if os.path.isdir(FINAL_DATA_DIR):
+        tickers.update(name.split("_")[0] for name in os.listdir(FINAL_DATA_DIR)
+                       if name.endswith("_final_dataset.csv"))
+    return sorted(tickers)
+
+
+def estimate_job_costs(tickers: list) -> dict:
+    """
+    Training cost of each ticker, estimated by its number of rows.
+
+    Uses the feature store counts and falls back to the line count of the final dataset CSV.
+    Tickers without data cost 0.
+    """
+    counts = ticker_row_counts()
+    costs = {}
+    for ticker in tickers:
+        if counts.get(ticker):
+            costs[ticker] = counts[ticker]
+            continue
+        csv_path = os.path.join(FINAL_DATA_DIR, f"{ticker}_final_dataset.csv")
+        if os.path.exists(csv_path):
+            with open(csv_path, "rb") as f:
+                costs[ticker] = max(sum(1 for _ in f) - 1, 0)
+        else:
+            costs[ticker] = 0
+    return costs
+
+
+def _init_worker(core_queue):
+    """Pins the worker to one core taken from the queue and keeps TensorFlow single-threaded."""
+    os.environ["OMP_NUM_THREADS"] = "1"
+    os.environ["TF_NUM_INTRAOP_THREADS"] = "1"
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+    core = core_queue.get()
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+
+
+def _train_job(ticker: str, time_steps: int, mode: str, log_dir: str) -> dict:
+    """Trains one ticker, with its output written to a per-ticker log file."""
+    core = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    log_path = os.path.join(log_dir, f"{ticker}.log")
+    start = time.perf_counter()
+    result = {"ticker": ticker, "pid": os.getpid(), "cores": core, "log": log_path}
+    with open(log_path, "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            from src.models.train_lstm import update_lstm_model
+
+            result["mode"] = update_lstm_model(ticker, time_steps, mode=mode)
+            result["status"] = "done"
+        except Exception as e:
+            print(f"Training failed: {e}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+    result["duration_seconds"] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def train_many(tickers: list = None, time_steps: int = 5, mode: str = "full", max_workers: int = None,
+               pin_cores: bool = True) -> pd.DataFrame:
+    """
+    Trains the LSTM models of many tickers concurrently, one single-threaded worker per core.
+
+    Jobs are submitted longest first (by row count), so the largest tickers do not end up
+    running alone at the end. Each worker is pinned to its own core. Models and scalers are
+    written to the usual per-ticker files under models/.
+
+    Args:
+        tickers (list): Tickers to train. None trains every ticker with data.
+        time_steps (int): Sequence length.
+        mode (str): 'full', 'incremental' or 'auto' (see update_lstm_model).
+        max_workers (int): Worker processes. Defaults to the number of available cores.
+        pin_cores (bool): Pin each worker to a core with sched_setaffinity (Linux only).
+
+    Returns:
+        pd.DataFrame: One row per ticker with status, mode, duration and core, also saved
+            under reports/training/.
+    """
+    tickers = tickers or discover_tickers()
+    costs = estimate_job_costs(tickers)
+    skipped = [t for t in tickers if costs[t] == 0]
+    jobs = sorted((t for t in tickers if costs[t] > 0), key=lambda t: costs[t], reverse=True)
+    for ticker in skipped:
+        print(f"   No training data for {ticker}, skipped.")
+    if not jobs:
+        print("No tickers to train.")
+        return pd.DataFrame()
+
+    cores = available_cores()
+    max_workers = min(max_workers or len(cores), len(jobs))
+    log_dir = os.path.join(TRAINING_REPORT_DIR, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"Training {len(jobs)} tickers on {max_workers} worker processes (longest first)...")
+
+    context = multiprocessing.get_context("spawn")
+    core_queue = context.Queue()
+    for i in range(max_workers):
+        core_queue.put(cores[i % len(cores)] if pin_cores else None)
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker, initargs=(core_queue,)) as executor:
+        futures = {executor.submit(_train_job, t, time_steps, mode, log_dir): t for t in jobs}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"ticker": ticker, "status": "failed", "error": str(e), "duration_seconds": None}
+            result["rows"] = costs[ticker]
+            results.append(result)
+            print(f"   [{len(results)}/{len(jobs)}] {ticker} {result['status']} "
+                  f"in {result.get('duration_seconds', '?')}s on cores {result.get('cores')}")
+    wall_seconds = time.perf_counter() - start
+
+    summary = pd.DataFrame(results).sort_values("duration_seconds", ascending=False, na_position="last")
+    busy_seconds = summary["duration_seconds"].sum()
+    report = {
+        "finished_at": datetime.now().isoformat(),
+        "tickers": len(jobs),
+        "failed": int((summary["status"] != "done").sum()),
+        "skipped": skipped,
+        "workers": max_workers,
+        "wall_seconds": round(wall_seconds, 2),
+        "busy_seconds": round(float(busy_seconds), 2),
+        # Close to the worker count when the pool stays busy until the end
+        "speedup": round(float(busy_seconds) / wall_seconds, 2) if wall_seconds > 0 else None,
+    }
+
+    summary_path = os.path.join(TRAINING_REPORT_DIR, "schedule_summary.csv")
+    summary.to_csv(summary_path, index=False)
+    with open(os.path.join(TRAINING_REPORT_DIR, "schedule_summary.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Training finished: {report}")
+    print(f"Per-ticker durations saved to {summary_path}")
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the LSTM models of many tickers in parallel.")
+    parser.add_argument("--tickers", nargs="+", default=None, help="Defaults to every ticker with data")
+    parser.add_argument("--time-steps", type=int, default=5)
+    parser.add_argument("--mode", default="full", choices=["full", "incremental", "auto"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-pin", action="store_true", help="Do not pin workers to cores")
+    args = parser.parse_args()
+
+    train_many(args.tickers, time_steps=args.time_steps, mode=args.mode, max_workers=args.workers,
+               pin_cores=not args.no_pin)
@@ -0,0 +1,279 @@
+# file: src/models/tune_lstm.py
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from src.features.schema import read_feature_csv
+
+# Values tried for each hyperparameter of train_lstm_model
+SEARCH_SPACE = {
+    "time_steps": [5, 10, 20, 30],
+    "lstm_units": [32, 50, 64, 128],
+    "dense_units": [16, 25, 32],
+    "dropout": [0.1, 0.2, 0.3],
+    "batch_size": [16, 32, 64],
+    "learning_rate": [0.0003, 0.001, 0.003],
+}
+
+SEARCH_DIR = "data/cache/hpsearch"
+REPORT_DIR = "reports/hpsearch"
+
+
+def best_params_path(ticker: str) -> str:
+    return os.path.join(REPORT_DIR, f"{ticker}_best_params.json")
+
+
+def load_best_params(ticker: str, time_steps: int) -> dict:
+    """
+    Returns the best training parameters found by the last search, for train_lstm_model.
+
+    Empty if no search has run or it picked a different time_steps: the other values were
+    chosen together with that sequence length.
+    """
+    path = best_params_path(ticker)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        params = json.load(f)
+    if params.get("time_steps") != time_steps:
+        print(f"Best parameters in {path} are for time_steps={params.get('time_steps')}, not {time_steps}; using the defaults.")
+        return {}
+    return {k: v for k, v in params.items() if k in SEARCH_SPACE and k != "time_steps"}
+
+
+def prepare_search_dataset(ticker: str, max_time_steps: int, test_size: float = 0.2) -> dict:
+    """
+    Scales the final dataset and writes its sequences once as memory-mappable .npy files.
+
+    Sequences are built for the longest time_steps in the search. A trial with a shorter
+    window uses the last time_steps rows of each sequence, so every trial shares the same
+    files and the same labels.
+
+    Args:
+        ticker (str): Ticker whose final dataset is used.
+        max_time_steps (int): Longest sequence length in the search space.
+        test_size (float): Fraction of sequences held out for the final evaluation.
+
+    Returns:
+        dict: Paths of the sequence/label files and the train/test boundary.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    data_path = f"data/final/{ticker}_final_dataset.csv"
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Final dataset not found: {data_path}")
+
+    df = read_feature_csv(data_path)
+    X = df[df.columns.drop('target')].to_numpy(dtype=np.float32)
+    y = df['target'].to_numpy()
+
+    n_sequences = len(X) - max_time_steps
+    if n_sequences <= 1:
+        raise ValueError(f"Dataset has {len(X)} rows, not enough for time_steps={max_time_steps}")
+    n_train = int(n_sequences * (1 - test_size))
+
+    # Fit the scaler on the rows covered by the training sequences only
+    scaler = MinMaxScaler()
+    scaler.fit(X[:n_train + max_time_steps - 1])
+    X_scaled = scaler.transform(X)
+
+    os.makedirs(SEARCH_DIR, exist_ok=True)
+    x_path = os.path.join(SEARCH_DIR, f"{ticker}_X_{max_time_steps}.npy")
+    y_path = os.path.join(SEARCH_DIR, f"{ticker}_y_{max_time_steps}.npy")
+
+    windows = np.lib.stride_tricks.sliding_window_view(X_scaled, max_time_steps, axis=0)[:n_sequences]
+    X_seq = np.lib.format.open_memmap(
+        x_path, mode="w+", dtype=np.float32, shape=(n_sequences, max_time_steps, X.shape[1])
+    )
+    X_seq[:] = windows.transpose(0, 2, 1)
+    X_seq.flush()
+    del X_seq
+    np.save(y_path, y[max_time_steps:].astype(np.float32))
+
+    print(f"Search dataset written to {SEARCH_DIR}: {n_sequences} sequences x {max_time_steps} steps x {X.shape[1]} features")
+    return {"x_path": x_path, "y_path": y_path, "n_train": n_train}
+
+
+def sample_trials(n_trials: int = None, seed: int = 42) -> list:
+    """
+    Samples hyperparameter combinations from SEARCH_SPACE.
+
+    Args:
+        n_trials (int): Number of random combinations. None runs the full grid.
+        seed (int): Random seed for sampling.
+
+    Returns:
+        list: One parameter dict per trial.
+    """
+    keys = list(SEARCH_SPACE)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    if n_trials is None or n_trials >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, n_trials)
+
+
+def _init_worker():
+    """Keeps each trial single-threaded so trials can run one per core."""
+    os.environ["OMP_NUM_THREADS"] = "1"
+    os.environ["TF_NUM_INTRAOP_THREADS"] = "1"
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+
+
+def _run_trial(trial_id: int, params: dict, dataset: dict, epochs: int, patience: int,
+               pruning_store, pruning_lock, warmup_epochs: int, min_peers: int) -> dict:
+    """
+    Trains one trial on the shared memory-mapped sequences.
+
+    After warmup_epochs, a trial is pruned as soon as its best validation loss is worse
+    than the median best validation loss other trials reached at the same epoch.
+    """
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import Callback, EarlyStopping
+    from src.models.train_lstm import build_lstm_model
+
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    class MedianPruning(Callback):
+        def __init__(self):
+            super().__init__()
+            self.best = np.inf
+            self.pruned_at = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.best = min(self.best, logs["val_loss"])
+            with pruning_lock:
+                peers = pruning_store.get(epoch, [])
+                pruning_store[epoch] = peers + [self.best]
+            if epoch + 1 >= warmup_epochs and len(peers) >= min_peers and self.best > np.median(peers):
+                self.pruned_at = epoch + 1
+                self.model.stop_training = True
+
+    start = time.perf_counter()
+    time_steps = params["time_steps"]
+    X_all = np.load(dataset["x_path"], mmap_mode="r")
+    y_all = np.load(dataset["y_path"], mmap_mode="r")
+    n_train = dataset["n_train"]
+
+    # Last time_steps rows of each shared window
+    X_train, y_train = X_all[:n_train, -time_steps:, :], y_all[:n_train]
+    X_test, y_test = X_all[n_train:, -time_steps:, :], y_all[n_train:]
+
+    model = build_lstm_model(
+        (time_steps, X_all.shape[2]),
+        lstm_units=params["lstm_units"],
+        dense_units=params["dense_units"],
+        dropout=params["dropout"],
+        learning_rate=params["learning_rate"],
+    )
+    pruning = MedianPruning()
+    history = model.fit(
+        X_train, y_train,
+        batch_size=params["batch_size"],
+        epochs=epochs,
+        validation_split=0.1,
+        callbacks=[EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True), pruning],
+        shuffle=False,
+        verbose=0
+    )
+
+    val_loss = history.history["val_loss"]
+    best_epoch = int(np.argmin(val_loss))
+    result = {
+        "trial": trial_id,
+        **params,
+        "best_val_loss": float(val_loss[best_epoch]),
+        "best_val_accuracy": float(history.history["val_accuracy"][best_epoch]),
+        "best_epoch": best_epoch + 1,
+        "epochs_run": len(val_loss),
+        "pruned": pruning.pruned_at is not None,
+        "duration_seconds": round(time.perf_counter() - start, 2),
+    }
+    if not result["pruned"] and len(X_test):
+        y_pred = (model.predict(X_test, batch_size=1024, verbose=0).ravel() > 0.5).astype(np.float32)
+        result["test_accuracy"] = float(np.mean(y_pred == y_test))
+    return result
+
+
+def run_hyperparameter_search(ticker: str, n_trials: int = 32, epochs: int = 50, patience: int = 10,
+                              warmup_epochs: int = 5, min_peers: int = 3, max_workers: int = None,
+                              seed: int = 42) -> pd.DataFrame:
+    """
+    Runs single-threaded LSTM training trials in parallel worker processes, one per core.
+
+    Args:
+        ticker (str): Ticker whose final dataset is used.
+        n_trials (int): Number of sampled combinations (None for the full grid).
+        epochs (int): Maximum epochs per trial.
+        patience (int): Early stopping patience per trial.
+        warmup_epochs (int): Epochs a trial always runs before it can be pruned.
+        min_peers (int): Reports needed at an epoch before pruning compares against them.
+        max_workers (int): Worker processes. Defaults to the CPU count.
+        seed (int): Random seed for sampling trials.
+
+    Returns:
+        pd.DataFrame: Leaderboard sorted by best validation loss, also saved under reports/hpsearch/.
+            Empty if every trial failed.
+    """
+    trials = sample_trials(n_trials, seed)
+    max_time_steps = max(t["time_steps"] for t in trials)
+    dataset = prepare_search_dataset(ticker, max_time_steps)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"Running {len(trials)} trials on {max_workers} worker processes...")
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with context.Manager() as manager:
+        pruning_store = manager.dict()
+        pruning_lock = manager.Lock()
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(_run_trial, i, params, dataset, epochs, patience,
+                                pruning_store, pruning_lock, warmup_epochs, min_peers): i
+                for i, params in enumerate(trials)
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"   Trial {futures[future]} failed: {e}")
+                    continue
+                results.append(result)
+                status = "pruned" if result["pruned"] else "done"
+                print(f"   Trial {result['trial']} {status}: val_loss={result['best_val_loss']:.4f} "
+                      f"after {result['epochs_run']} epochs ({result['duration_seconds']}s)")
+
+    if not results:
+        print(f"All {len(trials)} trials failed (see the errors above); no leaderboard was written.")
+        return pd.DataFrame()
+
+    leaderboard = pd.DataFrame(results).sort_values("best_val_loss").reset_index(drop=True)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    leaderboard_path = os.path.join(REPORT_DIR, f"{ticker}_leaderboard.csv")
+    leaderboard.to_csv(leaderboard_path, index=False)
+
+    best = leaderboard[~leaderboard["pruned"]].head(1)
+    if not best.empty:
+        best_params = {k: best.iloc[0][k].item() for k in SEARCH_SPACE}
+        with open(best_params_path(ticker), "w") as f:
+            json.dump(best_params, f, indent=2)
+        print(f"Best parameters: {best_params}")
+
+    print(f"Leaderboard saved to {leaderboard_path}")
+    print(leaderboard.head(5))
+    return leaderboard
+
+
+if __name__ == '__main__':
+    TICKER = "AAPL"
+    run_hyperparameter_search(TICKER, n_trials=32)
@@ -24,7 +24,8 @@ def check_data_drift(reference_path: str, current_path: str, report_path: str) -
     
     # Programmatically check for drift
     report_dict = data_drift_report.as_dict()
-    is_drifted = report_dict['metrics']['result']['dataset_drift']
+    # The first metric of DataDriftPreset is the dataset-level drift summary
+    is_drifted = report_dict['metrics'][0]['result']['dataset_drift']
     
     print(f"Drift detected: {is_drifted}")
     print(f"Drift report saved to: {report_path}")
@@ -32,17 +33,21 @@ def check_data_drift(reference_path: str, current_path: str, report_path: str) -
     return is_drifted
 
 if __name__ == '__main__':
+    from datetime import datetime, timedelta
+    from src.features.feature_store import get_feature_range
+
     TICKER = "AAPL"
-    # In a real scenario, current_data would be recently collected live data
-    # Here we simulate it by splitting our dataset
-    df = pd.read_csv(f"data/processed/{TICKER}_final_dataset.csv")
-    
-    # Reference data is the first half, current data is the second half
-    ref_df = df.iloc[:len(df)//2]
-    curr_df = df.iloc[len(df)//2:]
+    # Current data is the last 30 days, reference data is the 180 days before that.
+    # Only those rows are read from the feature store.
+    today = datetime.now()
+    split_date = today - timedelta(days=30)
+    ref_df = get_feature_range(TICKER, start=(split_date - timedelta(days=180)).strftime('%Y-%m-%d'),
+                               end=split_date.strftime('%Y-%m-%d'))
+    curr_df = get_feature_range(TICKER, start=(split_date + timedelta(days=1)).strftime('%Y-%m-%d'))
     
     ref_path = "data/monitoring/reference_data.csv"
     curr_path = "data/monitoring/current_data.csv"
+    os.makedirs(os.path.dirname(ref_path), exist_ok=True)
     ref_df.to_csv(ref_path, index=False)
     curr_df.to_csv(curr_path, index=False)
     
@@ -0,0 +1,158 @@
+# file: src/serving/compact_forest.py
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+class CompactForest:
+    """
+    A fitted binary RandomForestClassifier flattened into a few NumPy arrays.
+
+    All trees share one node table: feature, threshold, left and right child, and the
+    probability of class 1 at each node. All (sample, tree) pairs descend one level per
+    vectorized step, and pairs that reached a leaf (a node that is its own left child) drop
+    out of the active set. Predictions match sklearn's predict_proba (inputs are compared in
+    float32, as sklearn does).
+
+    Args:
+        arrays (dict): feature, threshold, left, right, value, roots, max_depth, feature_names.
+    """
+
+    def __init__(self, arrays: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.feature_names = [str(name) for name in arrays["feature_names"]]
+        self.is_leaf = self.left == np.arange(len(self.left))
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompactForest":
+        if list(model.classes_) != [0, 1]:
+            raise ValueError(f"Only binary 0/1 classifiers are supported, got classes {model.classes_}")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            node_ids = np.arange(tree.node_count)
+            roots.append(offset)
+            # Leaves: feature 0 and threshold +inf, both children the leaf itself
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            counts = tree.value[:, 0, :]
+            values.append(counts[:, 1] / counts.sum(axis=1))
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        names = getattr(model, "feature_names_in_", None)
+        if names is None:
+            names = [f"feature_{i}" for i in range(model.n_features_in_)]
+        return cls({
+            "feature": np.concatenate(features).astype(np.int32),
+            "threshold": np.concatenate(thresholds).astype(np.float64),
+            "left": np.concatenate(lefts).astype(np.int32),
+            "right": np.concatenate(rights).astype(np.int32),
+            "value": np.concatenate(values).astype(np.float64),
+            "roots": np.asarray(roots, dtype=np.int32),
+            "max_depth": max_depth,
+            "feature_names": np.asarray(names, dtype=str),
+        })
+
+    @classmethod
+    def load(cls, path: str) -> "CompactForest":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            value=self.value, roots=self.roots, max_depth=self.max_depth,
+            feature_names=np.asarray(self.feature_names, dtype=str),
+        )
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, shape (n_samples, 2), columns [down, up]."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        n_samples, n_trees = len(X), len(self.roots)
+        nodes = np.tile(self.roots, n_samples)
+        samples = np.repeat(np.arange(n_samples), n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            go_left = X[samples[active], self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[~self.is_leaf[nodes[active]]]
+        up = self.value[nodes].reshape(n_samples, n_trees).mean(axis=1)
+        return np.column_stack([1 - up, up])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+
+def export_baseline_forest(ticker: str, model_dir: str = "models") -> str:
+    """Converts models/{ticker}_baseline_model.joblib to models/{ticker}_baseline_forest.npz."""
+    import joblib
+
+    model = joblib.load(os.path.join(model_dir, f"{ticker}_baseline_model.joblib"))
+    forest = CompactForest.from_sklearn(model)
+    path = os.path.join(model_dir, f"{ticker}_baseline_forest.npz")
+    forest.save(path)
+    print(f"Compact forest ({len(forest.roots)} trees, {forest.n_nodes} nodes, depth {forest.max_depth}) saved to {path}")
+    return path
+
+
+if __name__ == "__main__":
+    import joblib
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Export the baseline forest and compare it with sklearn.")
+    parser.add_argument("--ticker", default="AAPL")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic rows for the comparison")
+    args = parser.parse_args()
+
+    path = export_baseline_forest(args.ticker)
+    model = joblib.load(os.path.join("models", f"{args.ticker}_baseline_model.joblib"))
+    forest = CompactForest.load(path)
+
+    # Rows spread around the training range of each feature
+    rng = np.random.default_rng(0)
+    thresholds = pd.DataFrame({"feature": forest.feature, "threshold": forest.threshold})
+    thresholds = thresholds[np.isfinite(thresholds["threshold"])]
+    low = thresholds.groupby("feature")["threshold"].min().reindex(range(len(forest.feature_names))).fillna(0)
+    high = thresholds.groupby("feature")["threshold"].max().reindex(range(len(forest.feature_names))).fillna(1)
+    span = (high - low).to_numpy() + 1e-6
+    X = pd.DataFrame(rng.uniform(low.to_numpy() - 0.2 * span, high.to_numpy() + 0.2 * span,
+                                 (args.rows, len(span))), columns=forest.feature_names)
+
+    expected = model.predict_proba(X)[:, 1]
+    actual = forest.predict_proba(X.to_numpy())[:, 1]
+    print(f"Max probability difference vs sklearn: {np.abs(expected - actual).max():.2e}")
+
+    for label, batch in (("single row", X.iloc[:1]), (f"{args.rows} rows", X)):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        sklearn_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        forest.predict_proba(batch.to_numpy())
+        compact_ms = (time.perf_counter() - start) * 1000
+        print(f"{label}: sklearn {sklearn_ms:.2f} ms, compact {compact_ms:.2f} ms")
@@ -0,0 +1,76 @@
+# file: src/serving/explain.py
+import numpy as np
+
+
+def _model_gradient(model, x: np.ndarray):
+    """
+    Outputs and input gradients of the first output unit, in one batched forward/backward pass.
+
+    Uses NumpyLSTMClassifier.gradient when available, otherwise a TensorFlow GradientTape.
+    """
+    if hasattr(model, "gradient"):
+        return model.gradient(x)
+
+    import tensorflow as tf
+
+    inputs = tf.convert_to_tensor(x, dtype=tf.float32)
+    with tf.GradientTape() as tape:
+        tape.watch(inputs)
+        outputs = model(inputs, training=False)
+        target = outputs[:, 0]
+    return outputs.numpy(), tape.gradient(target, inputs).numpy()
+
+
+def integrated_gradients(model, window: np.ndarray, baseline: np.ndarray = None, steps: int = 32) -> dict:
+    """
+    Integrated gradients of the predicted probability for one (timesteps, features) window.
+
+    The path from the baseline to the window is sampled at steps + 1 points, which are scored
+    as a single batch; the path integral is approximated with the trapezoidal rule.
+    Attributions sum to f(window) - f(baseline) up to the reported convergence_delta.
+
+    Args:
+        model: Keras model or NumpyLSTMClassifier with one sigmoid output.
+        window (np.ndarray): Scaled input, shape (timesteps, features).
+        baseline (np.ndarray): Reference input of the same shape. Defaults to zeros, the
+            minimum of the MinMax-scaled training range.
+        steps (int): Integration steps.
+
+    Returns:
+        dict: attributions (timesteps, features), probability, baseline_probability,
+            convergence_delta.
+    """
+    window = np.asarray(window, dtype=np.float32)
+    baseline = np.zeros_like(window) if baseline is None else np.asarray(baseline, dtype=np.float32)
+
+    alphas = np.linspace(0, 1, steps + 1, dtype=np.float32)[:, None, None]
+    path = baseline[None] + alphas * (window - baseline)[None]
+    outputs, gradients = _model_gradient(model, path)
+
+    average_gradient = (gradients[:-1] + gradients[1:]).mean(axis=0) / 2
+    attributions = (window - baseline) * average_gradient
+    probability, baseline_probability = float(outputs[-1, 0]), float(outputs[0, 0])
+    return {
+        "attributions": attributions,
+        "probability": probability,
+        "baseline_probability": baseline_probability,
+        "convergence_delta": float(attributions.sum() - (probability - baseline_probability)),
+    }
+
+
+def summarize_attributions(attributions: np.ndarray, feature_names: list = None) -> dict:
+    """
+    Per-feature totals (summed over timesteps) and per-timestep totals (summed over features).
+
+    Returns:
+        dict: feature_importance as {feature: attribution} sorted by absolute value,
+            timestep_importance oldest first.
+    """
+    timesteps, features = attributions.shape
+    names = feature_names if feature_names and len(feature_names) == features else [f"feature_{i}" for i in range(features)]
+    per_feature = attributions.sum(axis=0)
+    order = np.argsort(-np.abs(per_feature))
+    return {
+        "feature_importance": {names[i]: float(per_feature[i]) for i in order},
+        "timestep_importance": attributions.sum(axis=1).tolist(),
+    }
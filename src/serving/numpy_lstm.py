@@ -0,0 +1,214 @@
+# file: src/serving/numpy_lstm.py
+import json
+import mmap
+
+import numpy as np
+
+# Activations used by the Keras layers of the LSTM classifier
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    # tanh form of the logistic function, no overflow for large negative inputs
+    "sigmoid": lambda x: 0.5 * (1 + np.tanh(0.5 * x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0, 1),
+}
+
+# Derivatives of the activations with respect to their input, used by gradient()
+DERIVATIVES = {
+    "linear": lambda x: np.ones_like(x),
+    "relu": lambda x: (x > 0).astype(x.dtype),
+    "tanh": lambda x: 1 - np.tanh(x) ** 2,
+    "sigmoid": lambda x: ACTIVATIONS["sigmoid"](x) * (1 - ACTIVATIONS["sigmoid"](x)),
+    "hard_sigmoid": lambda x: np.where((x > -2.5) & (x < 2.5), 0.2, 0.0).astype(x.dtype),
+}
+
+
+def read_keras_h5(model_path: str) -> list:
+    """
+    Reads layer configs and weights from a Keras .h5 file without importing TensorFlow.
+
+    Works with the legacy HDF5 format written by both Keras 2 and Keras 3 (model.save('*.h5')).
+
+    Returns:
+        list: (class_name, config, [weight arrays]) per layer, in model order.
+    """
+    import h5py
+
+    with h5py.File(model_path, "r") as f:
+        model_config = json.loads(f.attrs["model_config"])
+        weights_group = f["model_weights"]
+        layers = []
+        for layer in model_config["config"]["layers"]:
+            name = layer["config"]["name"]
+            weights = []
+            if name in weights_group:
+                group = weights_group[name]
+                for weight_name in group.attrs.get("weight_names", []):
+                    weight_name = weight_name.decode() if isinstance(weight_name, bytes) else weight_name
+                    weights.append(group[weight_name][()])
+            layers.append((layer["class_name"], layer["config"], weights))
+    return layers
+
+
+def _pack_read_only(arrays: list) -> list:
+    """
+    Copies arrays into one anonymous shared memory mapping and returns read-only views.
+
+    Pages of a MAP_SHARED mapping are shared by every process forked afterwards, so
+    workers never copy the weights, even when Python touches the array objects.
+    """
+    arrays = [np.ascontiguousarray(a, dtype=np.float32) for a in arrays]
+    total = sum(a.nbytes for a in arrays)
+    buffer = mmap.mmap(-1, max(total, 1), flags=mmap.MAP_SHARED, prot=mmap.PROT_READ | mmap.PROT_WRITE)
+
+    views, offset = [], 0
+    for a in arrays:
+        view = np.frombuffer(buffer, dtype=np.float32, count=a.size, offset=offset).reshape(a.shape)
+        view[...] = a
+        view.flags.writeable = False
+        views.append(view)
+        offset += a.nbytes
+    return views
+
+
+class NumpyLSTMClassifier:
+    """
+    NumPy forward pass of the Sequential LSTM -> Dropout -> Dense -> Dense classifier.
+
+    Only inference is supported; Dropout is the identity at inference time. The weights
+    live in a shared read-only buffer so pre-forked workers can use one copy.
+    """
+
+    def __init__(self, layers: list):
+        self.layers = []
+        self.input_shape = None
+        weights = [w for _, _, layer_weights in layers for w in layer_weights]
+        shared = iter(_pack_read_only(weights))
+
+        for class_name, config, layer_weights in layers:
+            params = [next(shared) for _ in layer_weights]
+            if class_name == "InputLayer":
+                shape = config.get("batch_shape") or config.get("batch_input_shape")
+                self.input_shape = tuple(shape)
+            elif class_name == "LSTM":
+                if config.get("return_sequences") or config.get("go_backwards") or config.get("stateful"):
+                    raise ValueError("Only single-output, forward, stateless LSTM layers are supported")
+                if self.input_shape is None and config.get("batch_input_shape"):
+                    self.input_shape = tuple(config["batch_input_shape"])
+                self.layers.append(("lstm", params, config.get("activation", "tanh"),
+                                    config.get("recurrent_activation", "sigmoid"), config.get("use_bias", True)))
+            elif class_name == "Dense":
+                self.layers.append(("dense", params, config.get("activation", "linear"), None, config.get("use_bias", True)))
+            elif class_name == "Dropout":
+                continue
+            else:
+                raise ValueError(f"Unsupported layer for NumPy inference: {class_name}")
+
+            for activation in (self.layers[-1][2], self.layers[-1][3]) if self.layers else ():
+                if activation is not None and activation not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation for NumPy inference: {activation}")
+
+        self.output_shape = (None, self.layers[-1][1][0].shape[1])
+
+    @classmethod
+    def from_h5(cls, model_path: str) -> "NumpyLSTMClassifier":
+        return cls(read_keras_h5(model_path))
+
+    @staticmethod
+    def _lstm(x, params, activation, recurrent_activation, use_bias, steps=None):
+        kernel, recurrent_kernel = params[0], params[1]
+        bias = params[2] if use_bias else 0
+        act, rec_act = ACTIVATIONS[activation], ACTIVATIONS[recurrent_activation]
+        units = recurrent_kernel.shape[0]
+        batch = x.shape[0]
+
+        # Input projections for all timesteps in one matmul: (batch, timesteps, 4 * units)
+        projected = x @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        for t in range(x.shape[1]):
+            z = projected[:, t, :] + h @ recurrent_kernel
+            # Keras gate order: input, forget, cell, output
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c_prev = c
+            c = f * c + i * g
+            h = o * act(c)
+            if steps is not None:
+                steps.append((z, i, f, g, o, c_prev, c))
+        return h
+
+    @staticmethod
+    def _lstm_backward(grad_h, steps, params, activation, recurrent_activation):
+        """Backpropagation through time from the last hidden state to the layer inputs."""
+        kernel, recurrent_kernel = params[0], params[1]
+        act, d_act, d_rec = ACTIVATIONS[activation], DERIVATIVES[activation], DERIVATIVES[recurrent_activation]
+        units = recurrent_kernel.shape[0]
+
+        grad_c = np.zeros_like(grad_h)
+        grad_x = []
+        for z, i, f, g, o, c_prev, c in reversed(steps):
+            grad_o = grad_h * act(c)
+            grad_c = grad_c + grad_h * o * d_act(c)
+            grad_z = np.concatenate([
+                grad_c * g * d_rec(z[:, :units]),
+                grad_c * c_prev * d_rec(z[:, units:2 * units]),
+                grad_c * i * d_act(z[:, 2 * units:3 * units]),
+                grad_o * d_rec(z[:, 3 * units:]),
+            ], axis=1)
+            grad_x.append(grad_z @ kernel.T)
+            grad_h = grad_z @ recurrent_kernel.T
+            grad_c = grad_c * f
+        return np.stack(grad_x[::-1], axis=1)
+
+    def gradient(self, x: np.ndarray, output_index: int = 0):
+        """
+        Outputs and gradients of one output unit with respect to the inputs.
+
+        Args:
+            x (np.ndarray): Batch of sequences, shape (batch, timesteps, features).
+            output_index (int): Output unit to differentiate.
+
+        Returns:
+            tuple: (outputs of shape (batch, units of the last layer), gradients shaped like x).
+        """
+        out = np.asarray(x, dtype=np.float32)
+        records = []
+        for kind, params, activation, recurrent_activation, use_bias in self.layers:
+            if kind == "lstm":
+                steps = []
+                out = self._lstm(out, params, activation, recurrent_activation, use_bias, steps)
+                records.append(steps)
+            else:
+                pre = out @ params[0] + (params[1] if use_bias else 0)
+                records.append(pre)
+                out = ACTIVATIONS[activation](pre)
+
+        grad = np.zeros_like(out)
+        grad[:, output_index] = 1
+        for (kind, params, activation, recurrent_activation, _), record in zip(reversed(self.layers), reversed(records)):
+            if kind == "lstm":
+                grad = self._lstm_backward(grad, record, params, activation, recurrent_activation)
+            else:
+                grad = (grad * DERIVATIVES[activation](record)) @ params[0].T
+        return out, grad
+
+    def predict(self, x: np.ndarray, verbose: int = 0) -> np.ndarray:
+        """
+        Args:
+            x (np.ndarray): Batch of sequences, shape (batch, timesteps, features).
+            verbose (int): Ignored, accepted for compatibility with keras Model.predict.
+
+        Returns:
+            np.ndarray: Model outputs, shape (batch, units of the last layer).
+        """
+        out = np.asarray(x, dtype=np.float32)
+        for kind, params, activation, recurrent_activation, use_bias in self.layers:
+            if kind == "lstm":
+                out = self._lstm(out, params, activation, recurrent_activation, use_bias)
+            else:
+                out = ACTIVATIONS[activation](out @ params[0] + (params[1] if use_bias else 0))
+        return out
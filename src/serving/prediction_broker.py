@@ -0,0 +1,150 @@
+# file: src/serving/prediction_broker.py
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+
+class _Subscriber:
+    def __init__(self, tickers: set, queue_size: int):
+        self.tickers = tickers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+        self.overflowed = False
+
+
+class PredictionBroker:
+    """
+    Fans out published predictions to any number of subscribers.
+
+    Every event gets a cursor id "<epoch>-<seq>": seq increases across all tickers and the
+    epoch identifies this broker (process id and start time). The last history_size events
+    are kept, so a subscriber that reconnects with the last id it saw receives what it
+    missed before the live events. A cursor from another epoch (a restarted process or
+    another pre-forked worker), or one this broker cannot resume from, gets a 'reset' and
+    the latest event of each ticker instead. A subscriber that falls more than queue_size
+    events behind is disconnected (it can resume from its cursor) instead of slowing publishers.
+
+    publish() may be called from any thread; subscribe() runs on an asyncio event loop.
+    A broker inherited through fork() starts a new epoch in the child on first use.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 256):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._start_epoch()
+
+    def _start_epoch(self):
+        self._pid = os.getpid()
+        self.epoch = f"{self._pid}.{int(time.time() * 1000)}"
+        self.history = deque(maxlen=self.history_size)
+        self.latest = {}
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._subscribers = set()
+        self.stats = {"published": 0, "delivered": 0, "dropped_subscribers": 0, "resets": 0}
+
+    def _check_fork(self):
+        if os.getpid() != self._pid:
+            self._lock = threading.Lock()
+            self._start_epoch()
+
+    def cursor(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, ticker: str, payload: dict) -> dict:
+        """Records a prediction and queues it for every subscriber of the ticker."""
+        self._check_fork()
+        with self._lock:
+            seq = next(self._seq)
+            self._last_seq = seq
+            event = {"id": self.cursor(seq), "seq": seq, "ticker": ticker, "published_at": time.time(), "data": payload}
+            self.history.append(event)
+            self.latest[ticker] = event
+            self.stats["published"] += 1
+            subscribers = [s for s in self._subscribers if s.tickers is None or ticker in s.tickers]
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(self._deliver, subscriber, event)
+        return event
+
+    def _deliver(self, subscriber: _Subscriber, event: dict):
+        try:
+            subscriber.queue.put_nowait(event)
+            self.stats["delivered"] += 1
+        except asyncio.QueueFull:
+            subscriber.overflowed = True
+            self.stats["dropped_subscribers"] += 1
+
+    def snapshot(self, tickers: set = None) -> list:
+        """Latest event of each ticker."""
+        self._check_fork()
+        with self._lock:
+            return sorted((e for t, e in self.latest.items() if tickers is None or t in tickers),
+                          key=lambda e: e["seq"])
+
+    def _resume_seq(self, since: str, buffered: list, last_seq: int):
+        """Sequence number to replay after, or None if the cursor cannot be resumed from."""
+        epoch, _, seq = str(since).rpartition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > last_seq:
+            return None
+        oldest = buffered[0]["seq"] if buffered else last_seq + 1
+        return int(seq) if int(seq) >= oldest - 1 else None
+
+    async def subscribe(self, tickers: set = None, since: str = None, heartbeat_seconds: float = 15):
+        """
+        Yields events for the tickers (None for all), oldest first.
+
+        Args:
+            tickers (set): Tickers to receive.
+            since (str): Last event id the client saw. Buffered events after it are replayed;
+                None starts with the latest event of each ticker. If the id belongs to another
+                epoch, is newer than any id issued here, or events after it have already left
+                the buffer, a 'reset' event is yielded first and the client should treat the
+                snapshot that follows as complete state.
+            heartbeat_seconds (float): A None is yielded after this long without events, so
+                transports can send keep-alives and notice closed connections.
+        """
+        self._check_fork()
+        subscriber = _Subscriber(tickers, self.queue_size)
+        # Register before reading the buffer, so no event falls between replay and live delivery
+        with self._lock:
+            self._subscribers.add(subscriber)
+            buffered = list(self.history)
+            last_seq = self._last_seq
+        try:
+            resume_seq = self._resume_seq(since, buffered, last_seq) if since is not None else None
+            if since is None:
+                backlog = self.snapshot(tickers)
+            elif resume_seq is None:
+                self.stats["resets"] += 1
+                yield {"id": self.cursor(last_seq), "seq": last_seq, "event": "reset", "ticker": None,
+                       "data": {"epoch": self.epoch, "latest_id": self.cursor(last_seq)}}
+                backlog = self.snapshot(tickers)
+            else:
+                backlog = [e for e in buffered if e["seq"] > resume_seq and (tickers is None or e["ticker"] in tickers)]
+
+            seen = resume_seq or 0
+            for event in backlog:
+                seen = max(seen, event["seq"])
+                yield event
+
+            while not subscriber.overflowed:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["seq"] <= seen:
+                    continue
+                seen = event["seq"]
+                yield event
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
@@ -0,0 +1,100 @@
+# file: src/serving/prediction_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def file_version(*paths: str) -> str:
+    """
+    Cheap version string of one or more files from their modification time and size.
+
+    Missing files contribute "missing", so creating a file also changes the version.
+    """
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+        except FileNotFoundError:
+            parts.append("missing")
+    return "/".join(parts)
+
+
+def window_fingerprint(window: np.ndarray) -> str:
+    """Hash of an input window's shape, dtype and values."""
+    window = np.ascontiguousarray(window)
+    digest = hashlib.sha256(f"{window.shape}{window.dtype}".encode())
+    digest.update(window.tobytes())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of prediction responses with a time-to-live.
+
+    Keys embed the model version, so responses of a replaced model are never returned.
+    set_model_version() additionally drops every entry when the version changes,
+    instead of waiting for them to age out.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def set_model_version(self, version: str):
+        with self._lock:
+            if self._model_version is not None and version != self._model_version:
+                self._entries.clear()
+                self.counters["invalidations"] += 1
+            self._model_version = version
+
+    def get(self, key: tuple):
+        """Returns the cached response for key, or None on a miss or expired entry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            expires_at, value = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return value
+
+    def put(self, key: tuple, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.counters["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else None,
+                "model_version": self._model_version,
+            }
@@ -0,0 +1,67 @@
+# file: src/serving/prediction_history.py
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features.schema import FEATURE_COLUMNS, read_feature_csv
+
+PREDICTION_HISTORY_DIR = "data/predictions"
+
+
+def prediction_history_path(ticker: str, output_dir: str = PREDICTION_HISTORY_DIR) -> str:
+    return os.path.join(output_dir, f"{ticker}_prediction_history.csv")
+
+
+def compute_prediction_history(ticker: str, model_dir: str = "models", data_dir: str = "data/final") -> pd.DataFrame:
+    """
+    Scores every window of a ticker's final dataset with its current model, in one batch.
+
+    Uses the NumPy LSTM forward pass, so TensorFlow is not needed.
+
+    Returns:
+        pd.DataFrame: Indexed by the date of each window's last row, with close,
+            probability_up, prediction and the realised target.
+    """
+    import joblib
+    from src.serving.numpy_lstm import NumpyLSTMClassifier
+
+    model = NumpyLSTMClassifier.from_h5(os.path.join(model_dir, f"{ticker}_lstm_model.h5"))
+    scaler = joblib.load(os.path.join(model_dir, f"{ticker}_scaler.joblib"))
+    _, time_steps, _ = model.input_shape
+
+    df = read_feature_csv(os.path.join(data_dir, f"{ticker}_final_dataset.csv"))
+    df = df[df.index.notna()]
+    scaled = scaler.transform(df[FEATURE_COLUMNS]).astype(np.float32)
+    # Window i ends on row i + time_steps - 1
+    windows = np.lib.stride_tricks.sliding_window_view(scaled, time_steps, axis=0).transpose(0, 2, 1)
+    probabilities = np.asarray(model.predict(windows))[:, 0]
+
+    history = df.iloc[time_steps - 1:][["close", "target"]].copy()
+    history["probability_up"] = probabilities
+    history["prediction"] = (probabilities > 0.5).astype(int)
+    return history
+
+
+def update_prediction_history(ticker: str, output_dir: str = PREDICTION_HISTORY_DIR) -> str:
+    """Recomputes and saves a ticker's prediction history. Returns the path written."""
+    history = compute_prediction_history(ticker)
+    os.makedirs(output_dir, exist_ok=True)
+    path = prediction_history_path(ticker, output_dir)
+    history.to_csv(path)
+    print(f"Prediction history of {ticker} ({len(history)} days) saved to {path}")
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute the prediction history shown on the dashboard.")
+    parser.add_argument("--tickers", nargs="+", default=["AAPL"])
+    args = parser.parse_args()
+
+    for ticker in args.tickers:
+        update_prediction_history(ticker)
@@ -0,0 +1,43 @@
+# file: src/serving/process_memory.py
+import os
+
+
+def process_memory(pid="self") -> dict:
+    """
+    Reads the memory footprint of a process from /proc (Linux only).
+
+    RSS counts shared pages in full for every process mapping them. PSS divides shared
+    pages between the processes that map them, so summing PSS over pre-forked workers
+    gives their real combined footprint.
+
+    Args:
+        pid: Process id, or "self" for the current process.
+
+    Returns:
+        dict: rss_mb, pss_mb, shared_mb and private_mb (None where unavailable).
+    """
+    fields = {}
+    path = f"/proc/{pid}/smaps_rollup"
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    elif os.path.exists(f"/proc/{pid}/status"):
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    fields["Rss"] = int(line.split()[1])
+
+    def mb(*keys):
+        if not all(k in fields for k in keys):
+            return None
+        return round(sum(fields[k] for k in keys) / 1024, 1)
+
+    return {
+        "rss_mb": mb("Rss"),
+        "pss_mb": mb("Pss"),
+        "shared_mb": mb("Shared_Clean", "Shared_Dirty"),
+        "private_mb": mb("Private_Clean", "Private_Dirty"),
+    }
@@ -0,0 +1,88 @@
+# file: src/streaming/bar_sources.py
+import asyncio
+import time
+
+import pandas as pd
+
+# A bar is a dict with these keys; sources are async iterables of bars in time order
+BAR_FIELDS = ["timestamp", "ticker", "open", "high", "low", "close", "volume"]
+
+
+class FileReplaySource:
+    """
+    Replays minute bars from a CSV with columns timestamp, ticker, open, high, low, close, volume.
+
+    Args:
+        path (str): CSV in long format (one row per ticker and minute).
+        speed (float): Replay speed relative to real time (60 plays one minute per second).
+            0 replays as fast as possible.
+        tickers (list): Only replay these tickers. None replays all.
+    """
+
+    def __init__(self, path: str, speed: float = 0, tickers: list = None):
+        self.path = path
+        self.speed = speed
+        self.tickers = tickers
+
+    async def __aiter__(self):
+        df = pd.read_csv(self.path, parse_dates=["timestamp"])
+        if self.tickers:
+            df = df[df["ticker"].isin(self.tickers)]
+        df = df.sort_values("timestamp", kind="stable")
+
+        start_wall, start_bar = time.monotonic(), None
+        for bar in df[BAR_FIELDS].to_dict("records"):
+            if self.speed > 0:
+                start_bar = start_bar or bar["timestamp"]
+                due = start_wall + (bar["timestamp"] - start_bar).total_seconds() / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                # Let the consumer run between bars
+                await asyncio.sleep(0)
+            yield bar
+
+
+class YFinanceMinuteSource:
+    """
+    Polls Yahoo Finance for the current day's 1-minute bars and yields bars not seen before.
+
+    Args:
+        tickers (list): Ticker symbols.
+        poll_seconds (float): Seconds between polls.
+    """
+
+    def __init__(self, tickers: list, poll_seconds: float = 60):
+        self.tickers = tickers
+        self.poll_seconds = poll_seconds
+
+    def _download(self) -> pd.DataFrame:
+        import yfinance as yf
+
+        frames = []
+        for ticker in self.tickers:
+            df = yf.download(ticker, period="1d", interval="1m", auto_adjust=True, progress=False)
+            if df.empty:
+                continue
+            if isinstance(df.columns, pd.MultiIndex):
+                df.columns = df.columns.get_level_values(0)
+            df = df.rename(columns=str.lower).rename_axis("timestamp").reset_index()
+            df["ticker"] = ticker
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=BAR_FIELDS)
+        return pd.concat(frames).sort_values("timestamp", kind="stable")
+
+    async def __aiter__(self):
+        last_seen = {}
+        while True:
+            df = await asyncio.to_thread(self._download)
+            # The last minute of each ticker is still forming; it is emitted on a later poll
+            df = df.groupby("ticker", sort=False).head(-1)
+            for bar in df[BAR_FIELDS].to_dict("records"):
+                seen = last_seen.get(bar["ticker"])
+                if seen is None or bar["timestamp"] > seen:
+                    last_seen[bar["ticker"]] = bar["timestamp"]
+                    yield bar
+            await asyncio.sleep(self.poll_seconds)
@@ -0,0 +1,103 @@
+# file: src/streaming/incremental_indicators.py
+import math
+import sys
+from collections import deque
+
+from src.features.indicator_kernels import INDICATOR_COLUMNS
+
+# Constant work per bar versions of the kernels in src/features/indicator_kernels.py, with the same
+# pandas-ta definitions: after n bars they return the values the batch kernels give for row n.
+
+
+class _RollingWindow:
+    """Mean and population standard deviation of the last `length` values."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values = deque(maxlen=length)
+
+    def update(self, value: float):
+        self.values.append(value)
+        if len(self.values) < self.length:
+            return math.nan, math.nan
+        mean = sum(self.values) / self.length
+        variance = sum((v - mean) ** 2 for v in self.values) / self.length
+        return mean, math.sqrt(variance)
+
+
+class _EMA:
+    """EMA seeded with the mean of the first `length` values (pandas_ta.ema, adjust=False)."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.seed_values = []
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value if not self.seed_values else math.nan
+        if len(self.seed_values) < self.length:
+            self.seed_values.append(x)
+            if len(self.seed_values) == self.length:
+                self.value = sum(self.seed_values) / self.length
+            return self.value
+        self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class _RMA:
+    """Wilder's average, ewm(alpha=1/length, adjust=True, min_periods=length)."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1 - 1 / length
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        self.numerator = self.decay * self.numerator + x
+        self.denominator = self.decay * self.denominator + 1
+        self.count += 1
+        return self.numerator / self.denominator if self.count >= self.length else math.nan
+
+
+class IncrementalIndicators:
+    """
+    Technical indicators of one ticker, updated bar by bar.
+
+    update() returns the same columns as add_technical_indicators (SMA_20, RSI_14,
+    MACD_12_26_9, BBL_20_2.0, ...), NaN until each indicator's lookback is filled.
+    """
+
+    def __init__(self):
+        self.sma_20 = _RollingWindow(20)
+        self.sma_50 = _RollingWindow(50)
+        self.gains, self.losses = _RMA(14), _RMA(14)
+        self.fast, self.slow, self.signal = _EMA(12), _EMA(26), _EMA(9)
+        self.previous_close = None
+
+    def update(self, close: float) -> dict:
+        sma_20, std_20 = self.sma_20.update(close)
+        sma_50, _ = self.sma_50.update(close)
+
+        rsi = math.nan
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            gain = self.gains.update(max(change, 0.0))
+            loss = self.losses.update(max(-change, 0.0))
+            rsi = 100 * gain / (gain + loss) if gain + loss > 0 else math.nan
+        self.previous_close = close
+
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+
+        lower, upper = sma_20 - 2 * std_20, sma_20 + 2 * std_20
+        # pandas-ta shifts a zero band width by machine epsilon (non_zero_range)
+        band_range = (upper - lower) or sys.float_info.epsilon
+        bandwidth = 100 * band_range / sma_20
+        percent = (close - lower) / band_range
+
+        values = [sma_20, sma_50, rsi, macd, macd - signal, signal, lower, sma_20, upper, bandwidth, percent]
+        return dict(zip(INDICATOR_COLUMNS, values))
@@ -0,0 +1,241 @@
+# file: src/streaming/stream_predict.py
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features.schema import FEATURE_COLUMNS
+from src.streaming.bar_sources import FileReplaySource, YFinanceMinuteSource
+from src.streaming.incremental_indicators import IncrementalIndicators
+
+STREAM_OUTPUT_DIR = "data/streaming"
+# Daily features that do not change within a trading day
+SENTIMENT_COLUMNS = [
+    "avg_sentiment_score", "num_articles", "positive_ratio", "negative_ratio",
+    "avg_sentiment_score_reddit", "num_articles_reddit", "positive_ratio_reddit", "negative_ratio_reddit",
+]
+
+
+def load_daily_sentiment(ticker: str) -> dict:
+    """
+    Latest daily sentiment features of a ticker; they stay fixed during the trading day.
+
+    Reads the feature store first and falls back to the final dataset CSV. Missing values are 0.
+    """
+    from src.features.feature_store import get_latest_features
+    from src.features.schema import read_feature_csv
+
+    df = get_latest_features(ticker, n=1, columns=SENTIMENT_COLUMNS)
+    if df.empty:
+        csv_path = f"data/final/{ticker}_final_dataset.csv"
+        if os.path.exists(csv_path):
+            df = read_feature_csv(csv_path)
+            df = df[df.index.notna()].tail(1)
+    if df.empty:
+        print(f"No daily sentiment found for {ticker}, using zeros.")
+        return {c: 0.0 for c in SENTIMENT_COLUMNS}
+    row = df.iloc[-1]
+    return {c: float(row[c]) if c in row and not math.isnan(row[c]) else 0.0 for c in SENTIMENT_COLUMNS}
+
+
+class StreamingPredictor:
+    """
+    Keeps per-ticker indicators and scaled feature windows, and scores full windows in batches.
+
+    Args:
+        models (dict): ticker -> (model, fitted MinMaxScaler). Bars of other tickers are ignored.
+        sentiment (dict): ticker -> daily sentiment features (see load_daily_sentiment).
+    """
+
+    def __init__(self, models: dict, sentiment: dict = None):
+        self.models = models
+        self.sentiment = sentiment or {}
+        self.indicators = {}
+        self.windows = {}
+
+    def update(self, bar: dict):
+        """
+        Adds a bar to its ticker's indicators and window.
+
+        Returns:
+            np.ndarray: The ticker's (time_steps, features) window once it is full and every
+                feature is defined, otherwise None.
+        """
+        ticker = bar["ticker"]
+        if ticker not in self.models:
+            return None
+        model, scaler = self.models[ticker]
+        if ticker not in self.indicators:
+            self.indicators[ticker] = IncrementalIndicators()
+            self.windows[ticker] = deque(maxlen=model.input_shape[1])
+
+        values = {c: float(bar[c]) for c in ("close", "high", "low", "open", "volume")}
+        values.update(self.indicators[ticker].update(values["close"]))
+        values.update(self.sentiment.get(ticker, {}))
+        row = np.array([values.get(c, 0.0) for c in FEATURE_COLUMNS], dtype=np.float64)
+        if np.isnan(row).any():
+            # Indicators are still warming up
+            return None
+
+        # MinMaxScaler.transform without the DataFrame round trip
+        self.windows[ticker].append((row * scaler.scale_ + scaler.min_).astype(np.float32))
+        window = self.windows[ticker]
+        return np.stack(window) if len(window) == window.maxlen else None
+
+    def predict(self, ticker: str, windows: np.ndarray) -> np.ndarray:
+        model, _ = self.models[ticker]
+        return np.asarray(model.predict(windows, verbose=0))[:, 0]
+
+
+def load_models(tickers: list, model_dir: str = "models", backend: str = "numpy") -> dict:
+    """Loads the LSTM model and scaler of every ticker that has them."""
+    import joblib
+
+    models = {}
+    for ticker in tickers:
+        model_path = os.path.join(model_dir, f"{ticker}_lstm_model.h5")
+        scaler_path = os.path.join(model_dir, f"{ticker}_scaler.joblib")
+        if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+            print(f"No model found for {ticker}, its bars will be skipped.")
+            continue
+        if backend == "numpy":
+            from src.serving.numpy_lstm import NumpyLSTMClassifier
+            model = NumpyLSTMClassifier.from_h5(model_path)
+        else:
+            import tensorflow as tf
+            model = tf.keras.models.load_model(model_path)
+        models[ticker] = (model, joblib.load(scaler_path))
+    return models
+
+
+def _latency_summary(latencies: list) -> dict:
+    if not latencies:
+        return {}
+    values = np.array(latencies)
+    summary = {f"p{q}_ms": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+    summary["max_ms"] = round(float(values.max()), 3)
+    return summary
+
+
+async def run_stream(source, predictor: StreamingPredictor, output_path: str = None, max_batch: int = 256,
+                     max_bars: int = None) -> dict:
+    """
+    Consumes bars from a source and emits a prediction per bar once its ticker's window is full.
+
+    A reader task puts bars on a queue, stamped with their arrival time. The consumer drains
+    every bar already queued (up to max_batch), updates the tickers, and scores the full
+    windows of each ticker in one model call. Latency is measured per bar from arrival to
+    emitted prediction.
+
+    Args:
+        source: Async iterable of bars (see bar_sources.py).
+        predictor (StreamingPredictor): Per-ticker state and models.
+        output_path (str): JSONL file the predictions are appended to. None keeps them in memory only.
+        max_batch (int): Most bars handled per model round.
+        max_bars (int): Stop after this many bars. None runs until the source ends.
+
+    Returns:
+        dict: Bars processed, predictions emitted, throughput and latency percentiles.
+    """
+    queue = asyncio.Queue(maxsize=10 * max_batch)
+    done = object()
+
+    async def read():
+        count = 0
+        async for bar in source:
+            await queue.put((time.perf_counter(), bar))
+            count += 1
+            if max_bars and count >= max_bars:
+                break
+        await queue.put((None, done))
+
+    reader = asyncio.create_task(read())
+    output = None
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        output = open(output_path, "a")
+
+    latencies, n_bars, n_predictions = [], 0, 0
+    start = time.perf_counter()
+    finished = False
+    try:
+        while not finished:
+            batch = [await queue.get()]
+            while len(batch) < max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            ready = {}
+            for arrived, bar in batch:
+                if bar is done:
+                    finished = True
+                    continue
+                n_bars += 1
+                window = predictor.update(bar)
+                if window is not None:
+                    ready.setdefault(bar["ticker"], []).append((arrived, bar, window))
+
+            for ticker, items in ready.items():
+                probabilities = predictor.predict(ticker, np.stack([w for _, _, w in items]))
+                emitted = time.perf_counter()
+                for (arrived, bar, _), probability in zip(items, probabilities):
+                    latency_ms = (emitted - arrived) * 1000
+                    latencies.append(latency_ms)
+                    n_predictions += 1
+                    if output:
+                        output.write(json.dumps({
+                            "ticker": ticker,
+                            "timestamp": bar["timestamp"].isoformat(),
+                            "close": float(bar["close"]),
+                            "probability_up": float(probability),
+                            "prediction": int(probability > 0.5),
+                            "latency_ms": round(latency_ms, 3),
+                        }) + "\n")
+    finally:
+        reader.cancel()
+        if output:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "bars": n_bars,
+        "predictions": n_predictions,
+        "bars_per_second": round(n_bars / elapsed, 1) if elapsed > 0 else None,
+        **_latency_summary(latencies),
+    }
+    print(f"Stream finished: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream minute bars through the LSTM model.")
+    parser.add_argument("--tickers", nargs="+", default=["AAPL"])
+    parser.add_argument("--replay", help="CSV of minute bars to replay instead of polling Yahoo Finance")
+    parser.add_argument("--speed", type=float, default=0, help="Replay speed vs real time (0 = as fast as possible)")
+    parser.add_argument("--max-bars", type=int, default=None)
+    parser.add_argument("--backend", default="numpy", choices=["numpy", "tensorflow"])
+    args = parser.parse_args()
+
+    models = load_models(args.tickers, backend=args.backend)
+    if not models:
+        sys.exit("No models to stream with.")
+    predictor = StreamingPredictor(models, {t: load_daily_sentiment(t) for t in models})
+
+    if args.replay:
+        source = FileReplaySource(args.replay, speed=args.speed, tickers=list(models))
+    else:
+        source = YFinanceMinuteSource(list(models))
+
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    output_path = os.path.join(STREAM_OUTPUT_DIR, f"predictions_{current_date}.jsonl")
+    asyncio.run(run_stream(source, predictor, output_path, max_bars=args.max_bars))
+    print(f"Predictions appended to {output_path}")
@@ -0,0 +1,217 @@
+# file: src/utils/response_cache.py
+import hashlib
+import json
+import os
+import pickle
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+RESPONSE_CACHE_DIR = "data/cache/responses"
+# How long a response for a window that includes today stays valid, per source
+SOURCE_TTL_SECONDS = {
+    "yfinance": 6 * 3600,
+    "polygon": 3600,
+    "reddit": 900,
+}
+DEFAULT_TTL_SECONDS = 3600
+# Total size of the cache; least recently used entries are evicted beyond it
+MAX_CACHE_BYTES = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+# Query parameters that are credentials, not part of what was asked for
+_SECRET_PARAMS = {"apikey", "api_key", "client_id", "client_secret", "user_agent", "password", "token"}
+
+
+def cache_enabled() -> bool:
+    return os.getenv("RESPONSE_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize(v) for v in value]
+        return sorted(items, key=str) if isinstance(value, set) else items
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def response_key(source: str, query: dict, window_start=None, window_end=None) -> str:
+    """
+    Cache key of a request: the source, its query with credentials dropped and keys sorted,
+    and the date window it covers.
+    """
+    params = {k: v for k, v in (query or {}).items() if str(k).lower() not in _SECRET_PARAMS}
+    payload = {
+        "source": source,
+        "query": _normalize(params),
+        "window": [_normalize(window_start), _normalize(window_end)],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_closed_window(window_end) -> bool:
+    """True if the window ended before today (UTC), so its data can no longer change."""
+    if window_end is None:
+        return False
+    end = pd.Timestamp(window_end)
+    end = end.tz_convert("UTC").tz_localize(None) if end.tzinfo else end
+    return end.normalize() < pd.Timestamp.utcnow().tz_localize(None).normalize()
+
+
+def _entry_path(source: str, key: str) -> str:
+    return os.path.join(RESPONSE_CACHE_DIR, source, f"{key}.pkl")
+
+
+def _is_empty(payload) -> bool:
+    if payload is None:
+        return True
+    if isinstance(payload, (pd.DataFrame, pd.Series)):
+        return payload.empty
+    if isinstance(payload, (list, dict)):
+        return not payload
+    return False
+
+
+def load_response(source: str, key: str):
+    """
+    Returns (True, payload) for a valid entry, otherwise (False, None).
+
+    Entries of closed windows never expire; others expire after the source's TTL.
+    A hit refreshes the entry's modification time, which eviction uses as its last use.
+    """
+    path = _entry_path(source, key)
+    if not os.path.exists(path):
+        return False, None
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return False, None
+
+    # Another writer may evict the entry at any point; that is a miss, not an error
+    try:
+        if not entry["closed"] and time.time() - entry["created_at"] > entry["ttl_seconds"]:
+            os.remove(path)
+            return False, None
+        os.utime(path)
+    except FileNotFoundError:
+        return False, None
+    return True, entry["payload"]
+
+
+def save_response(source: str, key: str, payload, closed: bool, ttl_seconds: float = None):
+    """Writes a response to the cache atomically, then evicts down to MAX_CACHE_BYTES."""
+    path = _entry_path(source, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {
+        "created_at": time.time(),
+        "closed": closed,
+        "ttl_seconds": ttl_seconds if ttl_seconds is not None else SOURCE_TTL_SECONDS.get(source, DEFAULT_TTL_SECONDS),
+        "payload": payload,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    evict(MAX_CACHE_BYTES)
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """
+    Deletes least recently used entries until the cache fits in max_bytes.
+
+    Entries of open windows go first; closed windows are only evicted if that is not enough.
+
+    Returns:
+        int: Number of entries deleted.
+    """
+    if not os.path.isdir(RESPONSE_CACHE_DIR):
+        return 0
+    open_entries, closed_entries, total = [], [], 0
+    for source in os.listdir(RESPONSE_CACHE_DIR):
+        source_dir = os.path.join(RESPONSE_CACHE_DIR, source)
+        if not os.path.isdir(source_dir):
+            continue
+        for name in os.listdir(source_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(source_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted by a concurrent writer (e.g. backfill threads)
+                continue
+            total += stat.st_size
+            # Closed entries are marked in their name so eviction does not have to unpickle them
+            target = closed_entries if name.startswith("closed-") else open_entries
+            target.append((stat.st_mtime, stat.st_size, path))
+
+    removed = 0
+    for entries in (open_entries, closed_entries):
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                return removed
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+    return removed
+
+
+def cached_fetch(source: str, query: dict, fetch, window_start=None, window_end=None, ttl_seconds: float = None):
+    """
+    Returns the cached response of a request, or calls fetch() and caches its result.
+
+    Exceptions from fetch() propagate and nothing is cached. Empty results (None, empty
+    DataFrame/list/dict) are returned but not cached, so a transient empty answer is retried.
+
+    Args:
+        source (str): Upstream name, e.g. 'yfinance', 'polygon', 'reddit'.
+        query (dict): Parameters identifying the request. Credentials are excluded from the key.
+        fetch (callable): Performs the request and returns a picklable payload.
+        window_start, window_end: Dates the request covers. A window ending before today is
+            closed and cached indefinitely; otherwise the source's TTL applies.
+        ttl_seconds (float): Overrides the source's TTL.
+
+    Returns:
+        The payload.
+    """
+    if not cache_enabled():
+        return fetch()
+
+    closed = is_closed_window(window_end)
+    key = ("closed-" if closed else "") + response_key(source, query, window_start, window_end)
+    hit, payload = load_response(source, key)
+    if hit:
+        print(f"INFO: [response_cache] {source} hit {key[-12:]}")
+        return payload
+
+    payload = fetch()
+    if not _is_empty(payload):
+        save_response(source, key, payload, closed, ttl_seconds)
+    return payload
+
+
+def cache_summary() -> dict:
+    """Entries and megabytes per source."""
+    summary = {}
+    if not os.path.isdir(RESPONSE_CACHE_DIR):
+        return summary
+    for source in sorted(os.listdir(RESPONSE_CACHE_DIR)):
+        source_dir = os.path.join(RESPONSE_CACHE_DIR, source)
+        if not os.path.isdir(source_dir):
+            continue
+        sizes = [os.path.getsize(os.path.join(source_dir, n)) for n in os.listdir(source_dir) if n.endswith(".pkl")]
+        summary[source] = {"entries": len(sizes), "mb": round(sum(sizes) / 1024 / 1024, 3)}
+    return summary
+
+
+if __name__ == "__main__":
+    print(json.dumps(cache_summary(), indent=2))
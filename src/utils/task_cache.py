@@ -0,0 +1,117 @@
+# file: src/utils/task_cache.py
+import hashlib
+import json
+import os
+from datetime import datetime
+
+CACHE_DIR = "data/cache/tasks"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """
+    Computes the SHA-256 content hash of a file, reading it in chunks.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_fingerprint(stage: str, input_paths: list = None, params: dict = None, code_paths: list = None) -> str:
+    """
+    Computes the fingerprint of a pipeline stage run.
+
+    The fingerprint changes whenever the content of an input file, a parameter
+    value or the source code of the stage changes.
+
+    Args:
+        stage (str): Name of the pipeline stage.
+        input_paths (list): Files the stage reads. Missing files are recorded as missing.
+        params (dict): Parameters of the stage (must be JSON serialisable).
+        code_paths (list): Source files that implement the stage.
+
+    Returns:
+        str: Hex digest identifying this stage run.
+    """
+    payload = {
+        "stage": stage,
+        "inputs": {},
+        "params": params or {},
+        "code": {},
+    }
+    for path in sorted(input_paths or []):
+        payload["inputs"][path] = file_sha256(path) if path and os.path.exists(path) else None
+    for path in sorted(code_paths or []):
+        payload["code"][path] = file_sha256(path) if os.path.exists(path) else None
+
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _manifest_path(stage: str, fingerprint: str) -> str:
+    return os.path.join(CACHE_DIR, stage, f"{fingerprint}.json")
+
+
+def load_cached_outputs(stage: str, fingerprint: str, force: bool = False):
+    """
+    Returns the outputs recorded for a fingerprint if they are still valid.
+
+    A cache entry is valid only if every recorded output file still exists and
+    its content hash matches the one recorded when the stage finished.
+
+    Args:
+        stage (str): Name of the pipeline stage.
+        fingerprint (str): Fingerprint from compute_fingerprint.
+        force (bool): If True, always report a cache miss.
+
+    Returns:
+        list or None: Recorded output paths, or None on a cache miss.
+    """
+    if force:
+        return None
+
+    manifest_path = _manifest_path(stage, fingerprint)
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    for path, digest in manifest["outputs"].items():
+        if not os.path.exists(path) or file_sha256(path) != digest:
+            return None
+
+    print(f"INFO: [{stage}] cache hit for fingerprint {fingerprint[:12]} (created {manifest['created_at']})")
+    return list(manifest["outputs"].keys())
+
+
+def save_cached_outputs(stage: str, fingerprint: str, output_paths: list):
+    """
+    Records the outputs produced by a stage run under its fingerprint.
+
+    Args:
+        stage (str): Name of the pipeline stage.
+        fingerprint (str): Fingerprint from compute_fingerprint.
+        output_paths (list): Files written by the stage.
+    """
+    outputs = {path: file_sha256(path) for path in output_paths if path and os.path.exists(path)}
+    if not outputs:
+        return
+
+    manifest_path = _manifest_path(stage, fingerprint)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"created_at": datetime.now().isoformat(), "outputs": outputs}, f, indent=2)
+    os.replace(tmp_path, manifest_path)
@@ -0,0 +1,51 @@
+# file: tests/test_compact_forest.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serving.compact_forest import CompactForest
+
+sklearn_ensemble = pytest.importorskip("sklearn.ensemble")
+
+
+def _fitted_forest(n_samples: int = 600, n_features: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_samples, n_features)), columns=[f"f{i}" for i in range(n_features)])
+    y = ((X["f0"] + 0.5 * X["f1"] ** 2 + rng.normal(0, 0.5, n_samples)) > 0.5).astype(int)
+    model = sklearn_ensemble.RandomForestClassifier(n_estimators=25, max_depth=8, min_samples_leaf=3, random_state=seed)
+    model.fit(X, y)
+    X_test = pd.DataFrame(rng.normal(size=(300, n_features)), columns=X.columns)
+    return model, X_test
+
+
+def test_predict_proba_matches_sklearn():
+    model, X_test = _fitted_forest()
+    forest = CompactForest.from_sklearn(model)
+    np.testing.assert_allclose(forest.predict_proba(X_test.to_numpy()), model.predict_proba(X_test), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(X_test.to_numpy()), model.predict(X_test))
+    assert forest.feature_names == list(X_test.columns)
+
+
+def test_single_sample_and_saved_forest(tmp_path):
+    model, X_test = _fitted_forest(seed=1)
+    forest = CompactForest.from_sklearn(model)
+    path = os.path.join(tmp_path, "forest.npz")
+    forest.save(path)
+    loaded = CompactForest.load(path)
+    np.testing.assert_array_equal(loaded.predict_proba(X_test.to_numpy()), forest.predict_proba(X_test.to_numpy()))
+    np.testing.assert_allclose(forest.predict_proba(X_test.to_numpy()[0]), model.predict_proba(X_test.iloc[:1]),
+                               rtol=0, atol=1e-12)
+
+
+def test_rejects_non_binary_classifier():
+    rng = np.random.default_rng(0)
+    model = sklearn_ensemble.RandomForestClassifier(n_estimators=2, random_state=0)
+    model.fit(rng.normal(size=(30, 3)), np.arange(30) % 3)
+    with pytest.raises(ValueError):
+        CompactForest.from_sklearn(model)
@@ -0,0 +1,46 @@
+# file: tests/test_incremental_indicators.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.features.indicator_kernels import INDICATOR_COLUMNS, compute_indicators
+from src.streaming.incremental_indicators import IncrementalIndicators
+
+
+def _close_series(n_bars: int = 400, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n_bars)))
+    return pd.Series(close, index=pd.bdate_range("2020-01-01", periods=n_bars))
+
+
+def _incremental(close: pd.Series) -> pd.DataFrame:
+    indicators = IncrementalIndicators()
+    return pd.DataFrame([indicators.update(float(value)) for value in close], index=close.index)
+
+
+def test_matches_batch_kernels():
+    close = _close_series()
+    expected = compute_indicators(close)
+    actual = _incremental(close)
+    for column in INDICATOR_COLUMNS:
+        # Same warm-up: NaN on exactly the same bars
+        np.testing.assert_array_equal(actual[column].isna(), expected[column].isna(), err_msg=f"NaN rows of {column}")
+        np.testing.assert_allclose(actual[column].dropna(), expected[column].dropna(),
+                                   rtol=1e-10, atol=1e-10, err_msg=column)
+
+
+def test_warm_up_boundaries():
+    actual = _incremental(_close_series(n_bars=60))
+    first_valid = {column: actual[column].first_valid_index() for column in INDICATOR_COLUMNS}
+    index = actual.index
+    assert first_valid["SMA_20"] == index[19]
+    assert first_valid["SMA_50"] == index[49]
+    assert first_valid["RSI_14"] == index[14]
+    assert first_valid["MACD_12_26_9"] == index[25]
+    assert first_valid["MACDs_12_26_9"] == index[33]
+    assert first_valid["BBP_20_2.0"] == index[19]
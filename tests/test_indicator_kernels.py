@@ -0,0 +1,55 @@
+# file: tests/test_indicator_kernels.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.features.indicator_kernels import (
+    INDICATOR_COLUMNS, compare_with_pandas_ta, compute_indicator_panel, compute_indicators,
+)
+
+
+def _close_panel(n_days: int = 300, n_tickers: int = 4, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.02, (n_days, n_tickers))
+    return pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=pd.bdate_range("2020-01-01", periods=n_days),
+        columns=[f"T{i}" for i in range(n_tickers)],
+    )
+
+
+def test_matches_pandas_ta():
+    pytest.importorskip("pandas_ta")
+    close = _close_panel(n_tickers=1)
+    differences = compare_with_pandas_ta(close.rename(columns={"T0": "close"}))
+    assert set(differences) == set(INDICATOR_COLUMNS)
+
+
+def test_panel_matches_single_ticker():
+    close = _close_panel()
+    # A ticker listed later than the others starts with NaNs
+    close.iloc[:40, 1] = np.nan
+    panel = compute_indicator_panel(close)
+    for ticker in close.columns:
+        single = compute_indicators(close[ticker].dropna())
+        for column in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(panel[column][ticker].dropna(), single[column].dropna(),
+                                       rtol=1e-10, err_msg=f"{column} of {ticker}")
+
+
+def test_moving_averages_and_bands_match_pandas():
+    close = _close_panel(n_tickers=1)["T0"]
+    indicators = compute_indicators(close)
+    np.testing.assert_allclose(indicators["SMA_20"], close.rolling(20).mean(), rtol=1e-10)
+    np.testing.assert_allclose(indicators["SMA_50"], close.rolling(50).mean(), rtol=1e-10)
+    np.testing.assert_allclose(indicators["BBM_20_2.0"], close.rolling(20).mean(), rtol=1e-10)
+    width = indicators["BBU_20_2.0"] - indicators["BBL_20_2.0"]
+    np.testing.assert_allclose(width, 4 * close.rolling(20).std(ddof=0), rtol=1e-8)
+    rsi = indicators["RSI_14"].dropna()
+    assert ((rsi >= 0) & (rsi <= 100)).all()
@@ -2,70 +2,130 @@
 import streamlit as st
 import requests
 import pandas as pd
-import joblib
 import os
+import sys
 os.environ['STREAMLIT_CONFIG_DIR'] = '/tmp/.streamlit'
-os.environ['STREAMLIT_CREDENT statIALS_DIR'] = '/tmp/.streamlit'
-
-# Utility function to get the latest 30 days of features
-def get_latest_features():
-    ticker = 'AAPL'
-    st.warning("Using pre-saved sample data for demonstration purposes.")
-    # Fix: Explicitly use 'Date' as the index column
-    output_path = f"../data/final/{ticker}_final_dataset.csv"
-    sample_data = pd.read_csv(output_path, index_col='Date')
-    
-    # Drop the 'Unnamed: 0' column which is causing the error
-    if 'Unnamed: 0' in sample_data.columns:
-        sample_data = sample_data.drop('Unnamed: 0', axis=1)
-    
-    # Convert the index to datetime if it's not already
-    if not pd.api.types.is_datetime64_any_dtype(sample_data.index):
-        try:
-            sample_data.index = pd.to_datetime(sample_data.index)
-        except:
-            pass  # If conversion fails, keep the original index
-    
-    scaler = joblib.load("../models/AAPL_scaler.joblib")
-    feature_columns = sample_data.columns.drop('target')
-    scaled_features = scaler.transform(sample_data[feature_columns])
-    
-    latest_sequence = scaled_features[-30:]
-    return latest_sequence.tolist()
+os.environ['STREAMLIT_CREDENTIALS_DIR'] = '/tmp/.streamlit'
+
+# Paths are resolved from the project root, so the app runs from any working directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+FINAL_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "final")
+PREDICTION_HISTORY_DIR = os.path.join(PROJECT_ROOT, "data", "predictions")
+
+# Defaults to the deployed API; set API_URL=http://localhost:8000 to use a local server
+API_URL = os.getenv("API_URL", "https://stock-movement-prediction-system-mlops.onrender.com").rstrip("/")
+# Predictions only change when the pipeline runs, so they are reused for this long
+PREDICTION_TTL_SECONDS = int(os.getenv("PREDICTION_TTL_SECONDS", "300"))
+
+
+def _file_version(path: str):
+    """Changes whenever the file is rewritten; part of the cache keys below."""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One HTTP session (and connection pool) shared by all reruns and users."""
+    return requests.Session()
+
+
+@st.cache_data
+def list_tickers(final_dir_version, history_dir_version) -> list:
+    """Tickers with a final dataset or a prediction history, re-listed when either directory changes."""
+    tickers = set()
+    for directory, suffix in ((FINAL_DATA_DIR, "_final_dataset.csv"),
+                              (PREDICTION_HISTORY_DIR, "_prediction_history.csv")):
+        if os.path.isdir(directory):
+            tickers.update(name[:-len(suffix)] for name in os.listdir(directory) if name.endswith(suffix))
+    return sorted(tickers)
+
+
+@st.cache_data
+def load_prediction_history(ticker: str, version) -> pd.DataFrame:
+    """
+    Precomputed predictions of a ticker (src/serving/prediction_history.py).
+
+    version is the file's (mtime, size); a rewritten file gets a new cache entry.
+    """
+    if version is None:
+        return pd.DataFrame()
+    path = os.path.join(PREDICTION_HISTORY_DIR, f"{ticker}_prediction_history.csv")
+    return pd.read_csv(path, index_col="Date", parse_dates=True)
+
+
+@st.cache_data(ttl=PREDICTION_TTL_SECONDS, show_spinner=False)
+def fetch_predictions(tickers: tuple, versions: tuple) -> dict:
+    """
+    Latest predictions of all selected tickers in one batched API call.
+
+    versions holds the dataset file versions, so a pipeline run bypasses cached results.
+    """
+    response = get_session().post(f"{API_URL}/predict/batch", json={"tickers": list(tickers)}, timeout=30)
+    response.raise_for_status()
+    return response.json()
 
 
 # --- Streamlit App ---
 st.title("Stock Price Movement Prediction")
+st.write("Next-day price movement predictions. Prediction: 1 for UP, 0 for DOWN.")
 
-# Use Render API URL with the correct endpoint
-API_URL = "https://stock-movement-prediction-system-mlops.onrender.com/predict"
-
-st.write("This dashboard predicts the next day's stock price movement for AAPL (Apple Inc.).")
-st.write("Prediction: 1 for UP, 0 for DOWN.")
-
-if st.button("Get Latest Prediction"):
-    with st.spinner("Fetching latest data and making prediction..."):
-        try:
-            # Get the latest feature data
-            features = get_latest_features()
-            
-            # Call the prediction API
-            response = requests.post(API_URL, json={"data": features})
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Display the result
-            st.success("Prediction received!")
-            prediction = result.get("prediction")
-            probability = result.get("probability_up")
-            
-            if prediction == 1:
-                st.metric(label="Predicted Movement", value="UP", delta=f"{probability:.2%} probability")
+available = list_tickers(_file_version(FINAL_DATA_DIR), _file_version(PREDICTION_HISTORY_DIR))
+default = [t for t in ["AAPL"] if t in available] or available[:1]
+tickers = st.multiselect("Tickers", options=available, default=default)
+
+if not tickers:
+    st.info("Select at least one ticker.")
+    st.stop()
+
+# Latest predictions
+dataset_versions = tuple(
+    _file_version(os.path.join(FINAL_DATA_DIR, f"{t}_final_dataset.csv")) for t in tickers
+)
+if st.button("Refresh predictions"):
+    fetch_predictions.clear()
+
+with st.spinner("Fetching latest predictions..."):
+    try:
+        batch = fetch_predictions(tuple(tickers), dataset_versions)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Could not connect to the prediction API at {API_URL}: {e}")
+        batch = {"predictions": [], "errors": {}}
+
+if batch["predictions"]:
+    latest = pd.DataFrame(batch["predictions"]).set_index("ticker")
+    columns = st.columns(min(len(latest), 4))
+    for i, (ticker, row) in enumerate(latest.iterrows()):
+        probability = row["probability_up"]
+        with columns[i % len(columns)]:
+            if row["prediction"] == 1:
+                st.metric(label=f"{ticker} ({row['as_of']})", value="UP", delta=f"{probability:.2%} probability")
             else:
-                st.metric(label="Predicted Movement", value="DOWN", delta=f"{(1-probability):.2%} probability")
+                st.metric(label=f"{ticker} ({row['as_of']})", value="DOWN", delta=f"{(1 - probability):.2%} probability")
+    st.dataframe(latest[["as_of", "prediction_label", "probability_up"]], use_container_width=True)
+for ticker, error in batch["errors"].items():
+    st.warning(f"{ticker}: {error['detail']}")
+
+# Prediction history
+st.subheader("Prediction history")
+histories = {}
+for ticker in tickers:
+    path = os.path.join(PREDICTION_HISTORY_DIR, f"{ticker}_prediction_history.csv")
+    history = load_prediction_history(ticker, _file_version(path))
+    if not history.empty:
+        histories[ticker] = history
 
-        except requests.exceptions.RequestException as e:
-            st.error(f"Could not connect to the prediction API: {e}")
-        except Exception as e:
-            st.error(f"An error occurred: {e}")
\ No newline at end of file
+if not histories:
+    st.info("No prediction history yet. Run `python src/serving/prediction_history.py --tickers ...`.")
+else:
+    st.line_chart(pd.DataFrame({t: h["probability_up"] for t, h in histories.items()}))
+    hit_rates = {
+        t: (h["prediction"] == h["target"]).iloc[:-1].mean() for t, h in histories.items() if len(h) > 1
+    }
+    st.caption("Directional hit rate of past predictions: "
+               + ", ".join(f"{t} {rate:.0%}" for t, rate in hit_rates.items()))